@@ -0,0 +1,37 @@
+import sys
+import revitron
+import mastoron
+from pyrevit import forms
+
+
+selection = revitron.Selection().get()
+if len(selection) < 1:
+    sys.exit()
+
+massCategory = int(revitron.DB.BuiltInCategory.OST_Mass)
+cutters = [x for x in selection if x.Category and x.Category.Id.IntegerValue == massCategory]
+cutterIds = set(str(x.Id) for x in cutters)
+ceilings = [x for x in selection if not str(x.Id) in cutterIds]
+
+operation = forms.CommandSwitchWindow.show(
+    [mastoron.UNION, mastoron.DIFFERENCE, mastoron.INTERSECT],
+    message='Boolean operation:')
+if not operation:
+    sys.exit()
+
+if operation != mastoron.UNION and not cutters:
+    print('Select masses together with the ceilings to cut them.')
+    sys.exit()
+
+with revitron.Transaction():
+    result = mastoron.BooleanCeiling(ceilings, operation=operation, cutters=cutters)
+
+if result.failed:
+    print('Could not merge the following ceilings:')
+    for element in result.failed:
+        print(element.Id)
+
+if result.failedCutters:
+    print('Could not use the following masses:')
+    for element in result.failedCutters:
+        print(element.Id)
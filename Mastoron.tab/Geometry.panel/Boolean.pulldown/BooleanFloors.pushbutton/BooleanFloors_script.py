@@ -1,10 +1,37 @@
+import sys
 import revitron
-from revitron import _
 import mastoron
+from pyrevit import forms
 
 
 selection = revitron.Selection().get()
-floorType = revitron.Filter().byCategory('Floors').onlyTypes().getElementIds()[0]
+if len(selection) < 1:
+    sys.exit()
+
+massCategory = int(revitron.DB.BuiltInCategory.OST_Mass)
+cutters = [x for x in selection if x.Category and x.Category.Id.IntegerValue == massCategory]
+cutterIds = set(str(x.Id) for x in cutters)
+floors = [x for x in selection if not str(x.Id) in cutterIds]
+
+operation = forms.CommandSwitchWindow.show(
+    [mastoron.UNION, mastoron.DIFFERENCE, mastoron.INTERSECT],
+    message='Boolean operation:')
+if not operation:
+    sys.exit()
+
+if operation != mastoron.UNION and not cutters:
+    print('Select masses together with the floors to cut them.')
+    sys.exit()
 
 with revitron.Transaction():
-    mastoron.BooleanFloors(floors=selection, floorType=floorType)
+    result = mastoron.BooleanFloors(floors, operation=operation, cutters=cutters)
+
+if result.failed:
+    print('Could not merge the following floors:')
+    for element in result.failed:
+        print(element.Id)
+
+if result.failedCutters:
+    print('Could not use the following masses:')
+    for element in result.failedCutters:
+        print(element.Id)
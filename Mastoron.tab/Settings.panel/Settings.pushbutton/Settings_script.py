@@ -1,15 +1,72 @@
+import os
+import sys
 import revitron
 import mastoron
 import json
 from pyrevit import forms
 
-config = {}
-path = forms.save_file(file_ext='json', default_name='mastoronConfig')
+SINGLE_FILE = 'Single File'
+JOURNALED = 'Journaled File'
+SHARDED = 'Sharded Folder'
+SQLITE = 'SQLite Database'
+CURRENT = 'Current Config'
+MIGRATE = 'Migrate Current Config'
+STABLE_COLORS = 'Stable Key Colors'
+
+options = [SINGLE_FILE, JOURNALED, SHARDED, SQLITE]
+stableColors = False
+currentPath = revitron.DocumentConfigStorage().get('mastoron.configpath')
+if currentPath and os.path.exists(currentPath):
+    options.insert(0, CURRENT)
+    stableColors = bool(mastoron.ConfigStorage().get(mastoron.variables.MASTORON_STABLE_COLORS))
+
+res = forms.CommandSwitchWindow.show(
+    options,
+    switches={MIGRATE: False, STABLE_COLORS: stableColors},
+    message='Store Mastoron configuration in:',
+    recognize_access_key=True
+    )
+if not res or not res[0]:
+    sys.exit()
+
+selected_option, switches = res
+path = None
+
+if selected_option in [SINGLE_FILE, JOURNALED]:
+    path = forms.save_file(file_ext='json', default_name='mastoronConfig')
+
+if selected_option == SHARDED:
+    path = forms.pick_folder(title='Select Mastoron config folder')
+
+if selected_option == SQLITE:
+    path = forms.save_file(file_ext='sqlite', default_name='mastoronConfig')
 
 if path:
-    with open(path, 'w') as f:
-        config = json.dumps(config)
-        f.write(config)
-        
+    journal = path + mastoron.JournalFile.EXTENSION
     with revitron.Transaction():
-        mastoron.ConfigStorage.setPath(path)
\ No newline at end of file
+        if switches[MIGRATE] and currentPath and os.path.exists(currentPath):
+            if selected_option == JOURNALED:
+                open(journal, 'a').close()
+            mastoron.ConfigStorage.migrate(path)
+        else:
+            if selected_option in [SINGLE_FILE, JOURNALED]:
+                with open(path, 'w') as f:
+                    f.write(json.dumps({}))
+                if selected_option == JOURNALED:
+                    open(journal, 'w').close()
+                elif os.path.exists(journal):
+                    os.remove(journal)
+            if selected_option == SQLITE:
+                if os.path.exists(path):
+                    # The replaced database may be the current config that is still open.
+                    mastoron.ConfigStorage.clearCache()
+                    os.remove(path)
+                mastoron.SqliteConfig(path)
+            mastoron.ConfigStorage.setPath(path)
+
+if not revitron.DocumentConfigStorage().get('mastoron.configpath'):
+    sys.exit()
+
+if switches[STABLE_COLORS] != stableColors or (path and switches[STABLE_COLORS]):
+    mastoron.ConfigStorage().set(
+        mastoron.variables.MASTORON_STABLE_COLORS, switches[STABLE_COLORS])
@@ -7,11 +7,36 @@ from revitron import _
 
 activeView = revitron.ACTIVE_VIEW
 
+selection = revitron.Selection().get()
+if len(selection) > 0:
+    overrides = mastoron.ElementIndex.find([element.Id for element in selection])
+    schemeElements = {}
+    for elementId, entries in overrides.items():
+        for schemeName, viewId in entries:
+            if viewId == str(activeView.Id):
+                schemeElements.setdefault(schemeName, []).append(elementId)
+
+    if not schemeElements:
+        sys.exit()
+
+    with revitron.Transaction(), mastoron.ConfigStorage().session():
+        affectedElements = mastoron.AffectedElements()
+        for schemeName, elementIds in schemeElements.items():
+            for elementId in elementIds:
+                element = mastoron.Convert.toRevitElement(elementId)
+                mastoron.ElementOverrides(activeView, element).clear()
+            affectedElements.delete({NAME: schemeName}, activeView.Id, elementIds)
+    sys.exit()
+
 scheme = mastoron.ColorScheme.getFromUser(excludeViews=activeView.Id)
 if not scheme:
     sys.exit()
-    
-if not str(activeView.Id) in mastoron.AffectedViews().affectedViews[scheme[NAME]]:
+
+if str(activeView.Id) in mastoron.FilterOverrides.getViews(scheme):
+    with revitron.Transaction(), mastoron.ConfigStorage().session():
+        mastoron.FilterOverrides(activeView).clear(scheme)
+
+if not str(activeView.Id) in mastoron.AffectedViews().affectedViews.get(scheme[NAME], {}):
     sys.exit()
 
 overriddenElements = mastoron.AffectedElements().get(scheme, viewId=activeView.Id)
@@ -19,7 +44,7 @@ overriddenElements = mastoron.AffectedElements().get(scheme, viewId=activeView.I
 if len(overriddenElements) < 1:
     sys.exit()
 
-with revitron.Transaction():
+with revitron.Transaction(), mastoron.ConfigStorage().session():
     for elementId in overriddenElements:
         element = mastoron.Convert.toRevitElement(elementId)
         mastoron.ElementOverrides(activeView, element).clear()
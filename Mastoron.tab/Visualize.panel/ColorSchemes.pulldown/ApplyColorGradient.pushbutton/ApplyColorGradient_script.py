@@ -1,36 +1,22 @@
 import sys
-import json
 import revitron
 import mastoron
-from mastoron import ColorScheme
-from mastoron.variables import MASTORON_COLORSCHEME
-from mastoron.variables import ROUNDING_DECIMALS
+from mastoron import ColorScheme, ColorGradient, Gradient
 from mastoron.variables import GRADIENTS
 from mastoron.variables import NAME, DATA
-from revitron import _
+from mastoron.gradient import EQUAL_INTERVAL, QUANTILE, JENKS, DEFAULT_STOPS
 from pyrevit import forms
 
 
-def getKey(element, parameter, selectedOption):
-    if selectedOption.isInstance:
-        key = _(element).get(parameter)
-    elif not selectedOption.isInstance:
-        key = _(revitron.DOC.GetElement(element.GetTypeId())).get(parameter)
-    if not key:
-        return None
-    if str(selectedOption.type) == 'Invalid':
-        print('Cannot apply gradient, choose number or text parameter.')
-        sys.exit()
-    try:
-        key = str(round(key, ROUNDING_DECIMALS))
-    except:
-        key = str(key)
-    return key
+def isNumber(value):
+    return isinstance(value, (int, long, float)) and not isinstance(value, bool)
+
 
 selection = revitron.Selection().get()
 if len(selection) < 1:
     sys.exit()
 
+selectedSwitch = None
 options = mastoron.ProcessOptions(selection, staticParams=['Mass Area'])
 if options:
     selectedSwitch = forms.CommandSwitchWindow.show(sorted(options),
@@ -42,34 +28,57 @@ if not selectedSwitch:
 selectedOption = options[selectedSwitch]
 schemeName = selectedOption.name
 
-keys = set()
-for element in selection:
-    key = getKey(element, schemeName, selectedOption)
-    if key:
-        keys.add(key)
+if str(selectedOption.type) == 'Invalid':
+    print('Cannot apply gradient, choose number or text parameter.')
+    sys.exit()
 
-start, end = int((54.0 / 360) * 100), int((174.0 / 360) * 100)
-scheme = ColorScheme().generate(
-    schemeName, keys, gradient=(start, end))
-if not scheme:
+elementValues = [(element, value) for element, value in mastoron.GetValues(
+    selection, schemeName, selectedOption.isInstance) if value or value == 0]
+if not elementValues:
     sys.exit()
 
-scheme[NAME] = GRADIENTS
-ColorScheme().save(scheme)
+if all(isNumber(value) for element, value in elementValues):
+    method = forms.CommandSwitchWindow.show(
+        [EQUAL_INTERVAL, QUANTILE, JENKS],
+        message='Classify values by:')
+    if not method:
+        sys.exit()
+    count = forms.ask_for_string(default='10', prompt='Number of classes:')
+    try:
+        count = max(int(count), 1)
+    except (TypeError, ValueError):
+        sys.exit()
+    scheme = Gradient.create(GRADIENTS,
+        [value for element, value in elementValues], count, method)
+    gradient = Gradient(scheme)
+    colors = gradient.map([value for element, value in elementValues])
+else:
+    keys = sorted(set(str(value) for element, value in elementValues))
+    scheme = {}
+    scheme[NAME] = GRADIENTS
+    scheme[DATA] = dict(zip(keys, ColorGradient(DEFAULT_STOPS).getColors(len(keys))))
+    colors = [scheme[DATA][str(value)] for element, value in elementValues]
 
 filter = revitron.Filter()
 patternId = filter.byClass('FillPatternElement').noTypes().getElementIds()[0]
 activeView = revitron.ACTIVE_VIEW
-overriddenElements = mastoron.AffectedElements().get(scheme, viewId=activeView.Id)
+affectedElements = mastoron.AffectedElements()
+overriddenElements = affectedElements.get(scheme, viewId=activeView.Id)
+appliedColors = affectedElements.getColors(scheme, activeView.Id)
+settings = dict((color, mastoron.ElementOverrides.getSettings(color, patternId))
+    for color in scheme[DATA].values())
+colored = set(str(element.Id) for element, value in elementValues)
 
-with revitron.Transaction():
+with revitron.Transaction(), mastoron.ConfigStorage().session():
+    ColorScheme().save(scheme)
     for element in selection:
-        mastoron.ElementOverrides(activeView, element).clear()
-        key = getKey(element, schemeName, selectedOption)
-        if key:
-            colorHEX = scheme[DATA][key]
-            colorRGB = mastoron.Color.HEXtoRGB(colorHEX)
-            mastoron.ElementOverrides(activeView, element).set(colorRGB, patternId)
-            overriddenElements.append(element.Id)
-    
-    mastoron.AffectedElements().dump(scheme, activeView.Id, overriddenElements)
\ No newline at end of file
+        if not str(element.Id) in colored:
+            mastoron.ElementOverrides(activeView, element).clear()
+            overriddenElements.discard(str(element.Id))
+    for (element, value), colorHEX in zip(elementValues, colors):
+        activeView.SetElementOverrides(element.Id, settings[colorHEX])
+        overriddenElements.add(str(element.Id))
+        appliedColors[str(element.Id)] = colorHEX
+
+    affectedElements.dump(scheme, activeView.Id)
+    affectedElements.forgetColors(scheme, activeView.Id, [element.Id for element in selection])
@@ -5,28 +5,38 @@ from revitron import _
 from pyrevit import forms
 
 
+VIEW_FILTERS = 'Use View Filters'
+
 activeView = revitron.ACTIVE_VIEW
 
 selection = revitron.Selection().get()
 if len(selection) < 1:
     sys.exit()
 
+res = None
 options = mastoron.ProcessOptions(selection, staticParams=['Area'])
 if options:
-    selectedSwitch = forms.CommandSwitchWindow.show(sorted(options),
+    res = forms.CommandSwitchWindow.show(sorted(options),
+        switches={VIEW_FILTERS: False},
         message='Visualize parameter:')
 
-if not selectedSwitch:
+if not res or not res[0]:
     sys.exit()
 
+selectedSwitch, switches = res
+
 selectedOption = options[selectedSwitch]
 schemeName = selectedOption.name
 
 filter = revitron.Filter()
 patternId = filter.byClass('FillPatternElement').noTypes().getElementIds()[0]
 
-with revitron.Transaction():
-    scheme = mastoron.ColorScheme.apply(activeView,
+applyScheme = mastoron.ColorScheme.apply
+if switches[VIEW_FILTERS]:
+    applyScheme = mastoron.ColorScheme.applyFilters
+
+with revitron.Transaction(), mastoron.ConfigStorage().session():
+    scheme = applyScheme(activeView,
                     selection,
                     schemeName,
                     selectedOption.isInstance,
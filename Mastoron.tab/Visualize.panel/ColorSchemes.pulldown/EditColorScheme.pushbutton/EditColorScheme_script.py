@@ -1,4 +1,5 @@
 import sys
+import revitron
 import mastoron
 import os.path as op
 from pyrevit import forms
@@ -33,4 +34,17 @@ while True:
     color = color[:1] + color[3:]
     scheme['data'][key] = color
 
-mastoron.ColorScheme().save(scheme)
+filterViews = mastoron.FilterOverrides.getViews(scheme)
+if not filterViews:
+    mastoron.ColorScheme().save(scheme)
+    sys.exit()
+
+filter = revitron.Filter()
+patternId = filter.byClass('FillPatternElement').noTypes().getElementIds()[0]
+
+with revitron.Transaction(), mastoron.ConfigStorage().session():
+    mastoron.ColorScheme().save(scheme)
+    for viewId in filterViews:
+        view = mastoron.Convert.toRevitElement(viewId)
+        if view:
+            mastoron.FilterOverrides(view).update(scheme, patternId)
@@ -10,27 +10,29 @@ if not scheme:
     sys.exit()
 
 def clean(view, scheme):
-    for viewId in mastoron.AffectedViews().get(scheme):
+    for viewId in list(mastoron.AffectedViews().get(scheme)):
         view = mastoron.Convert.toRevitElement(viewId)
         if view:
             overriddenElements = mastoron.AffectedElements().get(scheme, viewId=viewId)
             if len(overriddenElements) < 1:
                 sys.exit()
             
-            cleaned = 0
-            overriddenElements = [mastoron.Convert.toRevitElement(x) for x in overriddenElements]
-            for element in overriddenElements:
-                value = mastoron.GetKey(element,
-                                        scheme[NAME],
-                                        scheme[IS_INSTANCE],
-                                        scheme[PARAM_TYPE])
+            elements = [mastoron.Convert.toRevitElement(x) for x in overriddenElements]
+            # Elements that were deleted since they were overridden are cleaned as well.
+            cleaned = [x for x, element in zip(overriddenElements, elements) if not element]
+            elementKeys = mastoron.GetKeys([e for e in elements if e],
+                                           scheme[NAME],
+                                           scheme[IS_INSTANCE],
+                                           scheme[PARAM_TYPE])
+            for element, value in elementKeys:
                 if value not in scheme[DATA]:
                     mastoron.ElementOverrides(view, element).clear()
-                    mastoron.AffectedElements.delete(view, element)
-                    cleaned += 1
+                    cleaned.append(element.Id)
 
-            if len(overriddenElements) == cleaned:
+            if len(overriddenElements) == len(cleaned):
                 mastoron.AffectedViews().delete(scheme, viewId)
+            elif cleaned:
+                mastoron.AffectedElements().delete(scheme, viewId, cleaned)
         else:
             mastoron.AffectedViews().delete(scheme, viewId)
 
@@ -40,24 +42,28 @@ try:
 except:
     pass
 
+if mastoron.FilterOverrides.getViews(scheme):
+    # Keys of schemes that are applied by view filters are always in use.
+    print('Color scheme "{}" is applied by view filters.'.format(scheme[NAME]))
+    sys.exit()
+
 if not affectedViews:
-    with revitron.Transaction():
+    with revitron.Transaction(), mastoron.ConfigStorage().session():
             mastoron.ColorScheme().delete(scheme)
 else:
-    with revitron.Transaction():
+    with revitron.Transaction(), mastoron.ConfigStorage().session():
         usedSchemeKeys = set()
         for viewId in affectedViews.keys():
             view = mastoron.Convert.toRevitElement(viewId)
             if not view:
                 continue
             overriddenElements = mastoron.AffectedElements().get(scheme, viewId=viewId)
-            for elementId in overriddenElements:
-                element = mastoron.Convert.toRevitElement(elementId)
-                value = mastoron.GetKey(element,
-                                        scheme[NAME],
-                                        scheme[IS_INSTANCE],
-                                        scheme[PARAM_TYPE])
-                usedSchemeKeys.add(value)
+            elements = [mastoron.Convert.toRevitElement(x) for x in overriddenElements]
+            elementKeys = mastoron.GetKeys([e for e in elements if e],
+                                           scheme[NAME],
+                                           scheme[IS_INSTANCE],
+                                           scheme[PARAM_TYPE])
+            usedSchemeKeys.update(value for element, value in elementKeys)
         
         for key in scheme[DATA].keys():
             if key not in usedSchemeKeys:
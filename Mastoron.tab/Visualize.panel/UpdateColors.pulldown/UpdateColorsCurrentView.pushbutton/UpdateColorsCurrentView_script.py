@@ -16,15 +16,25 @@ overriddenElements = mastoron.AffectedElements().get(scheme, viewId=activeView.I
 if len(overriddenElements) < 1:
     sys.exit()
 
-overriddenElements = [mastoron.Convert.toRevitElement(x) for x in overriddenElements]
+elements = []
+deletedElements = []
+for elementId in overriddenElements:
+    element = mastoron.Convert.toRevitElement(elementId)
+    if element:
+        elements.append(element)
+    else:
+        deletedElements.append(elementId)
 
 filter = revitron.Filter()
 patternId = filter.byClass('FillPatternElement').noTypes().getElementIds()[0]
 
-with revitron.Transaction():
+with revitron.Transaction(), mastoron.ConfigStorage().session():
+    if deletedElements:
+        mastoron.AffectedElements().delete(scheme, activeView.Id, deletedElements)
     mastoron.ColorScheme.apply(activeView,
-                    overriddenElements,
+                    elements,
                     scheme[NAME],
                     scheme[IS_INSTANCE],
                     scheme[PARAM_TYPE],
-                    patternId)
\ No newline at end of file
+                    patternId,
+                    incremental=True)
\ No newline at end of file
@@ -17,11 +17,11 @@ if not scheme[NAME] in mastoron.AffectedViews().affectedViews:
     print('Color scheme "{}" is not applied in any view!'.format(scheme[NAME]))
     sys.exit()
 
-with revitron.Transaction():
+with revitron.Transaction(), mastoron.ConfigStorage().session():
     views = []
     viewsDict = {}
     affectedViews = mastoron.AffectedViews().get(scheme)
-    for viewId in affectedViews.keys():
+    for viewId in list(affectedViews.keys()):
         view = mastoron.Convert.toRevitElement(viewId)
         if not view:
             mastoron.AffectedViews().delete(scheme, viewId)
@@ -41,14 +41,31 @@ with revitron.Transaction():
     filter = revitron.Filter()
     patternId = filter.byClass('FillPatternElement').noTypes().getElementIds()[0]
 
-    for viewId, elementIds in affectedViews.items():
-        if viewId not in viewsDict.values():
+    selectedIds = [viewsDict[name] for name in viewsSelected]
+    selectedViews = []
+    revitElements = {}
+    for viewId in list(affectedViews.keys()):
+        if viewId not in selectedIds:
             continue
         view = mastoron.Convert.toRevitElement(viewId)
-        elements = [mastoron.Convert.toRevitElement(x) for x in elementIds]
-        mastoron.ColorScheme.apply(view,
-                        elements,
-                        scheme[NAME],
-                        scheme[IS_INSTANCE],
-                        scheme[PARAM_TYPE],
-                        patternId)
\ No newline at end of file
+        elementIds = mastoron.AffectedElements().get(scheme, viewId=viewId)
+        elements = []
+        deletedElements = []
+        for elementId in elementIds:
+            if not elementId in revitElements:
+                revitElements[elementId] = mastoron.Convert.toRevitElement(elementId)
+            element = revitElements[elementId]
+            if element:
+                elements.append(element)
+            else:
+                deletedElements.append(elementId)
+        if deletedElements:
+            mastoron.AffectedElements().delete(scheme, viewId, deletedElements)
+        selectedViews.append((view, elements))
+
+    mastoron.ColorScheme.applyMany(selectedViews,
+                    scheme[NAME],
+                    scheme[IS_INSTANCE],
+                    scheme[PARAM_TYPE],
+                    patternId,
+                    incremental=True)
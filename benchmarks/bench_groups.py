@@ -0,0 +1,57 @@
+"""
+Compares grouping 10k elements connected by 10k synthetic overlap pairs by
+repeatedly merging lists that share items, as BooleanSketchBased.mergeLists()
+did before, and by a DisjointSet.
+
+    python benchmarks/bench_groups.py
+"""
+import random
+from common import Measure
+from mastoron.spatial import DisjointSet
+
+
+def MergeLists(lists):
+    out = []
+    while len(lists) > 0:
+        first, rest = set(lists[0]), lists[1:]
+        size = -1
+        while len(first) > size:
+            size = len(first)
+            remaining = []
+            for other in rest:
+                if first.intersection(other):
+                    first |= set(other)
+                else:
+                    remaining.append(other)
+            rest = remaining
+        out.append(first)
+        lists = rest
+    return out
+
+
+def Group(lists):
+    groups = DisjointSet()
+    for items in lists:
+        groups.add(items[0])
+        for item in items[1:]:
+            groups.union(items[0], item)
+    return groups.getGroups()
+
+
+random.seed(5)
+count = 10000
+for rate in (0.5, 0.9, 1.0):
+    # Chains of neighbours overlap, like floor pieces along a facade.
+    pairs = [(i, i + 1) for i in range(count - 1) if random.random() < rate]
+    lists = dict((i, [i]) for i in range(count))
+    for a, b in pairs:
+        lists[a].append(b)
+        lists[b].append(a)
+    lists = list(lists.values())
+    random.shuffle(lists)
+    groups = Group(lists)
+    assert sorted(sorted(group) for group in groups) == \
+        sorted(sorted(group) for group in MergeLists(lists))
+    print('{} elements, {} pairs, {} groups:'.format(count, len(pairs), len(groups)))
+    print('    merge lists:  {:9.1f} ms'.format(Measure(lambda: MergeLists(lists), 1)))
+    print('    disjoint set: {:9.1f} ms'.format(Measure(lambda: Group(lists), 3)))
@@ -0,0 +1,48 @@
+"""
+Compares the size and the load time of overridden element ids stored as lists
+of strings and stored by EncodeIds(). 100k ids are spread over 10 views.
+
+    python benchmarks/bench_ids.py
+"""
+import json
+import json.decoder
+import json.scanner
+import random
+from common import Measure
+from mastoron.storage import EncodeIds, DecodeIds
+
+random.seed(1)
+views = {}
+for view in range(10):
+    start = random.randint(300000, 2000000)
+    ids = sorted(set(start + random.randint(0, 40000) for i in range(11000)))[:10000]
+    views[str(view)] = ids
+
+strings = {'Area': dict((k, [str(x) for x in ids]) for k, ids in views.items())}
+delta = {'Area': dict((k, EncodeIds(ids, compress=False)) for k, ids in views.items())}
+compressed = {'Area': dict((k, EncodeIds(ids)) for k, ids in views.items())}
+rawStrings = json.dumps(strings)
+rawCompressed = json.dumps(compressed)
+
+for ids in views.values():
+    assert DecodeIds(EncodeIds(ids)) == [str(x) for x in ids]
+
+print('size strings:            {:>9} bytes'.format(len(rawStrings)))
+print('size delta:              {:>9} bytes'.format(len(json.dumps(delta))))
+print('size delta + zlib:       {:>9} bytes'.format(len(rawCompressed)))
+print('dump strings:            {:9.1f} ms'.format(Measure(lambda: json.dumps(strings))))
+print('dump encoded:            {:9.1f} ms'.format(Measure(lambda: json.dumps(
+    {'Area': dict((k, EncodeIds(ids)) for k, ids in views.items())}))))
+print('load strings:            {:9.1f} ms'.format(Measure(lambda: json.loads(rawStrings))))
+print('load encoded + decode:   {:9.1f} ms'.format(Measure(lambda: [
+    DecodeIds(x) for x in json.loads(rawCompressed)['Area'].values()])))
+
+# IronPython has no C accelerated JSON parser.
+decoder = json.JSONDecoder()
+decoder.parse_string = json.decoder.py_scanstring
+decoder.scan_once = json.scanner.py_make_scanner(decoder)
+print('pure Python JSON parser:')
+print('load strings:            {:9.1f} ms'.format(Measure(lambda: decoder.decode(rawStrings), 2)))
+print('load encoded:            {:9.1f} ms'.format(Measure(lambda: decoder.decode(rawCompressed), 2)))
+print('load encoded + decode:   {:9.1f} ms'.format(Measure(lambda: [
+    DecodeIds(x) for x in decoder.decode(rawCompressed)['Area'].values()], 2)))
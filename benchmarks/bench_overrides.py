@@ -0,0 +1,91 @@
+"""
+Compares the shared OverrideGraphicSettings of ElementOverrides.set() and clear()
+with allocating and configuring new settings for every element.
+30k elements are colored with 12 colors on a stand-in view that only records
+the applied settings. The Revit API is replaced by the stand-ins of tests/conftest.py.
+
+    python benchmarks/bench_overrides.py
+"""
+import os
+import sys
+
+# Registers the stand-ins for the Revit API and loads the whole package.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+import conftest
+import revitron
+import mastoron
+from common import Measure
+
+
+class OverrideGraphicSettings(revitron.DB.OverrideGraphicSettings):
+
+    created = 0
+
+    def __init__(self):
+        OverrideGraphicSettings.created += 1
+
+
+class ElementId(object):
+
+    def __init__(self, value):
+        self.IntegerValue = value
+
+
+class Element(object):
+
+    def __init__(self, elementId):
+        self.Id = ElementId(elementId)
+
+
+class View(object):
+
+    def __init__(self):
+        self.settings = set()
+
+    def SetElementOverrides(self, elementId, settings):
+        self.settings.add(settings)
+
+
+def Allocate(view, element, color, patternId):
+    """
+    Sets and clears the overrides of an element the way ElementOverrides did
+    before the settings were shared.
+    """
+    overrides = revitron.DB.OverrideGraphicSettings()
+    patternColor = revitron.DB.Color(color[0], color[1], color[2])
+    x = 0.7
+    lineColor = revitron.DB.Color(color[0] * x, color[1] * x, color[2] * x)
+    overrides.SetSurfaceForegroundPatternColor(patternColor)
+    overrides.SetSurfaceForegroundPatternId(patternId)
+    overrides.SetProjectionLineColor(lineColor)
+    overrides.SetCutForegroundPatternColor(patternColor)
+    overrides.SetCutForegroundPatternId(patternId)
+    view.SetElementOverrides(element.Id, overrides)
+    view.SetElementOverrides(element.Id, revitron.DB.OverrideGraphicSettings())
+
+
+def Share(view, element, color, patternId):
+    mastoron.ElementOverrides(view, element).set(color, patternId)
+    mastoron.ElementOverrides(view, element).clear()
+
+
+revitron.DB.OverrideGraphicSettings = OverrideGraphicSettings
+count = 30000
+patternId = ElementId(5)
+elements = [Element(i) for i in range(count)]
+colors = [(i * 20, 120, 200) for i in range(12)]
+
+print('{} elements, {} colors'.format(count, len(colors)))
+for name, function in (('per element', Allocate), ('shared', Share)):
+    view = View()
+    OverrideGraphicSettings.created = 0
+
+    def run():
+        for i, element in enumerate(elements):
+            function(view, element, colors[i % len(colors)], patternId)
+
+    duration = Measure(run, 1)
+    print('{}:'.format(name))
+    print('  settings objects created:    {:>9}'.format(OverrideGraphicSettings.created))
+    print('  settings objects applied:    {:>9}'.format(len(view.settings)))
+    print('  time per set and clear:      {:9.2f} us'.format(duration * 1000 / count))
@@ -0,0 +1,25 @@
+"""
+Measures the union of random overlapping rectangles, like floor pieces 
+created from masses, and checks the area against a union of unit cells.
+
+    python benchmarks/bench_polygon.py
+"""
+import random
+from common import Measure
+from mastoron.polygon import PolygonUnion, SignedArea
+
+random.seed(11)
+for count in (200, 2000, 5000):
+    rectangles = [(random.randint(0, 400), random.randint(0, 400),
+        random.randint(2, 20), random.randint(2, 20)) for i in range(count)]
+    polygons = [[[(x, y), (x + w, y), (x + w, y + d), (x, y + d)]]
+        for x, y, w, d in rectangles]
+    result = PolygonUnion(polygons)
+    cells = set()
+    for x, y, w, d in rectangles:
+        cells.update((i, j) for i in range(x, x + w) for j in range(y, y + d))
+    area = sum(SignedArea(ring) for polygon in result for ring in polygon)
+    assert abs(area - len(cells)) < 1e-6
+    holes = sum(len(polygon) - 1 for polygon in result)
+    print('{} rectangles, {} polygons, {} holes: {:9.1f} ms'.format(
+        count, len(result), holes, Measure(lambda: PolygonUnion(polygons), 1)))
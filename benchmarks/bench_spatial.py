@@ -0,0 +1,39 @@
+"""
+Compares finding all overlapping pairs of synthetic floor sized boxes by testing
+every pair of boxes and by a BoxIndex.
+
+    python benchmarks/bench_spatial.py
+"""
+import random
+from common import Measure
+from mastoron.spatial import BoxIndex, BoxesOverlap
+
+TOLERANCE = 0.001
+
+
+def AllPairs(boxes):
+    keys = list(boxes.keys())
+    pairs = []
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            if BoxesOverlap(boxes[keys[i]], boxes[keys[j]], TOLERANCE):
+                pairs.append((keys[i], keys[j]))
+    return pairs
+
+
+random.seed(3)
+for count in (1000, 3000):
+    boxes = {}
+    for i in range(count):
+        x, y = random.uniform(0, 300), random.uniform(0, 300)
+        z = random.choice([0, 10, 20, 30])
+        boxes[i] = ((x, y, z), (x + random.uniform(2, 12), y + random.uniform(2, 12), z + 0.5))
+    # One large slab covers the whole site.
+    boxes['slab'] = ((0, 0, 0), (300, 300, 0.5))
+    expected = set(frozenset(pair) for pair in AllPairs(boxes))
+    pairs = BoxIndex.fromBoxes(boxes).getPairs(TOLERANCE)
+    assert set(frozenset(pair) for pair in pairs) == expected
+    print('{} boxes, {} overlapping pairs:'.format(count, len(pairs)))
+    print('    all pairs:  {:9.1f} ms'.format(Measure(lambda: AllPairs(boxes), 1)))
+    print('    grid index: {:9.1f} ms'.format(Measure(
+        lambda: BoxIndex.fromBoxes(boxes).getPairs(TOLERANCE), 3)))
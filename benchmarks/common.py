@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+import types
+
+LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+
+# The package __init__ imports the Revit API. Benchmarks of the pure Python
+# modules load them from the package directory without running it.
+if 'mastoron' not in sys.modules:
+    package = types.ModuleType('mastoron')
+    package.__path__ = [os.path.join(LIB, 'mastoron')]
+    sys.modules['mastoron'] = package
+
+
+def Measure(function, repeat=5):
+    """
+    Measures the average run time of a function.
+
+    Args:
+        function (function): The function to call without arguments
+        repeat (int, optional): The number of runs. Defaults to 5.
+
+    Returns:
+        float: The average run time in milliseconds
+    """
+    start = time.time()
+    for i in range(repeat):
+        function()
+    return (time.time() - start) / repeat * 1000
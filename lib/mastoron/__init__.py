@@ -4,8 +4,12 @@ from mastoron.level import *
 from mastoron.extract import *
 from mastoron.create import *
 from mastoron.colors import *
+from mastoron.gradient import *
 from mastoron.parameter import *
 from mastoron.view import *
 from mastoron.ui import *
 from mastoron.convert import *
+from mastoron.storage import *
 from mastoron.document import *
+from mastoron.polygon import *
+from mastoron.spatial import *
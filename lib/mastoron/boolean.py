@@ -1,38 +1,292 @@
 import revitron
 import mastoron
 from revitron import _
+from collections import defaultdict
+from mastoron.variables import FLOOR_OFFSET, ROOF_OFFSET, CEILING_OFFSET
+from mastoron.polygon import UNION, DIFFERENCE, INTERSECT
 from System.Collections.Generic import List
 
 
 class BooleanSketchBased(object):
     """
     Base class for boolean operations on sketch based elements.
+
+    All elements are processed in one pipeline: 
+    intersecting elements are grouped and their solids are united. 
+    For the ``DIFFERENCE`` and ``INTERSECT`` operations the united solid of each group is 
+    then cut by or intersected with the united solids of all cutters that overlap the group.
+    Finally the resulting solid is split into its separate volumes and a new element 
+    is created from the bottom face of every volume by :meth:`createElement`. 
+    The elements of a group are deleted in one pass once all of its new elements 
+    have been created.
+
+    Groups without overlapping cutters are left untouched for ``DIFFERENCE`` and 
+    ``INTERSECT``. Elements that could not be merged, and groups of which nothing is left 
+    after the cut, are collected in ``self.failed`` and are not deleted. 
+    Cutters that could not be used are collected in ``self.failedCutters``.
+
+    Unions of elements that share their bottom and top elevation and are bounded 
+    by straight lines only skip the solid booleans. Their boundaries are united 
+    as 2D polygons instead, see :func:`mastoron.polygon.PolygonUnion`.
     """
-    def __init__(self, elements):
+
+    # Bounding boxes closer than this distance in feet are tested for intersections.
+    TOLERANCE = 0.001
+
+    # Roles of elements that failed, see addFailed().
+    SOURCE = 'source'
+    CUTTER = 'cutter'
+
+    def __init__(self, elements, elementType=None, operation=UNION, cutters=None):
         """
         Inits a new BooleaSketchBased instance.
 
         Args:
             elements (object): A list of Revit elements
+            elementType (object, optional): The id of the Revit type of the new elements. Defaults to the type of the first element of each group.
+            operation (string, optional): ``UNION``, ``DIFFERENCE`` or ``INTERSECT``. Defaults to ``UNION``.
+            cutters (object, optional): A list of Revit elements like masses to cut the elements with. Defaults to None.
         """
         filter = revitron.Filter()
         levels = filter.byCategory('Levels').noTypes().getElements()
+        self.elementType = elementType
+        self.operation = operation
+        self.cutters = cutters or []
+        self.cutterIndex = mastoron.BoxIndex.fromElements(self.cutters)
         intersections = self.getIntersects(elements)
-        idStrings = self.toIdStrings(intersections)
-        groups = self.mergeLists(idStrings)
-        groups = self.toElements(groups)
+        groups = self.mergeLists(intersections)
         self.newElements = []
+        self.failed = []
+        self.failedCutters = []
         for group in groups:
+            if operation == UNION:
+                newElements = self.makePlanarUnion(group, levels)
+                if newElements is not None:
+                    self.newElements.append(newElements)
+                    continue
             newSolid = self.makeBoolean(group)
-            face = mastoron.FaceExtractor(newSolid).getBottomFace()
-            level = mastoron.Level.getLevel(group[0], levels)
-            curveLoops = mastoron.BorderExtractor(face).getBorder()
-            # curveLoop = List[revitron.DB.CurveLoop]([curveLoop])
-            self.newElements.append({'loop': curveLoops, 'level': level})
+            if newSolid and operation != UNION:
+                newSolid = self.cut(newSolid, group)
+            if not newSolid:
+                continue
+            failed = set(str(element.Id) for element in self.failed)
+            replaced = [element for element in group if not str(element.Id) in failed]
+            if not newSolid.Volume > 0:
+                # Nothing is left of the group, for example when it doesn't 
+                # intersect the cutters at all.
+                self.addFailed(replaced)
+                continue
+            newElements = self.splitSolid(newSolid, group[0], replaced, levels)
+            if not newElements:
+                self.addFailed(replaced)
+                continue
+            self.newElements.append(newElements)
+        self.created = self.recreate()
+
+    def createElement(self, newElement):
+        """
+        Creates a new Revit element. Implemented by the category specific subclasses.
+
+        Args:
+            newElement (dict): A dict with the curve loops, level, bottom and top elevation, source element and replaced elements
+
+        Returns:
+            object: The new Revit element
+        """
+        raise NotImplementedError()
+
+    def recreate(self):
+        """
+        Creates the new elements and deletes the elements they replace, 
+        one deletion per group. The new elements of a group are a unit, in case 
+        one of them can't be created, the others are deleted again and the 
+        elements of the group are kept.
+
+        Returns:
+            object: A list of the new Revit elements
+        """
+        created = []
+        for newElements in self.newElements:
+            groupCreated = []
+            for newElement in newElements:
+                try:
+                    element = self.createElement(newElement)
+                except Exception:
+                    element = None
+                if not element:
+                    break
+                groupCreated.append(element)
+            replaced = newElements[0]['elements']
+            if len(groupCreated) < len(newElements):
+                if groupCreated:
+                    revitron.DOC.Delete(List[revitron.DB.ElementId](
+                        [element.Id for element in groupCreated]))
+                self.addFailed(replaced)
+                continue
+            created += groupCreated
+            ids = [item.Id for item in replaced]
+            if ids:
+                revitron.DOC.Delete(List[revitron.DB.ElementId](ids))
+        return created
+
+    def getElementType(self, newElement):
+        """
+        Gets the id of the Revit type of a new element.
+
+        Args:
+            newElement (dict): A dict with the curve loops, level, bottom and top elevation, source element and replaced elements
+
+        Returns:
+            object: A Revit element id
+        """
+        if self.elementType:
+            return self.elementType
+        return newElement['source'].GetTypeId()
+
+    def splitSolid(self, solid, source, elements, levels):
+        """
+        Splits a solid into its separate volumes, since a difference or an intersection 
+        often leaves several pieces. Every volume becomes a new element that is created 
+        from its bottom face.
+
+        Args:
+            solid (solid): A Revit solid
+            source (object): The Revit element the solid was created from
+            elements (object): The list of Revit elements the new elements replace
+            levels (object): A list of Revit levels
+
+        Returns:
+            list: A list of dicts describing the new elements or None if the solid can't be split
+        """
+        try:
+            volumes = revitron.DB.SolidUtils.SplitVolumes(solid)
+        except Exception:
+            return None
+        level = mastoron.Level.getLevel(source, levels)
+        uv = revitron.DB.UV(0.5, 0.5)
+        newElements = []
+        for volume in volumes:
+            if not volume.Volume > 0:
+                continue
+            extractor = mastoron.FaceExtractor(volume)
+            face = extractor.getBottomFace()
+            newElements.append({
+                'loop': mastoron.BorderExtractor(face).getBorder(),
+                'level': level,
+                'bottom': face.Evaluate(uv).Z,
+                'top': extractor.getTopFace().Evaluate(uv).Z,
+                'source': source,
+                'elements': elements
+            })
+        return newElements or None
+
+    def makePlanarUnion(self, elements, levels):
+        """
+        Unites the boundaries of elements that share their bottom and top elevation 
+        as 2D polygons. Every resulting polygon becomes a new element, together
+        they replace the given elements.
+
+        Args:
+            elements (object): A list of Revit elements
+            levels (object): A list of Revit levels
+
+        Returns:
+            list: A list of dicts describing the new elements or None if the elements
+            are not planar, don't share their elevations, are bounded by curves or the
+            union is empty
+        """
+        bottom, top = None, None
+        polygons = []
+        for element in elements:
+            bbox = _(element).getBbox()
+            if bottom is None:
+                bottom, top = bbox.Min[2], bbox.Max[2]
+            if abs(bbox.Min[2] - bottom) > self.TOLERANCE or abs(bbox.Max[2] - top) > self.TOLERANCE:
+                return None
+            face = mastoron.FaceExtractor(element).getBottomFace()
+            if not face:
+                return None
+            polygon = []
+            for curveLoop in mastoron.BorderExtractor(face).getBorder():
+                ring = []
+                for curve in curveLoop:
+                    if not isinstance(curve, revitron.DB.Line):
+                        return None
+                    point = curve.GetEndPoint(0)
+                    if abs(point.Z - bottom) > self.TOLERANCE:
+                        return None
+                    ring.append((point.X, point.Y))
+                polygon.append(ring)
+            polygons.append(polygon)
+
+        level = mastoron.Level.getLevel(elements[0], levels)
+        newElements = []
+        try:
+            for polygon in mastoron.PolygonUnion(polygons):
+                curveLoops = List[revitron.DB.CurveLoop]()
+                for ring in polygon:
+                    curveLoop = revitron.DB.CurveLoop()
+                    for i in range(len(ring)):
+                        curveLoop.Append(revitron.DB.Line.CreateBound(
+                            revitron.DB.XYZ(ring[i - 1][0], ring[i - 1][1], bottom),
+                            revitron.DB.XYZ(ring[i][0], ring[i][1], bottom)))
+                    curveLoops.Add(curveLoop)
+                newElements.append({
+                    'loop': curveLoops,
+                    'level': level,
+                    'bottom': bottom,
+                    'top': top,
+                    'source': elements[0],
+                    'elements': list(elements)
+                })
+        except Exception:
+            return None
+        return newElements or None
+
+    def cut(self, solid, elements):
+        """
+        Cuts a solid with or intersects it with the united solids of all cutters 
+        that overlap the given elements, depending on the operation.
+
+        Args:
+            solid (solid): A Revit solid
+            elements (object): The list of Revit elements the solid was created from
+
+        Returns:
+            solid: The resulting solid or None if no cutter overlaps or the operation failed
+        """
+        boxMin, boxMax = None, None
+        for element in elements:
+            bbox = _(element).getBbox()
+            if boxMin is None:
+                boxMin = [bbox.Min[i] for i in range(3)]
+                boxMax = [bbox.Max[i] for i in range(3)]
+            for i in range(3):
+                boxMin[i] = min(boxMin[i], bbox.Min[i])
+                boxMax[i] = max(boxMax[i], bbox.Max[i])
+        keys = self.cutterIndex.query(boxMin, boxMax, self.TOLERANCE)
+        cutters = [cutter for cutter in self.cutters if str(cutter.Id) in keys]
+        if not cutters:
+            return None
+        cutterSolid = self.makeBoolean(cutters, self.CUTTER)
+        if not cutterSolid:
+            return None
+        boolType = getattr(revitron.DB.BooleanOperationsType, self.operation)
+        try:
+            return revitron.DB.BooleanOperationsUtils.ExecuteBooleanOperation(
+                                                                            solid,
+                                                                            cutterSolid,
+                                                                            boolType
+                                                                            )
+        except Exception:
+            self.addFailed(elements)
+            return None
 
     def getIntersects(self, elements):
         """
         Gets all intersecting elements for each input element.
+        Elements are only tested for intersections with elements 
+        that have overlapping bounding boxes, see :class:`mastoron.spatial.BoxIndex`.
 
         Args:
             elements (object): A list of Revit elements 
@@ -40,135 +294,275 @@ class BooleanSketchBased(object):
         Returns:
             object: A list of lists containing the intersecting elements
         """
+        index = mastoron.BoxIndex.fromElements(elements)
+        elementsById = dict((str(element.Id), element) for element in elements)
+        candidates = defaultdict(list)
+        for a, b in index.getPairs(self.TOLERANCE):
+            candidates[a].append(elementsById[b])
+            candidates[b].append(elementsById[a])
         groups = []
         for element in elements:
             group = [element]
-            for intersected in revitron.Filter(elements).byIntersection(element).getElements():
-                group.append(intersected)
+            others = candidates.get(str(element.Id))
+            if others:
+                for intersected in revitron.Filter(others).byIntersection(element).getElements():
+                    group.append(intersected)
             
             groups.append(group)
         return groups
 
-    def toIdStrings(self, nestedList):
+    def mergeLists(self, lists):
         """
-        Convert Revit elements to element ids as strings.
+        Combines all lists with shared elements into one list.
+        List that do not share elements will remain separate.
+        Elements are compared by their ids, see :class:`mastoron.spatial.DisjointSet`.
 
         Args:
-            nestedList (object): A list of lists of Revit elements
+            lists (object): A list of lists containing Revit elements
 
         Returns:
-            string: A list of lists of element ids as strings
+            object: A list of lists with no shared elements inbetween lists
         """
-        out = []
-        for list in nestedList:
+        elements = {}
+        groups = mastoron.DisjointSet()
+        for list in lists:
             ids = []
-            for item in list:
-                ids.append(str(item.Id))
-            out.append(ids)
-        return out
+            for element in list:
+                elementId = str(element.Id)
+                elements.setdefault(elementId, element)
+                ids.append(elementId)
+            if not ids:
+                continue
+            groups.add(ids[0])
+            for elementId in ids[1:]:
+                groups.union(ids[0], elementId)
+        return [[elements[elementId] for elementId in group] for group in groups.getGroups()]
 
-    def toElements(self, nestedList):
+    def makeBoolean(self, elements, role=SOURCE):
         """
-        Converts strings of element ids to revit elements.
+        Performs a boolean union operation on all solids of a list of elements.
+
+        The solids of every element are united first, so an element is either 
+        completely part of the result or not at all. The elements are then sorted 
+        by their position and united pairwise with their neighbours, then the results 
+        are united pairwise again until one solid is left. This keeps the intermediate 
+        solids small. Failing unions are retried with swapped operands. Pairs that 
+        still can't be united leave the tree and are united with the largest result 
+        at the end. Solids that fail again are skipped and their elements are 
+        added to the failed elements of the given role, see :meth:`addFailed`.
 
         Args:
-            nestedList (string): A list of lists of element ids as strings
+            elements (object): A list of Revit elements
+            role (string, optional): ``SOURCE`` or ``CUTTER``. Defaults to ``SOURCE``.
 
         Returns:
-            object: A list of lists of Revit elements
+            solid: The resulting solid or None if no element has a solid
         """
-        out = []
-        for list in nestedList:
-            elements = []
-            for item in list:
-                elements.append(mastoron.Convert.toRevitElement(item))
-            out.append(elements)
-        return out
+        parts = []
+        for element in self.sortByPosition(elements):
+            solids = [solid for solid in _(element).getGeometry().getSolids() 
+                if solid.Volume > 0]
+            part = None
+            if solids:
+                part = (solids[0], [element])
+            for solid in solids[1:]:
+                united = self.unite(part, (solid, [element]))
+                if not united:
+                    part = None
+                    break
+                part = (united[0], [element])
+            if part:
+                parts.append(part)
+            else:
+                self.addFailed([element], role)
 
-    def mergeLists(self, lists):
+        skipped = []
+        while len(parts) > 1:
+            merged = []
+            for i in range(0, len(parts) - 1, 2):
+                part = self.unite(parts[i], parts[i + 1])
+                if part:
+                    merged.append(part)
+                else:
+                    # The same pair would fail again on the next level.
+                    skipped += [parts[i], parts[i + 1]]
+            if len(parts) % 2:
+                merged.append(parts[-1])
+            parts = merged
+
+        parts += skipped
+        if not parts:
+            return None
+        # Unite the parts that could not be united with their neighbours
+        # with the largest part or skip them.
+        parts.sort(key=lambda part: len(part[1]), reverse=True)
+        result = parts[0]
+        for part in parts[1:]:
+            united = self.unite(result, part)
+            if united:
+                result = united
+            else:
+                self.addFailed(part[1], role)
+        return result[0]
+
+    def unite(self, a, b):
         """
-        Combines all lists with shared items into one list.
-        List that do not share items will remain separate.
+        Unites two solids. 
 
         Args:
-            lists (string): A list of lists containing strings
+            a (tuple): A tuple of a solid and the list of its source elements
+            b (tuple): A tuple of a solid and the list of its source elements
 
         Returns:
-            string: A list of lists with no shared items inbetween lists
+            tuple: A tuple of the united solid and its source elements or None on failure
         """
-        out = []
-        while len(lists)>0:
-            first, rest = lists[0], lists[1:]
-            first = set(first)
+        BooleanOperationsUtils = revitron.DB.BooleanOperationsUtils
+        boolType = revitron.DB.BooleanOperationsType.Union
+        for first, second in [(a[0], b[0]), (b[0], a[0])]:
+            try:
+                solid = BooleanOperationsUtils.ExecuteBooleanOperation(
+                                                                    first,
+                                                                    second,
+                                                                    boolType
+                                                                    )
+            except Exception:
+                continue
+            if solid:
+                return (solid, a[1] + b[1])
+        return None
 
-            lf = -1
-            while len(first)>lf:
-                lf = len(first)
+    def addFailed(self, elements, role=SOURCE):
+        """
+        Adds elements to the list of elements that could not be merged. 
+        Source elements are collected in ``self.failed`` and are not deleted, 
+        cutters are collected in ``self.failedCutters``.
 
-                rest2 = []
-                for r in rest:
-                    if len(first.intersection(set(r)))>0:
-                        first |= set(r)
-                    else:
-                        rest2.append(r)     
-                rest = rest2
-            out.append(list(first))
-            lists = rest
-        return out
+        Args:
+            elements (object): A list of Revit elements
+            role (string, optional): ``SOURCE`` or ``CUTTER``. Defaults to ``SOURCE``.
+        """
+        failed = self.failed
+        if role == self.CUTTER:
+            failed = self.failedCutters
+        ids = set(str(element.Id) for element in failed)
+        for element in elements:
+            if not str(element.Id) in ids:
+                ids.add(str(element.Id))
+                failed.append(element)
 
-    def makeBoolean(self, elements):
+    @staticmethod
+    def sortByPosition(elements):
         """
-        Performs a boolean union operation on a list of solids.
+        Sorts elements by the center of their bounding boxes along the axis 
+        with the largest spread, so that neighbours in the list are close to each other.
 
         Args:
-            elements (solid): A list of Revit solids
+            elements (object): A list of Revit elements
 
         Returns:
-            solid: The resulting solid
+            object: The sorted list of Revit elements
         """
-        newSolid = _(elements[0]).getGeometry().getSolids()[0]
-        boolType = revitron.DB.BooleanOperationsType.Union
-        BooleanOperationsUtils = revitron.DB.BooleanOperationsUtils
-        for element in elements[1:]:
-            solid = _(element).getGeometry().getSolids()[0]
-            newSolid = BooleanOperationsUtils.ExecuteBooleanOperation(
-                                                                newSolid,
-                                                                solid,
-                                                                boolType
-                                                                )
-        return newSolid
+        centers = {}
+        for element in elements:
+            bbox = _(element).getBbox()
+            centers[str(element.Id)] = [(bbox.Min[i] + bbox.Max[i]) / 2.0 for i in range(3)]
+        if not centers:
+            return []
+        spreads = [max(c[i] for c in centers.values()) - min(c[i] for c in centers.values()) 
+            for i in range(3)]
+        axis = spreads.index(max(spreads))
+        return sorted(elements, key=lambda element: centers[str(element.Id)][axis])
 
 
 class BooleanFloors(BooleanSketchBased):
     """
     Class for boolean operations on floor elements.
     """
-    def __init__(self, floors, floorType):
+    def __init__(self, floors, floorType=None, operation=UNION, cutters=None):
         """
         Inits a new BooleanFloor instance that booleans all input floors.
-        Deletes input floors.
+        Deletes input floors except the floors that could not be merged, 
+        see ``self.failed``.
 
         Args:
             floors (object): A list of Revit floors
-            floorType (object): A Revit floor type
+            floorType (object, optional): The id of a Revit floor type. Defaults to the type of the first floor of each group.
+            operation (string, optional): ``UNION``, ``DIFFERENCE`` or ``INTERSECT``. Defaults to ``UNION``.
+            cutters (object, optional): A list of Revit elements to cut the floors with. Defaults to None.
         """
-        super(BooleanFloors, self).__init__(floors)
-        for element in self.newElements:
-            revitron.DB.Floor.Create(
-                                    revitron.DOC,
-                                    element['loop'],
-                                    floorType,
-                                    element['level'].Id
-                                    )
-        for item in floors:
-            _(item).delete()
+        super(BooleanFloors, self).__init__(floors, floorType, operation, cutters)
+
+    def createElement(self, newElement):
+        floor = revitron.DB.Floor.Create(
+                                        revitron.DOC,
+                                        newElement['loop'],
+                                        self.getElementType(newElement),
+                                        newElement['level'].Id
+                                        )
+        _(floor).set(FLOOR_OFFSET, newElement['top'] - newElement['level'].Elevation)
+        return floor
 
 
 class BooleanRoof(BooleanSketchBased):
-    def __init__(self):
-        super().__init__()
+    """
+    Class for boolean operations on flat footprint roof elements.
+    """
+    def __init__(self, roofs, roofType=None, operation=UNION, cutters=None):
+        """
+        Inits a new BooleanRoof instance that booleans all input roofs.
+        Deletes input roofs except the roofs that could not be merged, 
+        see ``self.failed``.
+
+        Args:
+            roofs (object): A list of Revit roofs
+            roofType (object, optional): The id of a Revit roof type. Defaults to the type of the first roof of each group.
+            operation (string, optional): ``UNION``, ``DIFFERENCE`` or ``INTERSECT``. Defaults to ``UNION``.
+            cutters (object, optional): A list of Revit elements to cut the roofs with. Defaults to None.
+        """
+        super(BooleanRoof, self).__init__(roofs, roofType, operation, cutters)
+
+    def createElement(self, newElement):
+        import clr
+        curveArray = revitron.DB.CurveArray()
+        for curveLoop in newElement['loop']:
+            for curve in curveLoop:
+                curveArray.Append(curve)
+        ModelCurveArray = revitron.DB.ModelCurveArray
+        modelCurveArray = clr.StrongBox[ModelCurveArray](ModelCurveArray())
+        roof = revitron.DOC.Create.NewFootPrintRoof(
+                                        curveArray,
+                                        newElement['level'],
+                                        revitron.DOC.GetElement(self.getElementType(newElement)),
+                                        modelCurveArray
+                                        )
+        _(roof).set(ROOF_OFFSET, newElement['bottom'] - newElement['level'].Elevation)
+        return roof
 
 
 class BooleanCeiling(BooleanSketchBased):
-    def __init__(self):
-        super().__init__()
\ No newline at end of file
+    """
+    Class for boolean operations on ceiling elements.
+    """
+    def __init__(self, ceilings, ceilingType=None, operation=UNION, cutters=None):
+        """
+        Inits a new BooleanCeiling instance that booleans all input ceilings.
+        Deletes input ceilings except the ceilings that could not be merged, 
+        see ``self.failed``.
+
+        Args:
+            ceilings (object): A list of Revit ceilings
+            ceilingType (object, optional): The id of a Revit ceiling type. Defaults to the type of the first ceiling of each group.
+            operation (string, optional): ``UNION``, ``DIFFERENCE`` or ``INTERSECT``. Defaults to ``UNION``.
+            cutters (object, optional): A list of Revit elements to cut the ceilings with. Defaults to None.
+        """
+        super(BooleanCeiling, self).__init__(ceilings, ceilingType, operation, cutters)
+
+    def createElement(self, newElement):
+        ceiling = revitron.DB.Ceiling.Create(
+                                        revitron.DOC,
+                                        newElement['loop'],
+                                        self.getElementType(newElement),
+                                        newElement['level'].Id
+                                        )
+        _(ceiling).set(CEILING_OFFSET, newElement['bottom'] - newElement['level'].Elevation)
+        return ceiling
@@ -1,13 +1,23 @@
 import revitron
 import mastoron
 import colorsys
+import hashlib
 import os
 import json
 from revitron import _
 from pyrevit import forms
-from collections import defaultdict
-from mastoron.variables import MASTORON_COLORSCHEME
-from mastoron.variables import DATA, IS_INSTANCE, NAME, PARAM_TYPE
+from collections import OrderedDict
+from mastoron.variables import MASTORON_COLORSCHEME, MASTORON_FILTERS, MASTORON_STABLE_COLORS
+from mastoron.variables import BINS, DATA, IS_INSTANCE, NAME, PARAM_TYPE
+
+# Name index of the color scheme list that was read last, see ColorScheme.
+_schemeIndex = {'source': None, 'index': OrderedDict()}
+
+# Override settings by key of the color schemes that were applied last, see ColorScheme.getLookup().
+_schemeLookups = {}
+
+# Candidate colors and cached palettes, see Palette.
+_palettes = {'candidates': None, 'palettes': {}}
 
 
 class Color:
@@ -32,12 +42,99 @@ class Color:
         Returns:
             tuple: A color in rgb format
         """
-        return tuple(round(i * 255) for i in colorsys.hsv_to_rgb(hsv[0], hsv[1], hsv[2]))
+        return tuple(int(round(i * 255)) for i in colorsys.hsv_to_rgb(hsv[0], hsv[1], hsv[2]))
 
     @staticmethod
     def RGBtoHEX(rgb):
         return '%02x%02x%02x' % rgb
 
+    @staticmethod
+    def RGBtoLinear(rgb):
+        """
+        Converts a sRGB color to linear RGB.
+
+        Args:
+            rgb (tuple): The rgb color with values from 0 to 255
+
+        Returns:
+            tuple: The linear rgb color with values from 0 to 1
+        """
+        def linear(value):
+            value = value / 255.0
+            if value <= 0.04045:
+                return value / 12.92
+            return ((value + 0.055) / 1.055) ** 2.4
+
+        return tuple(linear(value) for value in rgb)
+
+    @staticmethod
+    def LinearToRGB(linear):
+        """
+        Converts a linear RGB color to sRGB. Values out of gamut are clipped.
+
+        Args:
+            linear (tuple): The linear rgb color with values from 0 to 1
+
+        Returns:
+            tuple: The rgb color with integer values from 0 to 255
+        """
+        def gamma(value):
+            value = min(max(value, 0.0), 1.0)
+            if value <= 0.0031308:
+                value = value * 12.92
+            else:
+                value = 1.055 * value ** (1 / 2.4) - 0.055
+            return int(round(value * 255))
+
+        return tuple(gamma(value) for value in linear)
+
+    @staticmethod
+    def RGBtoLAB(rgb):
+        """
+        Converts a sRGB color to CIELAB (D65 white point).
+
+        Args:
+            rgb (tuple): The rgb color
+
+        Returns:
+            tuple: The lab color
+        """
+        def f(t):
+            if t > 0.008856:
+                return t ** (1.0 / 3)
+            return 7.787 * t + 16.0 / 116
+
+        r, g, b = Color.RGBtoLinear(rgb)
+        x = f((0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047)
+        y = f(0.2126 * r + 0.7152 * g + 0.0722 * b)
+        z = f((0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883)
+        return (116 * y - 16, 500 * (x - y), 200 * (y - z))
+
+    @staticmethod
+    def LABtoRGB(lab):
+        """
+        Converts a CIELAB color (D65 white point) to sRGB. Values out of gamut are clipped.
+
+        Args:
+            lab (tuple): The lab color
+
+        Returns:
+            tuple: The rgb color
+        """
+        def f(t):
+            if t > 6.0 / 29:
+                return t ** 3
+            return (t - 16.0 / 116) / 7.787
+
+        y = (lab[0] + 16) / 116.0
+        x = f(y + lab[1] / 500.0) * 0.95047
+        z = f(y - lab[2] / 200.0) * 1.08883
+        y = f(y)
+        return Color.LinearToRGB((
+            3.2406 * x - 1.5372 * y - 0.4986 * z,
+            -0.9689 * x + 1.8758 * y + 0.0415 * z,
+            0.0557 * x - 0.2040 * y + 1.0570 * z))
+
     @staticmethod
     def HEXtoRGB(hex):
         """
@@ -56,6 +153,14 @@ class Color:
 class ColorScheme:
     """
     Class for handling relationships between labels and colors.
+
+    New keys get random colors by default. In case the ``mastoron.stablecolors``
+    config item is set, the color of a key is derived from the key itself and is
+    the same in all schemes and documents, see :meth:`Palette.getStable`.
+
+    The color schemes are stored as a list in the ``mastoron.colorschemes`` config item.
+    Every ``ColorScheme`` holds an ordered index of that list by scheme name.
+    The index is shared by all instances as long as the stored list doesn't change.
     """
 
     JSON_PATH = 'C:\\temp\\mastoron\\colorscheme.json'
@@ -66,7 +171,9 @@ class ColorScheme:
         """
         self.COLOR_SCHEMES = 'mastoron.colorschemes'
         self.schemes = mastoron.ConfigStorage().get(
-            self.COLOR_SCHEMES, defaultdict())
+            self.COLOR_SCHEMES, [])
+        self.index = ColorScheme._getIndex(self.schemes)
+        self.stableColors = mastoron.ConfigStorage().get(MASTORON_STABLE_COLORS, False)
         self.defaultColors = [
                             '#F44336', '#E91E63', '#9C27B0', '#673AB7',
                             '#3F51B5', '#2196F3', '#03A9F4', '#00BCD4',
@@ -140,21 +247,17 @@ class ColorScheme:
             if not type(excludeViews) == list:
                 excludeViews = [excludeViews]
 
-        schemes = []
-        for scheme in ColorScheme().schemes:
-            if not scheme[NAME] in excludeSchemes:
-                schemes.append(scheme)
-
-        names = [scheme[NAME] for scheme in schemes]
+        colorScheme = ColorScheme()
+        names = [name for name in colorScheme.index if not name in excludeSchemes]
 
         if excludeViews:
-            for scheme in schemes:
-                for viewId in excludeViews:
-                    try:
-                        if not str(viewId) in mastoron.AffectedViews().get(scheme):
-                            names.remove(scheme[NAME])
-                    except:
-                        names.remove(scheme[NAME])
+            affectedViews = mastoron.AffectedViews().affectedViews
+            filters = mastoron.ConfigStorage().get(MASTORON_FILTERS, {})
+            viewIds = [str(viewId) for viewId in excludeViews]
+            # Only schemes that are applied to every given view are offered.
+            names = [name for name in names if all(
+                viewId in affectedViews.get(name, {}) or viewId in filters.get(name, {})
+                for viewId in viewIds)]
 
         schemeName = forms.CommandSwitchWindow.show(sorted(names),
                 message='Choose Color Scheme:')
@@ -162,14 +265,148 @@ class ColorScheme:
         if not schemeName:
             return None
 
-        return ColorScheme().load(schemeName)
+        return colorScheme.load(schemeName)
 
     @staticmethod
-    def apply(view, elements, schemeName, isInstance, type, patternId):
+    def apply(view, elements, schemeName, isInstance, type, patternId, incremental=False):
         """
         Applies a mastoron color scheme to given elements in given view.
         Updates the colors scheme with new keys and colors.
 
+        The applied colors are stored with the overridden elements. In incremental
+        mode, only elements whose color differs from the stored color are overridden
+        again, unchanged elements are skipped. Elements without a key are only
+        cleared in case they are overridden by this scheme.
+
+        Args:
+            view (object): A Revit view
+            elements (object): A list of Revit elements
+            schemeName (string): The name of the color scheme
+            isInstance (bool): True for instance parameters, false for type parameters
+            type (string): The type of the parameter (Area, Number, Length, etc..)
+            patternId (object): The Revit element id of the fillpattern to use
+            incremental (bool, optional): Skip elements with unchanged colors. Defaults to False.
+
+        Returns:
+            dict: The applied and updated color scheme
+        """
+        return ColorScheme.applyMany([(view, elements)], schemeName, 
+            isInstance, type, patternId, incremental)
+
+    @staticmethod
+    def applyMany(views, schemeName, isInstance, type, patternId, incremental=False):
+        """
+        Applies a mastoron color scheme to the elements of multiple views.
+        The keys of elements that are shown in more than one view are only read once 
+        and the color scheme is only updated and saved once, see :meth:`apply`.
+
+        Example::
+
+            with revitron.Transaction(), mastoron.ConfigStorage().session():
+                mastoron.ColorScheme.applyMany([(view, elements), (otherView, otherElements)],
+                    schemeName, isInstance, type, patternId)
+
+        Args:
+            views (list): A list of (view, elements) tuples
+            schemeName (string): The name of the color scheme
+            isInstance (bool): True for instance parameters, false for type parameters
+            type (string): The type of the parameter (Area, Number, Length, etc..)
+            patternId (object): The Revit element id of the fillpattern to use
+            incremental (bool, optional): Skip elements with unchanged colors. Defaults to False.
+
+        Returns:
+            dict: The applied and updated color scheme
+        """
+        uniqueElements = {}
+        for view, elements in views:
+            for element in elements:
+                uniqueElements.setdefault(str(element.Id), element)
+        elementKeys = mastoron.GetKeys(
+            uniqueElements.values(), schemeName, isInstance, type)
+        keyMap = dict((str(element.Id), key) for element, key in elementKeys)
+        keys = set(key for key in keyMap.values() if key)
+
+        scheme = ColorScheme._extend(schemeName, keys, isInstance)
+        if not scheme:
+            return None
+
+        lookup = ColorScheme.getLookup(scheme, patternId)
+        filterViews = mastoron.FilterOverrides.getViews(scheme)
+        affectedElements = mastoron.AffectedElements()
+
+        for view, elements in views:
+            if str(view.Id) in filterViews:
+                mastoron.FilterOverrides(view).clear(scheme)
+
+            overriddenElements = affectedElements.get(scheme, viewId=view.Id)
+            appliedColors = affectedElements.getColors(scheme, view.Id)
+            changed = []
+
+            for element in elements:
+                elementId = str(element.Id)
+                key = keyMap[elementId]
+                if key:
+                    colorHEX = scheme[DATA][key]
+                    if incremental and elementId in overriddenElements \
+                            and appliedColors.get(elementId) == colorHEX:
+                        continue
+                    view.SetElementOverrides(element.Id, lookup[key])
+                    overriddenElements.add(elementId)
+                    appliedColors[elementId] = colorHEX
+                    changed.append(elementId)
+                else:
+                    if incremental and elementId not in overriddenElements:
+                        continue
+                    mastoron.ElementOverrides(view, element).clear()
+                    overriddenElements.discard(elementId)
+            
+            affectedElements.dump(scheme, view.Id)
+            if changed:
+                affectedElements.forgetColors(scheme, view.Id, changed)
+        return scheme
+
+    @staticmethod
+    def getLookup(scheme, patternId, overrideCutPattern=True):
+        """
+        Gets the override settings for every key of a color scheme. The table is 
+        built once and reused until the data of the scheme or the fill pattern changes.
+        The pattern and line colors are shared by all schemes, 
+        see :meth:`mastoron.view.ElementOverrides.getSettings`.
+
+        Args:
+            scheme (dict): A color scheme
+            patternId (object): The Revit element id of the fillpattern to use
+            overrideCutPattern (bool, optional): Override cut pattern. Defaults to True.
+
+        Returns:
+            dict: A dict of key: OverrideGraphicSettings
+        """
+        signature = (patternId.IntegerValue, bool(overrideCutPattern))
+        cached = _schemeLookups.get(scheme[NAME])
+        if cached and cached['signature'] == signature and cached['data'] == scheme[DATA]:
+            return cached['lookup']
+        lookup = {}
+        for key, color in scheme[DATA].items():
+            lookup[key] = mastoron.ElementOverrides.getSettings(
+                color, patternId, overrideCutPattern)
+        _schemeLookups[scheme[NAME]] = {
+            'signature': signature,
+            'data': dict(scheme[DATA]),
+            'lookup': lookup
+        }
+        return lookup
+
+    @staticmethod
+    def applyFilters(view, elements, schemeName, isInstance, type, patternId):
+        """
+        Applies a mastoron color scheme to given elements in given view by 
+        view filters, see :class:`mastoron.FilterOverrides`. 
+        Updates the colors scheme with new keys and colors.
+        Element overrides of the color scheme in the view are cleared.
+        
+        Only text parameters can be used, since filter rules compare the stored value
+        of a parameter while the keys are formatted values.
+
         Args:
             view (object): A Revit view
             elements (object): A list of Revit elements
@@ -181,12 +418,47 @@ class ColorScheme:
         Returns:
             dict: The applied and updated color scheme
         """
-        keys = set()
+        parameter = None
+        categoryIds = {}
         for element in elements:
-            key = mastoron.GetKey(element, schemeName, isInstance, type)
-            if key:
-                keys.add(key)
+            if element.Category:
+                categoryIds[str(element.Category.Id)] = element.Category.Id
+            if parameter is None:
+                if isInstance:
+                    source = element
+                else:
+                    source = revitron.DOC.GetElement(element.GetTypeId())
+                if source:
+                    parameter = source.LookupParameter(schemeName)
+
+        if not parameter or parameter.StorageType != revitron.DB.StorageType.String:
+            print('View filters can only be used with text parameters.')
+            return None
+
+        elementKeys = mastoron.GetKeys(elements, schemeName, isInstance, type)
+        keys = set(key for element, key in elementKeys if key)
+
+        scheme = ColorScheme._extend(schemeName, keys, isInstance)
+        if not scheme:
+            return None
 
+        if not mastoron.FilterOverrides(view).set(
+                scheme, parameter.Id, list(categoryIds.values()), patternId):
+            return None
+
+        affectedElements = mastoron.AffectedElements()
+        overriddenElements = affectedElements.get(scheme, viewId=view.Id)
+        if overriddenElements:
+            for elementId in overriddenElements:
+                element = mastoron.Convert.toRevitElement(elementId)
+                if element:
+                    mastoron.ElementOverrides(view, element).clear()
+            overriddenElements.clear()
+            affectedElements.dump(scheme, view.Id)
+        return scheme
+
+    @staticmethod
+    def _extend(schemeName, keys, isInstance):
         scheme = ColorScheme().load(schemeName)
         if not scheme:
             scheme = ColorScheme().generate(schemeName, keys, isInstance)
@@ -196,25 +468,6 @@ class ColorScheme:
             ColorScheme().update(scheme, keys)
 
         ColorScheme().save(scheme)
-        
-        overriddenElements = mastoron.AffectedElements().get(
-            scheme, viewId=view.Id)
-
-        for element in elements:
-            key = mastoron.GetKey(element, schemeName, isInstance, type)
-            if key:
-                colorHEX = scheme[DATA][key]
-                colorRGB = mastoron.Color.HEXtoRGB(colorHEX)
-                mastoron.ElementOverrides(view, element).set(colorRGB, patternId)
-                overriddenElements.append(str(element.Id))
-            else:
-                mastoron.ElementOverrides(view, element).clear()
-                try:
-                    overriddenElements.remove(str(element.Id))
-                except:
-                    pass
-        
-        mastoron.AffectedElements().dump(scheme, view.Id, overriddenElements)  
         return scheme
 
     def generate(self, schemeName, keys,
@@ -231,7 +484,9 @@ class ColorScheme:
         Returns:
             dict: A color scheme: {name: schemeName, data: {key: color}}
         """
-        if not gradient:
+        if not gradient and self.stableColors:
+            colors = Palette.getStable(sorted(keys), excludeColors)
+        elif not gradient:
             colors = ColorScheme().getColors(len(keys), excludeColors)
         elif gradient:
             colorsHSV = ColorRange(len(keys), min=gradient[0], max=gradient[1]).getHSV()
@@ -239,6 +494,8 @@ class ColorScheme:
             for hsv in colorsHSV:
                 rgb = Color.HSVtoRGB(hsv)
                 colors.append(Color.RGBtoHEX(rgb))
+        if colors is None or None in colors:
+            return None
         scheme = {}
         scheme[NAME] = schemeName
         scheme[IS_INSTANCE] = isInstance
@@ -284,10 +541,7 @@ class ColorScheme:
         Returns:
             dict: The color scheme
         """
-        for scheme in self.schemes:
-            if scheme[NAME] == schemeName:
-                return scheme
-        return None
+        return self.index.get(schemeName)
 
     def save(self, scheme):
         """
@@ -296,17 +550,15 @@ class ColorScheme:
         Args:
             scheme (dict): A color scheme
         """
-        writeSchemes = []
-        update = False
-        for existingScheme in self.schemes:
-            if scheme[NAME] == existingScheme[NAME]:
-                existingScheme[DATA] = scheme[DATA]
-                update = True
-            writeSchemes.append(existingScheme)
-        
-        if not update:
-            writeSchemes.append(scheme)
-        mastoron.ConfigStorage().set(self.COLOR_SCHEMES, writeSchemes)
+        if scheme[NAME] in self.index:
+            self.index[scheme[NAME]][DATA] = scheme[DATA]
+            if BINS in scheme:
+                self.index[scheme[NAME]][BINS] = scheme[BINS]
+            else:
+                self.index[scheme[NAME]].pop(BINS, None)
+        else:
+            self.index[scheme[NAME]] = scheme
+        self._write()
 
     def delete(self, scheme):
         """
@@ -315,12 +567,23 @@ class ColorScheme:
         Args:
             scheme (dict): A color scheme
         """
-        usedSchemes = []
-        for docScheme in self.schemes:
-            if not docScheme[NAME] == scheme[NAME]:
-                usedSchemes.append(docScheme)
-        
-        mastoron.ConfigStorage().set(self.COLOR_SCHEMES, usedSchemes)
+        self.index.pop(scheme[NAME], None)
+        self._write()
+
+    def _write(self):
+        self.schemes = list(self.index.values())
+        mastoron.ConfigStorage().set(self.COLOR_SCHEMES, self.schemes)
+        _schemeIndex['source'] = mastoron.ConfigStorage().get(self.COLOR_SCHEMES)
+        _schemeIndex['index'] = self.index
+
+    @staticmethod
+    def _getIndex(schemes):
+        if _schemeIndex['source'] is not schemes \
+                or len(_schemeIndex['index']) != len(schemes):
+            _schemeIndex['source'] = schemes
+            _schemeIndex['index'] = OrderedDict(
+                (scheme[NAME], scheme) for scheme in schemes)
+        return _schemeIndex['index']
 
     def getColors(self, count, excludeColors=[]):
         """
@@ -350,24 +613,137 @@ class ColorScheme:
             availableColors = self.defaultColors
         elif count <= len(self.extendedColors):
             availableColors = self.extendedColors
-        elif count >= len(self.extendedColors) and count < 100:
-            hsvColors = ColorRange(count).getHSV()
-            availableColors = []
-            for hsvColor in hsvColors:
-                rgbColor = Color.HSVtoRGB(hsvColor)
-                hexColor = Color.RGBtoHEX(rgbColor)
-                availableColors.append(hexColor)
         else:
-            print('Too many keys, colors are indistiguishable.')
-            return None
+            colors = Palette.get(count, excludeColors)
+            if not colors:
+                print('Too many keys, colors are indistiguishable.')
+            return colors
 
         colors = random.sample(availableColors, count)
         return colors
 
 
+class Palette:
+    """
+    Class for generating large sets of maximally distinct colors.
+
+    The colors are picked one by one from a grid of rgb colors. Every next color is
+    the candidate with the largest distance in CIELAB space to all colors picked before,
+    to all excluded colors and to black and white (farthest-point sampling). 
+    Very dark and very light candidates are skipped.
+
+    Palettes are cached per set of excluded colors and only extended when more 
+    colors are requested.
+    """
+
+    STEPS = 12
+    TABLE_SIZE = 256
+    MIN_LIGHTNESS = 25
+    MAX_LIGHTNESS = 92
+    CACHE_SIZE = 32
+
+    @staticmethod
+    def get(count, excludeColors=None):
+        """
+        Gets a given amount of distinct colors.
+
+        Args:
+            count (int): The number of colors to get
+            excludeColors (string, optional): List of hex colors to exclude. Defaults to None.
+
+        Returns:
+            list: A list of hex colors or None in case there are not enough distinct colors
+        """
+        rgbs, labs = Palette._getCandidates()
+        exclude = sorted(set(
+            Color.RGBtoHEX(Color.HEXtoRGB(color)) for color in excludeColors or []))
+        palettes = _palettes['palettes']
+        key = tuple(exclude)
+        if not key in palettes:
+            if len(palettes) >= Palette.CACHE_SIZE:
+                palettes.clear()
+            distances = [float('inf')] * len(labs)
+            for color in ['000000', 'ffffff'] + exclude:
+                Palette._update(distances, labs, Color.RGBtoLAB(Color.HEXtoRGB(color)))
+            palettes[key] = ([], distances)
+        colors, distances = palettes[key]
+        while len(colors) < count:
+            distance = max(distances)
+            if distance <= 0:
+                return None
+            index = distances.index(distance)
+            colors.append('#' + Color.RGBtoHEX(rgbs[index]).upper())
+            Palette._update(distances, labs, labs[index])
+        return colors[:count]
+
+    @staticmethod
+    def getStable(keys, usedColors=None):
+        """
+        Gets the colors of keys from a lookup table of ``TABLE_SIZE`` distinct colors.
+        The position in the table is derived from a hash of the key, a key always 
+        gets the same color as long as that color is not used yet. Otherwise the next
+        unused color of the table is used. Keys are resolved in the given order.
+
+        Args:
+            keys (list): A list of keys
+            usedColors (string, optional): List of hex colors that are already used. Defaults to None.
+
+        Returns:
+            list: A list of hex colors or None in case there are not enough unused colors
+        """
+        table = Palette.get(Palette.TABLE_SIZE)
+        used = set(Color.RGBtoHEX(Color.HEXtoRGB(color)) for color in usedColors or [])
+        colors = []
+        for key in keys:
+            digest = hashlib.md5(u'{}'.format(key).encode('utf-8')).hexdigest()
+            start = int(digest[:8], 16) % len(table)
+            color = None
+            for offset in range(len(table)):
+                candidate = table[(start + offset) % len(table)]
+                if not candidate.lstrip('#').lower() in used:
+                    color = candidate
+                    break
+            if not color:
+                # All table colors are used, continue with the following palette colors.
+                sequence = Palette.get(len(used) + 1)
+                if not sequence:
+                    return None
+                color = [x for x in sequence if not x.lstrip('#').lower() in used][0]
+            used.add(color.lstrip('#').lower())
+            colors.append(color)
+        return colors
+
+    @staticmethod
+    def _update(distances, labs, lab):
+        l0, a0, b0 = lab
+        for index, (l, a, b) in enumerate(labs):
+            distance = (l - l0) * (l - l0) + (a - a0) * (a - a0) + (b - b0) * (b - b0)
+            if distance < distances[index]:
+                distances[index] = distance
+
+    @staticmethod
+    def _getCandidates():
+        if _palettes['candidates'] is None:
+            levels = [int(round(i * 255.0 / (Palette.STEPS - 1))) 
+                for i in range(Palette.STEPS)]
+            rgbs = []
+            labs = []
+            for r in levels:
+                for g in levels:
+                    for b in levels:
+                        lab = Color.RGBtoLAB((r, g, b))
+                        if Palette.MIN_LIGHTNESS <= lab[0] <= Palette.MAX_LIGHTNESS:
+                            rgbs.append((r, g, b))
+                            labs.append(lab)
+            _palettes['candidates'] = (rgbs, labs)
+        return _palettes['candidates']
+
+
 class ColorRange:
     """
     Class for working with color ranges.
+
+    For gradients with multiple stops or smooth interpolation see :class:`mastoron.gradient.ColorGradient`.
     """
     def __init__(self, count, min=0, max=100):
         """
@@ -376,48 +752,30 @@ class ColorRange:
         Accepted values::
 
             0 <= min < 100
-            1 < max <= 100
-            count < max - min
-
-        """
-        if 0 <= min and min < 100:
-            self.min = min
-        else:
-            return None
-        
-        if 1 < max and max <= 100:
-            self.max = max
-        else:
-            return None
-            
-        if count < max - min:
-            self.count = count
-        else:
-            return None
+            0 < max <= 100
+            min != max
+            0 < count
 
+        Args:
+            count (int): The number of colors
+            min (float, optional): The hue of the first color in percent. Defaults to 0.
+            max (float, optional): The end of the hue range in percent, the range excludes max. Defaults to 100.
+        """
+        if not (0 <= min < 100 and 0 < max <= 100 and min != max):
+            raise ValueError('Invalid hue range: {} - {}'.format(min, max))
+        if count < 1:
+            raise ValueError('Invalid number of colors: {}'.format(count))
+        self.min = min
+        self.max = max
+        self.count = int(count)
         self.range = max - min
 
-        if not self.count <= self.range:
-            print('Count bigger than range.')
-            return None
-
     def getHSV(self):
         """
-        Gets a list of colors in hsv format.
+        Gets a list of colors in hsv format with hues evenly spaced from min towards max.
 
         Returns:
             list: A list of hsv colors
         """
-        hsv = []
-        for i in [
-                x * 0.01 for x in range(
-                                        self.min,
-                                        self.max,
-                                            (self.range / self.count
-                                            )
-                                        )
-                                    ]:
-            hsv.append((i, 0.5, 0.9))
-        return hsv
-
-
+        step = self.range / float(self.count)
+        return [((self.min + step * i) * 0.01, 0.5, 0.9) for i in range(self.count)]
@@ -1,5 +1,12 @@
-import json
+import os
 import revitron
+from mastoron.storage import JsonFile, JournalFile, ShardedConfig, SqliteConfig
+
+# Process-wide cache of loaded configs, keyed by normalized path.
+_cache = {}
+# Open write sessions, keyed like the cache.
+_sessions = {}
+
 
 class ConfigStorage:
 	"""
@@ -18,6 +25,28 @@ class ConfigStorage:
 	Setting configuration items works as follows::
 	
 		mastoron.ConfigStorage().set('namespace.item', value)
+
+	Multiple ``set`` calls can be batched into a single write of the config file
+	by wrapping them into a write session::
+
+		with mastoron.ConfigStorage().session():
+			mastoron.ConfigStorage().set('namespace.item', value)
+			mastoron.ConfigStorage().set('namespace.other', value)
+
+	The parsed config file is cached for the whole process and shared between all
+	``ConfigStorage`` instances. The file is only parsed again when its modification
+	time or size changes on disk. Writing is atomic and protected by a lock file,
+	changes that other sessions wrote in the meantime are merged, see 
+	:class:`mastoron.storage.JsonFile`.
+
+	In case a ``.journal`` file exists next to the config file, changes are only 
+	appended to that journal, see :class:`mastoron.storage.JournalFile`.
+
+	In case the configured path is a directory, the config is stored as a
+	:class:`mastoron.storage.ShardedConfig` with separate files for every color 
+	scheme and every list of overridden elements. Only changed files are read 
+	and written in that case. Paths ending with ``.sqlite`` are stored as a
+	:class:`mastoron.storage.SqliteConfig` with indexed rows for all overridden elements.
 	
 	"""
 
@@ -25,14 +54,12 @@ class ConfigStorage:
 		"""
 		Inits a new ``ConfigStorage`` object.
         """
-		import os
 		import sys
 		from revitron import Log
 		self.configPath = revitron.DocumentConfigStorage().get('mastoron.configpath')
 		if self.configPath:
 			if os.path.exists(self.configPath):
-				with open(self.configPath, 'r') as f:
-					self.config = json.load(f)
+				self.config = ConfigStorage._load(self.configPath)
 			else:
 				Log().error('Mastoron config file does not exist.')
 				sys.exit(1)
@@ -72,12 +99,146 @@ class ConfigStorage:
 			data (mixed): The value of the entry
 		"""
 		self.config[key] = data
-		# Remove empty items.
-		self.config = dict((k, v) for k, v in self.config.iteritems() if v)
-		raw = json.dumps(self.config, sort_keys=True, ensure_ascii=False)
-		with open(self.configPath, 'w') as f:
-			f.write(raw)
+		# Remove empty items. The dict is updated in place since it is shared
+		# with all other instances through the cache.
+		for k in [k for k, v in self.config.items() if not v]:
+			del self.config[k]
+		session = _sessions.get(ConfigStorage._cacheKey(self.configPath))
+		if session:
+			session.dirty = True
+			return
+		self._write()
+
+	def session(self):
+		"""
+		Opens a write session that buffers all ``set`` calls and writes the 
+		config file only once when the session is closed.
+
+		Example::
+
+			with mastoron.ConfigStorage().session():
+				mastoron.ColorScheme().save(scheme)
+				mastoron.AffectedElements().dump(scheme, viewId, elements)
+
+		Sessions can be nested, only the outermost session writes the file.
+		In case an exception leaves the outermost session, the config file 
+		is left untouched and all buffered changes are discarded. Exceptions that
+		are handled inside the outermost session don't discard anything.
+
+		Returns:
+			object: A :class:`ConfigSession` to be used as context manager
+		"""
+		return ConfigSession(self)
+
+	def _write(self):
+		self.config.write()
 
 	@staticmethod
 	def setPath(path):
-		revitron.DocumentConfigStorage().set('mastoron.configpath', path)
\ No newline at end of file
+		revitron.DocumentConfigStorage().set('mastoron.configpath', path)
+
+	@staticmethod
+	def migrate(target):
+		"""
+		Copies the current config into a JSON file, a sharded config directory or 
+		a SQLite database and connects the document to it. Create an empty journal 
+		next to a JSON file before in order to migrate to a journaled file.
+
+		Args:
+			target (string): The target ``.json`` file, directory or ``.sqlite`` file
+		"""
+		data = ConfigStorage().config
+		ConfigStorage._getConfigClass(target).migrate(data, target)
+		ConfigStorage.setPath(target)
+
+	@staticmethod
+	def clearCache():
+		"""
+		Drops all cached config files and closes open databases.
+		The next ``ConfigStorage`` reads from disk again.
+		"""
+		for config in _cache.values():
+			if hasattr(config, 'close'):
+				config.close()
+		_cache.clear()
+
+	@staticmethod
+	def _getConfigClass(path):
+		if path.lower().endswith('.sqlite'):
+			return SqliteConfig
+		if os.path.isdir(path) or not os.path.splitext(path)[1]:
+			return ShardedConfig
+		if os.path.exists(path + JournalFile.EXTENSION):
+			return JournalFile
+		return JsonFile
+
+	@staticmethod
+	def _cacheKey(path):
+		return os.path.normcase(os.path.abspath(path))
+
+	@staticmethod
+	def _load(path):
+		"""
+		Returns the config from the cache or loads it in case it is not cached yet.
+		Cached configs drop all data that was changed on disk since it was read.
+
+		Args:
+			path (string): The path to the config file
+
+		Returns:
+			object: The config mapping
+		"""
+		key = ConfigStorage._cacheKey(path)
+		config = _cache.get(key)
+		if config is None:
+			config = _cache[key] = ConfigStorage._getConfigClass(path)(path)
+		# Inside a write session all instances share the buffered config.
+		elif not key in _sessions:
+			config.refresh()
+		return config
+
+
+class ConfigSession:
+	"""
+	A write session for a :class:`ConfigStorage`. Use :meth:`ConfigStorage.session`
+	to create a new session.
+	"""
+
+	def __init__(self, storage):
+		"""
+		Inits a new ``ConfigSession`` object.
+
+		Args:
+			storage (object): The ``ConfigStorage`` to buffer
+		"""
+		self.storage = storage
+		self.key = ConfigStorage._cacheKey(storage.configPath)
+		self.depth = 0
+		self.dirty = False
+
+	def __enter__(self):
+		session = _sessions.setdefault(self.key, self)
+		session.depth += 1
+		return session
+
+	def __exit__(self, excType, excValue, traceback):
+		session = _sessions[self.key]
+		session.depth -= 1
+		# Errors inside nested sessions are either handled by the caller or
+		# reach the outermost session, only the latter discards the changes.
+		if session.depth > 0:
+			return False
+		del _sessions[self.key]
+		# Calling sys.exit() is a regular way to stop a command, 
+		# only actual errors discard the buffered changes.
+		if excType and issubclass(excType, Exception):
+			if session.dirty:
+				from revitron import Log
+				Log().warning('Discarded unsaved Mastoron config changes after an error.')
+			# Drop the modified config, the next read gets the untouched file.
+			config = _cache.pop(self.key, None)
+			if hasattr(config, 'close'):
+				config.close()
+		elif session.dirty:
+			session.storage._write()
+		return False
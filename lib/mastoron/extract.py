@@ -51,7 +51,7 @@ class FaceExtractor(Extractor):
             uv = revitron.DB.UV(0.5, 0.5)
             point = face.Evaluate(uv)
             if point[2] < selectedPoint:
-                selectedPoint = point
+                selectedPoint = point[2]
                 selectedFace = face
         return selectedFace
 
@@ -78,7 +78,7 @@ class FaceExtractor(Extractor):
             uv = revitron.DB.UV(0.5, 0.5)
             point = face.Evaluate(uv)
             if point[2] > selectedPoint:
-                selectedPoint = point
+                selectedPoint = point[2]
                 selectedFace = face
         return selectedFace
 
@@ -0,0 +1,388 @@
+import math
+from bisect import bisect_right
+from mastoron.colors import Color
+from mastoron.variables import NAME, DATA, BINS, ROUNDING_DECIMALS
+
+__all__ = [
+    'EqualIntervalBreaks', 'QuantileBreaks', 'JenksBreaks', 'GetBreaks',
+    'Gradient', 'ColorGradient'
+]
+
+EQUAL_INTERVAL = 'Equal Interval'
+QUANTILE = 'Quantile'
+JENKS = 'Jenks'
+
+LINEAR_RGB = 'Linear RGB'
+LAB = 'Lab'
+
+# The yellow to cyan hues that gradients have been using so far.
+DEFAULT_STOPS = ['e6da73', '7fe673', '73e6d8']
+
+# Jenks breaks are computed on at most this number of weighted sample values.
+JENKS_SAMPLE_SIZE = 256
+
+
+def EqualIntervalBreaks(values, count):
+    """
+    Splits the range of values into bins of the same width.
+
+    Args:
+        values (list): A list of numbers
+        count (int): The number of bins
+
+    Returns:
+        list: The sorted bin edges including the minimum and the maximum
+    """
+    low, high = min(values), max(values)
+    width = (high - low) / float(count)
+    return [low + width * i for i in range(count)] + [high]
+
+
+def QuantileBreaks(values, count):
+    """
+    Splits the values into bins with the same number of values.
+
+    Args:
+        values (list): A list of numbers
+        count (int): The number of bins
+
+    Returns:
+        list: The sorted bin edges including the minimum and the maximum
+    """
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return [ordered[int(round(last * i / float(count)))] for i in range(count + 1)]
+
+
+def JenksBreaks(values, count):
+    """
+    Splits the values into bins with the smallest variance inside the bins
+    (Jenks natural breaks, computed by Fisher's exact algorithm). Large lists of
+    values are reduced to ``JENKS_SAMPLE_SIZE`` weighted quantile samples first.
+
+    Args:
+        values (list): A list of numbers
+        count (int): The number of bins
+
+    Returns:
+        list: The sorted bin edges including the minimum and the maximum
+    """
+    ordered = sorted(values)
+    samples, weights = _sample(ordered, JENKS_SAMPLE_SIZE)
+    size = len(samples)
+    count = min(count, size)
+    # Prefix sums allow computing the variance of any range in constant time.
+    sumW, sumX, sumXX = [0.0], [0.0], [0.0]
+    for value, weight in zip(samples, weights):
+        sumW.append(sumW[-1] + weight)
+        sumX.append(sumX[-1] + weight * value)
+        sumXX.append(sumXX[-1] + weight * value * value)
+
+    def cost(start, end):
+        w = sumW[end] - sumW[start]
+        x = sumX[end] - sumX[start]
+        return sumXX[end] - sumXX[start] - x * x / w
+
+    # costs[end] is the cost of splitting the first end samples into k bins,
+    # starts[k][end] is the first sample of the last of those bins.
+    costs = [cost(0, end) if end else 0.0 for end in range(size + 1)]
+    starts = [[0] * (size + 1)]
+    for k in range(2, count + 1):
+        nextCosts = [float('inf')] * (size + 1)
+        kStarts = [0] * (size + 1)
+        for end in range(k, size + 1):
+            best = float('inf')
+            bestStart = k - 1
+            for start in range(k - 1, end):
+                value = costs[start] + cost(start, end)
+                if value < best:
+                    best = value
+                    bestStart = start
+            nextCosts[end] = best
+            kStarts[end] = bestStart
+        costs = nextCosts
+        starts.append(kStarts)
+
+    edges = [ordered[-1]]
+    end = size
+    for k in range(count, 1, -1):
+        end = starts[k - 1][end]
+        edges.append(samples[end])
+    edges.append(ordered[0])
+    return list(reversed(edges))
+
+
+def GetBreaks(values, count, method=EQUAL_INTERVAL):
+    """
+    Computes the bin edges of a list of values. Duplicate edges are removed.
+
+    Args:
+        values (list): A list of numbers
+        count (int): The number of bins
+        method (string, optional): ``EQUAL_INTERVAL``, ``QUANTILE`` or ``JENKS``. Defaults to ``EQUAL_INTERVAL``.
+
+    Returns:
+        list: The sorted bin edges including the minimum and the maximum
+    """
+    functions = {
+        EQUAL_INTERVAL: EqualIntervalBreaks,
+        QUANTILE: QuantileBreaks,
+        JENKS: JenksBreaks
+    }
+    edges = functions[method](values, count)
+    unique = [edges[0]]
+    for edge in edges[1:]:
+        if edge > unique[-1]:
+            unique.append(edge)
+    if len(unique) == 1:
+        unique.append(unique[0])
+    return unique
+
+
+class Gradient:
+    """
+    Class for mapping numbers to colors by bins.
+
+    A gradient color scheme only stores the bin edges and one color per bin::
+
+        {
+            "name": "Gradients",
+            "bins": [0.0, 12.5, 25.0, 50.0],
+            "data": {"0.00 - 12.50": "#...", "12.50 - 25.00": "#...", "25.00 - 50.00": "#..."}
+        }
+
+    Every value is mapped to the bin it falls into, the last bin includes the maximum.
+    """
+
+    def __init__(self, scheme):
+        """
+        Inits a new Gradient instance.
+
+        Args:
+            scheme (dict): A gradient color scheme
+        """
+        self.edges = scheme[BINS]
+        self.labels = Gradient.getLabels(self.edges)
+        self.colors = [scheme[DATA][label] for label in self.labels]
+
+    @staticmethod
+    def create(schemeName, values, count, method=EQUAL_INTERVAL, stops=None, space=LAB):
+        """
+        Creates a new gradient color scheme for a list of values.
+
+        Args:
+            schemeName (string): The name of the color scheme
+            values (list): A list of numbers
+            count (int): The number of bins
+            method (string, optional): The binning method, see :func:`GetBreaks`. Defaults to ``EQUAL_INTERVAL``.
+            stops (list, optional): The gradient stops, see :class:`ColorGradient`. Defaults to ``DEFAULT_STOPS``.
+            space (string, optional): The interpolation color space, ``LAB`` or ``LINEAR_RGB``. Defaults to ``LAB``.
+
+        Returns:
+            dict: The gradient color scheme
+        """
+        edges = GetBreaks(values, count, method)
+        labels = Gradient.getLabels(edges)
+        colors = ColorGradient(stops or DEFAULT_STOPS, space).getColors(len(labels))
+        scheme = {}
+        scheme[NAME] = schemeName
+        scheme[BINS] = edges
+        scheme[DATA] = dict(zip(labels, colors))
+        return scheme
+
+    @staticmethod
+    def getLabels(edges):
+        """
+        Gets the labels of all bins. Edges are rounded to ``ROUNDING_DECIMALS`` decimals
+        or to as many decimals as required to give every bin a unique label.
+
+        Args:
+            edges (list): The bin edges
+
+        Returns:
+            list: A list of labels
+        """
+        decimals = ROUNDING_DECIMALS
+        widths = [b - a for a, b in zip(edges, edges[1:]) if b > a]
+        if widths:
+            decimals = max(decimals, int(math.ceil(-math.log10(min(widths)))))
+        while True:
+            template = '{{:.{0}f}} - {{:.{0}f}}'.format(decimals)
+            labels = [template.format(edges[i], edges[i + 1]) for i in range(len(edges) - 1)]
+            if len(set(labels)) == len(labels) or decimals > 15:
+                return labels
+            decimals += 1
+
+    def getColor(self, value):
+        """
+        Gets the color of a value.
+
+        Args:
+            value (float): A number
+
+        Returns:
+            string: The hex color of the bin the value falls into
+        """
+        return self.colors[self.getBin(value)]
+
+    def getBin(self, value):
+        """
+        Gets the index of the bin a value falls into. Values outside of the range
+        fall into the first or the last bin.
+
+        Args:
+            value (float): A number
+
+        Returns:
+            int: The bin index
+        """
+        index = bisect_right(self.edges, value, 1, len(self.edges) - 1) - 1
+        return index
+
+    def map(self, values):
+        """
+        Gets the colors of a list of values.
+
+        Args:
+            values (list): A list of numbers
+
+        Returns:
+            list: A list of hex colors
+        """
+        edges = self.edges
+        colors = self.colors
+        last = len(edges) - 1
+        return [colors[bisect_right(edges, value, 1, last) - 1] for value in values]
+
+
+class ColorGradient:
+    """
+    Class for interpolating colors between any number of gradient stops.
+
+    Stops are either hex colors that are spaced evenly or tuples of a position 
+    from 0 to 1 and a hex color::
+
+        ColorGradient(['0000ff', 'ffffff', 'ff0000']).getColors(500)
+        ColorGradient([(0, '#0000ff'), (0.8, '#ffffff'), (1, '#ff0000')], LINEAR_RGB)
+
+    Colors are interpolated in CIELAB or linear RGB, which avoids the dark and 
+    muddy middle tones of interpolating sRGB values directly.
+    """
+
+    def __init__(self, stops, space=LAB):
+        """
+        Inits a new ColorGradient instance.
+
+        Args:
+            stops (list): A list of hex colors or (position, hex color) tuples
+            space (string, optional): The interpolation color space, ``LAB`` or ``LINEAR_RGB``. Defaults to ``LAB``.
+        """
+        if space == LAB:
+            self.toSpace, self.fromSpace = Color.RGBtoLAB, Color.LABtoRGB
+        elif space == LINEAR_RGB:
+            self.toSpace, self.fromSpace = Color.RGBtoLinear, Color.LinearToRGB
+        else:
+            raise ValueError('Unknown color space: {}'.format(space))
+        if not stops:
+            raise ValueError('A gradient needs at least one stop.')
+        if not isinstance(stops[0], (tuple, list)):
+            last = float(max(len(stops) - 1, 1))
+            stops = [(i / last, color) for i, color in enumerate(stops)]
+        stops = sorted(stops, key=lambda stop: stop[0])
+        self.space = space
+        self.positions = [float(position) for position, color in stops]
+        self.coords = [self.toSpace(Color.HEXtoRGB(color)) for position, color in stops]
+
+    def getColor(self, position):
+        """
+        Gets the color at a position of the gradient.
+
+        Args:
+            position (float): A position from 0 to 1
+
+        Returns:
+            string: The hex color
+        """
+        return self.map([position])[0]
+
+    def getColors(self, count):
+        """
+        Gets a given amount of colors evenly spaced from the first to the last stop.
+
+        Args:
+            count (int): The number of colors
+
+        Returns:
+            list: A list of hex colors
+        """
+        last = float(max(count - 1, 1))
+        return self.map([i / last for i in range(count)])
+
+    def map(self, positions):
+        """
+        Gets the colors at a list of positions. The segment and the stop colors of every 
+        position are looked up once and shared by all positions of a sorted list.
+
+        Args:
+            positions (list): A list of positions from 0 to 1
+
+        Returns:
+            list: A list of hex colors
+        """
+        stops = self.positions
+        coords = self.coords
+        last = len(stops) - 1
+        colors = []
+        segment = None
+        for position in positions:
+            index = min(max(bisect_right(stops, position) - 1, 0), max(last - 1, 0))
+            if index != segment:
+                segment = index
+                start, end = stops[index], stops[min(index + 1, last)]
+                a, b = coords[index], coords[min(index + 1, last)]
+                width = end - start
+            if width <= 0:
+                t = 0.0 if position <= start else 1.0
+            else:
+                t = min(max((position - start) / width, 0.0), 1.0)
+            coord = (
+                a[0] + (b[0] - a[0]) * t,
+                a[1] + (b[1] - a[1]) * t,
+                a[2] + (b[2] - a[2]) * t)
+            colors.append(Color.RGBtoHEX(self.fromSpace(coord)))
+        return colors
+
+
+def _sample(ordered, size):
+    """
+    Reduces a sorted list of values to at most a given number of distinct values
+    with the number of values they represent as weights.
+    """
+    distinct = []
+    weights = []
+    for value in ordered:
+        if distinct and distinct[-1] == value:
+            weights[-1] += 1
+        else:
+            distinct.append(value)
+            weights.append(1)
+    if len(distinct) <= size:
+        return distinct, weights
+    samples = []
+    sampleWeights = []
+    total = float(len(ordered))
+    consumed = 0
+    index = 0
+    for i in range(size):
+        limit = total * (i + 1) / size
+        weight = 0
+        value = 0.0
+        while index < len(distinct) and (not weight or consumed + weight < limit):
+            weight += weights[index]
+            value += distinct[index] * weights[index]
+            index += 1
+        if weight:
+            samples.append(value / weight)
+            sampleWeights.append(weight)
+            consumed += weight
+    return samples, sampleWeights
@@ -65,12 +65,74 @@ def GetKey(element, parameter, isInstance, type):
         string: The value of the parameter
     """
     if isInstance:
-        elementParameter = _(element).getParameter(parameter)
+        return _getKey(element, parameter, type)
     elif not isInstance:
         elType = revitron.DOC.GetElement(element.GetTypeId())
-        elementParameter = _(elType).getParameter(parameter)
+        return _getKey(elType, parameter, type)
 
-    key = elementParameter.getValueString()
+
+def GetKeys(elements, parameter, isInstance, type):
+    """
+    Gets the values of given parameter for a list of elements.
+    Every value is only read once. Type parameters are read once per type and 
+    shared by all instances of that type.
+
+    Args:
+        elements (object): A list of Revit elements
+        parameter (string): The name of the parameter
+        isInstance (bool): True for instance parameters, False for type parameters
+        type (string): The type of the parameter (Area, Number, Length, etc...)
+
+    Returns:
+        list: A list of (element, value) tuples in the order of the given elements
+    """
+    keys = []
+    typeKeys = {}
+    for element in elements:
+        if isInstance:
+            key = _getKey(element, parameter, type)
+        else:
+            typeId = element.GetTypeId().IntegerValue
+            if typeId in typeKeys:
+                key = typeKeys[typeId]
+            else:
+                elType = revitron.DOC.GetElement(element.GetTypeId())
+                key = typeKeys[typeId] = _getKey(elType, parameter, type)
+        keys.append((element, key))
+    return keys
+
+
+def GetValues(elements, parameter, isInstance):
+    """
+    Gets the raw values of given parameter for a list of elements.
+    Type parameters are read once per type and shared by all instances of that type.
+
+    Args:
+        elements (object): A list of Revit elements
+        parameter (string): The name of the parameter
+        isInstance (bool): True for instance parameters, False for type parameters
+
+    Returns:
+        list: A list of (element, value) tuples in the order of the given elements
+    """
+    values = []
+    typeValues = {}
+    for element in elements:
+        if isInstance:
+            value = _(element).get(parameter)
+        else:
+            typeId = element.GetTypeId().IntegerValue
+            if typeId in typeValues:
+                value = typeValues[typeId]
+            else:
+                elType = revitron.DOC.GetElement(element.GetTypeId())
+                value = typeValues[typeId] = _(elType).get(parameter)
+        values.append((element, value))
+    return values
+
+
+def _getKey(element, parameter, type):
+    key = _(element).getParameter(parameter).getValueString()
 
     if not key:
         return None
@@ -80,4 +142,4 @@ def GetKey(element, parameter, isInstance, type):
             return None
         key = _(revitron.DOC.GetElement(key)).get(NAME)
 
-    return key
\ No newline at end of file
+    return key
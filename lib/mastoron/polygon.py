@@ -0,0 +1,355 @@
+import math
+from collections import defaultdict
+from mastoron.spatial import BoxIndex
+
+__all__ = [
+    'UNION', 'DIFFERENCE', 'INTERSECT', 'SignedArea', 'PointInPolygon',
+    'PolygonUnion', 'PolygonDifference', 'PolygonIntersection', 'PolygonBoolean'
+]
+
+UNION = 'Union'
+DIFFERENCE = 'Difference'
+INTERSECT = 'Intersect'
+
+# Coordinates are snapped to a grid of this size, closer points are merged.
+TOLERANCE = 1e-6
+
+
+def SignedArea(ring):
+    """
+    Computes the signed area of a ring. The area is positive for counterclockwise rings.
+
+    Args:
+        ring (list): A list of (x, y) points
+
+    Returns:
+        float: The signed area
+    """
+    area = 0
+    for i in range(len(ring)):
+        x1, y1 = ring[i - 1]
+        x2, y2 = ring[i]
+        area += x1 * y2 - x2 * y1
+    return area / 2.0
+
+
+def PointInPolygon(point, polygon):
+    """
+    Checks whether a point is inside a polygon with holes. Points on the boundary
+    may be inside or outside.
+
+    Args:
+        point (tuple): A (x, y) point
+        polygon (list): A list of rings, the first ring is the outer ring, all other rings are holes
+
+    Returns:
+        bool: True if the point is inside
+    """
+    x, y = point
+    inside = False
+    for ring in polygon:
+        x1, y1 = ring[-1]
+        for x2, y2 in ring:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / float(y2 - y1):
+                inside = not inside
+            x1, y1 = x2, y2
+    return inside
+
+
+def PolygonUnion(polygons):
+    """
+    Unites a list of polygons.
+
+    Example::
+
+        square = [[(0, 0), (2, 0), (2, 2), (0, 2)]]
+        other = [[(1, 1), (3, 1), (3, 3), (1, 3)]]
+        mastoron.PolygonUnion([square, other])
+
+    Args:
+        polygons (list): A list of polygons, a polygon is a list of rings of (x, y) points,
+            the first ring is the outer ring and all other rings are holes
+
+    Returns:
+        list: A list of polygons with counterclockwise outer rings and clockwise holes
+    """
+    return PolygonBoolean(polygons, [], UNION)
+
+
+def PolygonDifference(subject, clip):
+    """
+    Subtracts a list of polygons from another list of polygons.
+
+    Args:
+        subject (list): A list of polygons, see :func:`PolygonUnion`
+        clip (list): A list of polygons to subtract
+
+    Returns:
+        list: A list of polygons with counterclockwise outer rings and clockwise holes
+    """
+    return PolygonBoolean(subject, clip, DIFFERENCE)
+
+
+def PolygonIntersection(subject, clip):
+    """
+    Intersects a list of polygons with another list of polygons.
+
+    Args:
+        subject (list): A list of polygons, see :func:`PolygonUnion`
+        clip (list): A list of polygons
+
+    Returns:
+        list: A list of polygons with counterclockwise outer rings and clockwise holes
+    """
+    return PolygonBoolean(subject, clip, INTERSECT)
+
+
+def PolygonBoolean(subject, clip, operation, tolerance=TOLERANCE):
+    """
+    Performs a boolean operation on two lists of polygons.
+
+    All edges are split at their intersections first. An edge piece becomes part
+    of the result boundary if the result area lies on exactly one of its sides.
+    The boundary pieces are then joined to rings that keep the result area on their
+    left side, so outer rings are counterclockwise and holes are clockwise.
+    Overlapping polygons within the subject or the clip list are united.
+
+    Args:
+        subject (list): A list of polygons, see :func:`PolygonUnion`
+        clip (list): A list of polygons
+        operation (string): ``UNION``, ``DIFFERENCE`` or ``INTERSECT``
+        tolerance (float, optional): The snapping distance. Defaults to ``TOLERANCE``.
+
+    Returns:
+        list: A list of polygons with counterclockwise outer rings and clockwise holes
+    """
+    if operation == UNION:
+        inResult = lambda inSubject, inClip: inSubject or inClip
+    elif operation == DIFFERENCE:
+        inResult = lambda inSubject, inClip: inSubject and not inClip
+    elif operation == INTERSECT:
+        inResult = lambda inSubject, inClip: inSubject and inClip
+    else:
+        raise ValueError('Unknown operation: {}'.format(operation))
+
+    subject = [_snapPolygon(polygon, tolerance) for polygon in subject]
+    clip = [_snapPolygon(polygon, tolerance) for polygon in clip]
+    subject = [polygon for polygon in subject if polygon]
+    clip = [polygon for polygon in clip if polygon]
+    subjectIndex = _PolygonIndex(subject)
+    clipIndex = _PolygonIndex(clip)
+
+    edges = set()
+    for polygon in subject + clip:
+        for ring in polygon:
+            for i in range(len(ring)):
+                edges.add(_undirected(ring[i - 1], ring[i]))
+
+    boundary = []
+    for (a, b), (pa, pb) in _splitEdges(list(edges)).items():
+        # Test the points just left and right of the middle of the piece. The middle is
+        # projected onto the unsplit edge, since snapped split points are slightly off the edge.
+        dx, dy = pb[0] - pa[0], pb[1] - pa[1]
+        if (b[0] - a[0]) * dx + (b[1] - a[1]) * dy < 0:
+            dx, dy = -dx, -dy
+        lengthSquared = float(dx * dx + dy * dy)
+        t = ((a[0] + b[0]) / 2.0 - pa[0]) * (pb[0] - pa[0]) + ((a[1] + b[1]) / 2.0 - pa[1]) * (pb[1] - pa[1])
+        t = t / lengthSquared
+        mx, my = pa[0] + (pb[0] - pa[0]) * t, pa[1] + (pb[1] - pa[1]) * t
+        offset = 0.01 / math.sqrt(lengthSquared)
+        left = (mx - dy * offset, my + dx * offset)
+        right = (mx + dy * offset, my - dx * offset)
+        inLeft = inResult(subjectIndex.contains(left), clipIndex.contains(left))
+        inRight = inResult(subjectIndex.contains(right), clipIndex.contains(right))
+        if inLeft and not inRight:
+            boundary.append((a, b))
+        elif inRight and not inLeft:
+            boundary.append((b, a))
+
+    rings = [_simplify(ring) for ring in _joinRings(boundary)]
+    rings = [ring for ring in rings if len(ring) > 2]
+    return [[[(x * tolerance, y * tolerance) for x, y in ring] for ring in polygon]
+        for polygon in _assignHoles(rings)]
+
+
+class _PolygonIndex:
+
+    def __init__(self, polygons):
+        self.polygons = polygons
+        boxes = {}
+        for i, polygon in enumerate(polygons):
+            xs = [x for x, y in polygon[0]]
+            ys = [y for x, y in polygon[0]]
+            boxes[i] = ((min(xs), min(ys)), (max(xs), max(ys)))
+        self.index = BoxIndex.fromBoxes(boxes)
+
+    def contains(self, point):
+        for i in self.index.queryPoint(point):
+            if PointInPolygon(point, self.polygons[i]):
+                return True
+        return False
+
+
+def _snapPolygon(polygon, tolerance):
+    rings = []
+    for ring in polygon:
+        snapped = []
+        for x, y in ring:
+            point = (int(round(x / tolerance)), int(round(y / tolerance)))
+            if not snapped or snapped[-1] != point:
+                snapped.append(point)
+        while len(snapped) > 1 and snapped[0] == snapped[-1]:
+            snapped.pop()
+        if len(snapped) > 2:
+            rings.append(snapped)
+    return rings
+
+
+def _undirected(a, b):
+    if b < a:
+        return (b, a)
+    return (a, b)
+
+
+def _cross(ox, oy, ax, ay, bx, by):
+    return (ax - ox) * (by - oy) - (ay - oy) * (bx - ox)
+
+
+def _splitEdges(edges):
+    """
+    Splits edges at all intersections and returns the unique pieces with the edge they belong to.
+    """
+    edges = [edge for edge in edges if edge[0] != edge[1]]
+    boxes = {}
+    for i, (a, b) in enumerate(edges):
+        boxes[i] = ((min(a[0], b[0]), min(a[1], b[1])), (max(a[0], b[0]), max(a[1], b[1])))
+    splits = defaultdict(set)
+    for i, j in BoxIndex.fromBoxes(boxes).getPairs():
+        (p1, p2), (p3, p4) = edges[i], edges[j]
+        d = _cross(0, 0, p2[0] - p1[0], p2[1] - p1[1], p4[0] - p3[0], p4[1] - p3[1])
+        if d == 0:
+            # Parallel edges only touch if they are collinear.
+            if _cross(p1[0], p1[1], p2[0], p2[1], p3[0], p3[1]) != 0:
+                continue
+            for point in (p3, p4):
+                if _between(p1, p2, point):
+                    splits[i].add(point)
+            for point in (p1, p2):
+                if _between(p3, p4, point):
+                    splits[j].add(point)
+            continue
+        t = _cross(p1[0], p1[1], p3[0], p3[1], p4[0], p4[1])
+        u = _cross(p1[0], p1[1], p3[0], p3[1], p2[0], p2[1])
+        if d < 0:
+            d, t, u = -d, -t, -u
+        if not (0 <= t <= d and 0 <= u <= d):
+            continue
+        point = (
+            int(round(p1[0] + (p2[0] - p1[0]) * float(t) / d)),
+            int(round(p1[1] + (p2[1] - p1[1]) * float(t) / d)))
+        splits[i].add(point)
+        splits[j].add(point)
+
+    pieces = {}
+    for i, (a, b) in enumerate(edges):
+        points = [a, b] + [point for point in splits.get(i, []) if point != a and point != b]
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        points.sort(key=lambda point: (point[0] - a[0]) * dx + (point[1] - a[1]) * dy)
+        for k in range(len(points) - 1):
+            if points[k] != points[k + 1]:
+                pieces.setdefault(_undirected(points[k], points[k + 1]), (a, b))
+    return pieces
+
+
+def _between(a, b, point):
+    """
+    Checks whether a point on the line through a and b lies strictly between a and b.
+    """
+    if point == a or point == b:
+        return False
+    dot = (point[0] - a[0]) * (b[0] - a[0]) + (point[1] - a[1]) * (b[1] - a[1])
+    return 0 < dot < (b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2
+
+
+def _joinRings(edges):
+    """
+    Joins directed edges to closed rings. At vertices with several outgoing edges
+    the sharpest left turn is taken, so rings that touch in a vertex stay separate.
+    """
+    outgoing = defaultdict(list)
+    for a, b in edges:
+        outgoing[a].append(b)
+    rings = []
+    for start, first in edges:
+        if not first in outgoing[start]:
+            continue
+        outgoing[start].remove(first)
+        ring = [start]
+        previous, current = start, first
+        while current != start:
+            ring.append(current)
+            candidates = outgoing[current]
+            if not candidates:
+                ring = None
+                break
+            back = math.atan2(previous[1] - current[1], previous[0] - current[0])
+            best = None
+            bestAngle = None
+            for candidate in candidates:
+                angle = (back - math.atan2(
+                    candidate[1] - current[1], candidate[0] - current[0])) % (2 * math.pi)
+                if angle == 0:
+                    angle = 2 * math.pi
+                if bestAngle is None or angle < bestAngle:
+                    best, bestAngle = candidate, angle
+            candidates.remove(best)
+            previous, current = current, best
+        if ring:
+            rings.append(ring)
+    return rings
+
+
+def _simplify(ring):
+    """
+    Removes collinear vertices and spikes from a ring.
+    """
+    while len(ring) > 2:
+        out = []
+        for i in range(len(ring)):
+            a, b, c = ring[i - 1], ring[i], ring[(i + 1) % len(ring)]
+            if _cross(a[0], a[1], b[0], b[1], c[0], c[1]) != 0:
+                out.append(b)
+        if len(out) == len(ring):
+            break
+        ring = out
+    return ring
+
+
+def _assignHoles(rings):
+    """
+    Groups clockwise holes with the smallest counterclockwise ring that contains them.
+    """
+    outers = []
+    holes = []
+    for ring in rings:
+        area = SignedArea(ring)
+        if area > 0:
+            outers.append((area, ring))
+        elif area < 0:
+            holes.append(ring)
+    outers.sort(key=lambda outer: outer[0])
+    polygons = [[ring] for area, ring in outers]
+    if not holes:
+        return polygons
+    index = _PolygonIndex(polygons)
+    for hole in holes:
+        # The result area lies just left of every edge of the hole.
+        a, b = hole[0], hole[1]
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        offset = 0.01 / math.sqrt(dx * dx + dy * dy)
+        point = ((a[0] + b[0]) / 2.0 - dy * offset, (a[1] + b[1]) / 2.0 + dx * offset)
+        containing = [i for i in index.index.queryPoint(point)
+            if PointInPolygon(point, [polygons[i][0]])]
+        if containing:
+            polygons[min(containing)].append(hole)
+    return polygons
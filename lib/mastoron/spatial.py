@@ -0,0 +1,317 @@
+from collections import defaultdict
+
+__all__ = ['BoxesOverlap', 'BoxIndex', 'DisjointSet']
+
+
+def BoxesOverlap(a, b, tolerance=0):
+    """
+    Checks whether two axis aligned boxes overlap or touch.
+
+    Args:
+        a (tuple): A box as tuple of a min and a max point (x, y, z)
+        b (tuple): A box as tuple of a min and a max point (x, y, z)
+        tolerance (float, optional): The distance at which boxes still count as overlapping. Defaults to 0.
+
+    Returns:
+        bool: True if the boxes overlap
+    """
+    aMin, aMax = a
+    bMin, bMax = b
+    for i in range(len(aMin)):
+        if aMin[i] > bMax[i] + tolerance or bMin[i] > aMax[i] + tolerance:
+            return False
+    return True
+
+
+class BoxIndex:
+    """
+    Spatial index for axis aligned bounding boxes based on a uniform grid.
+
+    Every box is registered in all grid cells it covers. Only boxes that share
+    a cell are compared, which reduces finding all overlapping pairs from comparing
+    every box with every other box to comparing close boxes only::
+
+        index = mastoron.BoxIndex.fromElements(elements)
+        for a, b in index.getPairs():
+            ...
+
+    Boxes are tuples of a min and a max point, where points are any indexable
+    sequence of coordinates like tuples or Revit XYZ objects.
+    """
+
+    # The maximum number of cells per axis a single box is registered in.
+    MAX_CELLS = 64
+
+    def __init__(self, cellSize):
+        """
+        Inits a new BoxIndex instance.
+
+        Args:
+            cellSize (float): The edge length of the grid cells
+        """
+        self.cellSize = float(cellSize) or 1.0
+        self.boxes = {}
+        self.cells = defaultdict(list)
+        self.large = []
+
+    @staticmethod
+    def fromBoxes(boxes, cellSize=None):
+        """
+        Creates a new index for a dict of boxes. The cell size defaults to
+        the average edge length of all boxes.
+
+        Args:
+            boxes (dict): A dict of key: (min, max)
+            cellSize (float, optional): The edge length of the grid cells. Defaults to None.
+
+        Returns:
+            object: A BoxIndex instance
+        """
+        if not cellSize:
+            total = 0.0
+            count = 0
+            for boxMin, boxMax in boxes.values():
+                for i in range(len(boxMin)):
+                    total += boxMax[i] - boxMin[i]
+                    count += 1
+            cellSize = total / count if count else 1.0
+        index = BoxIndex(cellSize)
+        for key, box in boxes.items():
+            index.insert(key, box[0], box[1])
+        return index
+
+    @staticmethod
+    def fromElements(elements, cellSize=None):
+        """
+        Creates a new index for the bounding boxes of a list of Revit elements.
+        The element ids as strings are used as keys.
+
+        Args:
+            elements (object): A list of Revit elements
+            cellSize (float, optional): The edge length of the grid cells. Defaults to None.
+
+        Returns:
+            object: A BoxIndex instance
+        """
+        from revitron import _
+        boxes = {}
+        for element in elements:
+            bbox = _(element).getBbox()
+            boxes[str(element.Id)] = (
+                tuple(bbox.Min[i] for i in range(3)),
+                tuple(bbox.Max[i] for i in range(3)))
+        return BoxIndex.fromBoxes(boxes, cellSize)
+
+    def insert(self, key, boxMin, boxMax):
+        """
+        Adds a box to the index.
+
+        Args:
+            key (mixed): A hashable key for the box
+            boxMin (tuple): The min point of the box
+            boxMax (tuple): The max point of the box
+        """
+        box = (tuple(boxMin), tuple(boxMax))
+        self.boxes[key] = box
+        cells = self._getCells(box[0], box[1], 0)
+        if cells is None:
+            self.large.append(key)
+            return
+        for cell in cells:
+            self.cells[cell].append(key)
+
+    def query(self, boxMin, boxMax, tolerance=0):
+        """
+        Gets the keys of all boxes that overlap a given box.
+
+        Args:
+            boxMin (tuple): The min point of the box
+            boxMax (tuple): The max point of the box
+            tolerance (float, optional): The distance at which boxes still count as overlapping. Defaults to 0.
+
+        Returns:
+            set: A set of keys
+        """
+        box = (tuple(boxMin), tuple(boxMax))
+        candidates = set(self.large)
+        cells = self._getCells(box[0], box[1], tolerance)
+        if cells is None:
+            candidates.update(self.boxes.keys())
+        else:
+            for cell in cells:
+                candidates.update(self.cells.get(cell, []))
+        return set(key for key in candidates
+            if BoxesOverlap(box, self.boxes[key], tolerance))
+
+    def queryPoint(self, point):
+        """
+        Gets the keys of all boxes that contain a point. 
+        This is faster than :meth:`query` with a box of zero size.
+
+        Args:
+            point (tuple): A point
+
+        Returns:
+            list: A list of keys
+        """
+        size = self.cellSize
+        cell = tuple(int(value // size) for value in point)
+        keys = self.cells.get(cell, [])
+        if self.large:
+            keys = keys + self.large
+        out = []
+        for key in keys:
+            boxMin, boxMax = self.boxes[key]
+            for i in range(len(point)):
+                if point[i] < boxMin[i] or point[i] > boxMax[i]:
+                    break
+            else:
+                out.append(key)
+        return out
+
+    def getPairs(self, tolerance=0):
+        """
+        Gets all pairs of overlapping boxes. Every pair is only returned once.
+
+        Args:
+            tolerance (float, optional): The distance at which boxes still count as overlapping. Defaults to 0.
+
+        Returns:
+            list: A list of (key, key) tuples
+        """
+        boxes = self.boxes
+        cells, large = self.cells, self.large
+        if tolerance:
+            # Boxes in neighbouring cells can overlap within the tolerance.
+            cells, large = defaultdict(list), []
+            for key, box in boxes.items():
+                keyCells = self._getCells(box[0], box[1], tolerance)
+                if keyCells is None:
+                    large.append(key)
+                else:
+                    for cell in keyCells:
+                        cells[cell].append(key)
+        pairs = []
+        seen = set()
+        # Boxes that cover too many cells are compared with all other boxes.
+        buckets = [(bucket, bucket) for bucket in cells.values()]
+        buckets += [([key], list(boxes.keys())) for key in large]
+        for bucket, others in buckets:
+            for i in range(len(bucket)):
+                a = bucket[i]
+                start = i + 1 if others is bucket else 0
+                for b in others[start:]:
+                    if a == b or (a, b) in seen or (b, a) in seen:
+                        continue
+                    seen.add((a, b))
+                    if BoxesOverlap(boxes[a], boxes[b], tolerance):
+                        pairs.append((a, b))
+        return pairs
+
+    def _getCells(self, boxMin, boxMax, tolerance):
+        size = self.cellSize
+        ranges = []
+        for i in range(len(boxMin)):
+            start = int((boxMin[i] - tolerance) // size)
+            end = int((boxMax[i] + tolerance) // size)
+            if end - start >= self.MAX_CELLS:
+                return None
+            ranges.append(range(start, end + 1))
+        cells = [()]
+        for axis in ranges:
+            cells = [cell + (x,) for cell in cells for x in axis]
+        return cells
+
+
+class DisjointSet:
+    """
+    Union-find structure for grouping connected items, for example all elements
+    that are connected by overlapping bounding boxes::
+
+        groups = mastoron.DisjointSet(keys, index.getPairs()).getGroups()
+
+    Items must be hashable. Finding the group of an item takes almost constant 
+    time thanks to union by rank and path compression.
+    """
+
+    def __init__(self, items=None, pairs=None):
+        """
+        Inits a new DisjointSet instance.
+
+        Args:
+            items (list, optional): A list of items. Defaults to None.
+            pairs (list, optional): A list of (item, item) tuples of connected items. Defaults to None.
+        """
+        self.parents = {}
+        self.ranks = {}
+        self.order = []
+        for item in items or []:
+            self.add(item)
+        for a, b in pairs or []:
+            self.union(a, b)
+
+    def add(self, item):
+        """
+        Adds an item as its own group if it is not known yet.
+
+        Args:
+            item (mixed): A hashable item
+        """
+        if item not in self.parents:
+            self.parents[item] = item
+            self.ranks[item] = 0
+            self.order.append(item)
+
+    def find(self, item):
+        """
+        Gets the representative item of the group of an item.
+
+        Args:
+            item (mixed): A hashable item
+
+        Returns:
+            mixed: The representative item
+        """
+        self.add(item)
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, a, b):
+        """
+        Joins the groups of two items.
+
+        Args:
+            a (mixed): A hashable item
+            b (mixed): A hashable item
+        """
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return
+        if self.ranks[a] < self.ranks[b]:
+            a, b = b, a
+        self.parents[b] = a
+        if self.ranks[a] == self.ranks[b]:
+            self.ranks[a] += 1
+
+    def getGroups(self):
+        """
+        Gets all groups in the order the items have been added.
+
+        Returns:
+            list: A list of lists of items
+        """
+        groups = {}
+        out = []
+        for item in self.order:
+            root = self.find(item)
+            if root not in groups:
+                groups[root] = []
+                out.append(groups[root])
+            groups[root].append(item)
+        return out
@@ -0,0 +1,1361 @@
+import os
+import json
+import time
+import zlib
+import errno
+import socket
+import base64
+import hashlib
+import shutil
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+from mastoron.variables import NAME, MASTORON_COLORSCHEMES, MASTORON_VIEWS, MASTORON_VERSION
+
+__all__ = [
+    'EncodeIds', 'DecodeIds', 'EncodeIdColors', 'DecodeIdColors', 'ReadFile', 'WriteFile',
+    'DiffConfig', 'PatchConfig', 'FileLock',
+    'FileStore', 'SqliteStore', 'SqliteJsonStore', 'SqliteElementStore', 'ShardDict',
+    'JsonFile', 'JournalFile', 'StoreConfig', 'ShardedConfig', 'SqliteConfig'
+]
+
+# Lists with more ids are compressed by EncodeIds().
+ID_COMPRESS_THRESHOLD = 64
+
+# Journals that grow beyond this size in bytes are compacted into the snapshot.
+JOURNAL_COMPACT_THRESHOLD = 256 * 1024
+
+
+def EncodeIds(ids, compress=None):
+    """
+    Encodes a list of element ids as a compact string. The ids are sorted, 
+    delta encoded as variable length integers and stored as base64, 
+    optionally compressed with zlib::
+
+        d:<base64 of varints>
+        z:<base64 of zlib compressed varints>
+
+    Args:
+        ids (mixed): A list of Revit element ids, integers or strings
+        compress (bool, optional): Compress with zlib, by default lists longer than ``ID_COMPRESS_THRESHOLD`` are compressed
+
+    Returns:
+        string: The encoded ids
+    """
+    values = sorted(set(int(str(elementId)) for elementId in ids))
+    data = bytearray()
+    previous = 0
+    for value in values:
+        delta = value - previous
+        previous = value
+        # Zigzag encoding keeps a negative first id small.
+        delta = delta * 2 if delta >= 0 else -delta * 2 - 1
+        while delta > 0x7f:
+            data.append((delta & 0x7f) | 0x80)
+            delta >>= 7
+        data.append(delta)
+    if compress is None:
+        compress = len(values) > ID_COMPRESS_THRESHOLD
+    if compress:
+        return 'z:' + base64.b64encode(zlib.compress(bytes(data))).decode('ascii')
+    return 'd:' + base64.b64encode(bytes(data)).decode('ascii')
+
+
+def DecodeIds(value):
+    """
+    Decodes element ids that were encoded by :func:`EncodeIds` or :func:`EncodeIdColors`. 
+    Plain lists of ids, as stored by older versions, are accepted as well.
+
+    Args:
+        value (mixed): The encoded ids, ids grouped by color or a list of ids
+
+    Returns:
+        string: A sorted list of element ids as strings
+    """
+    if isinstance(value, dict):
+        ids = []
+        for group in value.values():
+            ids.extend(DecodeIds(group))
+        return sorted(ids, key=int)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [str(elementId) for elementId in value]
+    data = base64.b64decode(value[2:])
+    if value.startswith('z:'):
+        data = zlib.decompress(data)
+    ids = []
+    current = 0
+    delta = 0
+    shift = 0
+    for byte in bytearray(data):
+        delta |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += delta >> 1 if not delta & 1 else -((delta + 1) >> 1)
+        ids.append(str(current))
+        delta = 0
+        shift = 0
+    return ids
+
+
+def EncodeIdColors(colors):
+    """
+    Encodes element ids together with the color they were overridden with.
+    The ids are grouped by color and every group is encoded by :func:`EncodeIds`.
+    Ids with an unknown color are stored under an empty color::
+
+        {"#F44336": "d:...", "": "d:..."}
+
+    In case no color is known at all, only the encoded ids are returned.
+
+    Args:
+        colors (dict): Element ids with a hex color or None each
+
+    Returns:
+        mixed: The encoded groups or the encoded ids
+    """
+    groups = {}
+    for elementId, color in colors.items():
+        groups.setdefault(color or '', []).append(elementId)
+    if list(groups.keys()) == ['']:
+        return EncodeIds(groups[''])
+    return dict((color, EncodeIds(ids)) for color, ids in groups.items())
+
+
+def DecodeIdColors(value):
+    """
+    Decodes element ids that were encoded by :func:`EncodeIdColors`.
+    All values accepted by :func:`DecodeIds` are accepted as well.
+
+    Args:
+        value (mixed): The encoded groups or ids
+
+    Returns:
+        dict: Element ids as strings with a hex color or None each
+    """
+    if not isinstance(value, dict):
+        return dict((elementId, None) for elementId in DecodeIds(value))
+    colors = {}
+    for color, group in value.items():
+        for elementId in DecodeIds(group):
+            colors[elementId] = color or None
+    return colors
+
+
+def _quote(name):
+    """
+    Converts a scheme name or view id into a safe file name.
+
+    Args:
+        name (string): The name
+
+    Returns:
+        string: The file name
+    """
+    safe = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 _-'
+    out = []
+    for char in name:
+        if char in safe:
+            out.append(char)
+        else:
+            for byte in bytearray(char.encode('utf-8')):
+                out.append('%{:02X}'.format(byte))
+    return ''.join(out)
+
+
+def _unquote(fileName):
+    """
+    Reverts :func:`_quote`.
+
+    Args:
+        fileName (string): The file name
+
+    Returns:
+        string: The original name
+    """
+    data = bytearray()
+    i = 0
+    while i < len(fileName):
+        if fileName[i] == '%':
+            data.append(int(fileName[i + 1:i + 3], 16))
+            i += 3
+        else:
+            data.extend(fileName[i].encode('utf-8'))
+            i += 1
+    return data.decode('utf-8')
+
+
+def _plain(value):
+    """
+    Converts nested mappings like a :class:`ShardDict` into plain dicts that can be
+    stored as JSON.
+
+    Args:
+        value (mixed): The value
+
+    Returns:
+        mixed: The value with all mappings converted
+    """
+    if isinstance(value, Mapping):
+        return dict((key, _plain(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _snapshot(value):
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict((key, _snapshot(item)) for key, item in value.items())
+    return value
+
+
+def _dumps(data):
+    return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+
+def _digest(raw):
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return (stat.st_mtime, stat.st_size)
+
+
+def ReadFile(path):
+    """
+    Reads a UTF-8 encoded text file.
+
+    Args:
+        path (string): The file path
+
+    Returns:
+        string: The file content
+    """
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def WriteFile(path, raw):
+    """
+    Writes a UTF-8 encoded text file atomically. The content is written to a temporary file 
+    next to the target, flushed to disk and then renamed to the target path,
+    readers never see a partially written file.
+
+    Args:
+        path (string): The file path
+        raw (string): The file content
+    """
+    temp = '{}.{}-{}.tmp'.format(path, socket.gethostname(), os.getpid())
+    with open(temp, 'wb') as f:
+        f.write(raw.encode('utf-8'))
+        f.flush()
+        try:
+            os.fsync(f.fileno())
+        except (AttributeError, OSError):
+            pass
+    if hasattr(os, 'replace'):
+        os.replace(temp, path)
+        return
+    try:
+        os.rename(temp, path)
+    except OSError:
+        # Windows can't rename onto an existing file in Python 2.
+        backup = temp + '.bak'
+        os.rename(path, backup)
+        os.rename(temp, path)
+        os.remove(backup)
+
+
+def DiffConfig(base, data):
+    """
+    Computes the changes that turn one config into another. Nested dicts are
+    compared item by item, all other values are compared as a whole.
+
+    Args:
+        base (dict): The original config
+        data (dict): The changed config
+
+    Returns:
+        dict: A patch with ``set``, ``delete`` and ``patch`` items, or None in case nothing changed
+    """
+    patch = {}
+    for key, value in data.items():
+        if key not in base:
+            patch.setdefault('set', {})[key] = value
+        elif isinstance(value, dict) and isinstance(base[key], dict):
+            subPatch = DiffConfig(base[key], value)
+            if subPatch:
+                patch.setdefault('patch', {})[key] = subPatch
+        elif value != base[key]:
+            patch.setdefault('set', {})[key] = value
+    for key in base.keys():
+        if key not in data:
+            patch.setdefault('delete', []).append(key)
+    return patch or None
+
+
+def PatchConfig(data, patch):
+    """
+    Applies a patch created by :func:`DiffConfig` to a config in place.
+
+    Args:
+        data (dict): The config
+        patch (dict): The patch
+
+    Returns:
+        dict: The patched config
+    """
+    for key, value in patch.get('set', {}).items():
+        data[key] = value
+    for key in patch.get('delete', []):
+        data.pop(key, None)
+    for key, subPatch in patch.get('patch', {}).items():
+        if not isinstance(data.get(key), dict):
+            data[key] = {}
+        PatchConfig(data[key], subPatch)
+    return data
+
+
+class FileLock(object):
+    """
+    An advisory lock for files that are shared by multiple Revit sessions.
+    The lock is a ``.lock`` file next to the locked path that is created
+    exclusively and removed when the lock is released::
+
+        with FileLock(path):
+            ...
+
+    Locks older than ``STALE`` seconds are considered left over by a crashed
+    session and are removed.
+    """
+
+    TIMEOUT = 10
+    STALE = 60
+
+    def __init__(self, path, timeout=None):
+        """
+        Inits a new FileLock instance.
+
+        Args:
+            path (string): The path to lock
+            timeout (int, optional): Seconds to wait for the lock. Defaults to ``TIMEOUT``.
+        """
+        self.lockPath = path + '.lock'
+        self.timeout = timeout or self.TIMEOUT
+
+    def __enter__(self):
+        start = time.time()
+        while True:
+            try:
+                fd = os.open(self.lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                owner = '{} {}'.format(socket.gethostname(), os.getpid())
+                os.write(fd, owner.encode('utf-8'))
+                os.close(fd)
+                return self
+            except OSError as e:
+                if e.errno not in (errno.EEXIST, errno.EACCES):
+                    raise
+            try:
+                if time.time() - os.stat(self.lockPath).st_mtime > self.STALE:
+                    os.remove(self.lockPath)
+                    continue
+            except OSError:
+                continue
+            if time.time() - start > self.timeout:
+                raise IOError('Mastoron config is locked by another session: {}'.format(
+                    self.lockPath))
+            time.sleep(0.1)
+
+    def __exit__(self, excType, excValue, traceback):
+        try:
+            os.remove(self.lockPath)
+        except OSError:
+            pass
+        return False
+
+
+class FileStore(object):
+    """
+    Stores the items of a :class:`ShardDict` as JSON files in nested directories.
+    """
+
+    def __init__(self, directory):
+        """
+        Inits a new FileStore instance.
+
+        Args:
+            directory (string): The root directory
+        """
+        self.directory = directory
+
+    def names(self, path, leaf):
+        """
+        Lists the item names stored below a path.
+
+        Args:
+            path (tuple): The path of the parent item
+            leaf (bool): True in case the items are files
+
+        Returns:
+            string: A list of names
+        """
+        directory = self._path(path)
+        if not os.path.isdir(directory):
+            return []
+        names = []
+        for fileName in os.listdir(directory):
+            if leaf:
+                if not fileName.endswith('.json'):
+                    continue
+                fileName = fileName[:-5]
+            names.append(_unquote(fileName))
+        return names
+
+    def load(self, path):
+        """
+        Loads a single item.
+
+        Args:
+            path (tuple): The item path
+
+        Returns:
+            tuple: The value and a token that is passed to ``save`` and ``changed``
+        """
+        fileName = self._path(path) + '.json'
+        raw = ReadFile(fileName)
+        return json.loads(raw), (_stamp(fileName), _digest(raw))
+
+    def save(self, path, value, token):
+        """
+        Saves a single item in case it was changed.
+
+        Args:
+            path (tuple): The item path
+            value (mixed): The value
+            token (tuple): The token returned by the last ``load`` or ``save``
+
+        Returns:
+            tuple: The new token
+        """
+        raw = _dumps(value)
+        digest = _digest(raw)
+        if token and token[1] == digest:
+            return token
+        fileName = self._path(path) + '.json'
+        directory = os.path.dirname(fileName)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        WriteFile(fileName, raw)
+        return (_stamp(fileName), digest)
+
+    def delete(self, path):
+        """
+        Deletes an item and all of its children.
+
+        Args:
+            path (tuple): The item path
+        """
+        directory = self._path(path)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        elif os.path.exists(directory + '.json'):
+            os.remove(directory + '.json')
+
+    def changed(self, path, token):
+        """
+        Checks whether an item was changed on disk since it was loaded or saved.
+
+        Args:
+            path (tuple): The item path
+            token (tuple): The token returned by the last ``load`` or ``save``
+
+        Returns:
+            bool: True if the item was changed
+        """
+        fileName = self._path(path) + '.json'
+        return not os.path.exists(fileName) or _stamp(fileName) != token[0]
+
+    def version(self, path):
+        """
+        Returns a token that changes whenever items are added below a path or removed.
+
+        Args:
+            path (tuple): The path of the parent item
+
+        Returns:
+            tuple: The token, an empty tuple in case there are no items
+        """
+        directory = self._path(path)
+        if not os.path.isdir(directory):
+            return ()
+        return _stamp(directory)
+
+    def modified(self):
+        """
+        Checks whether any item may have been changed by others since the last check.
+        Files can't tell without checking every item.
+
+        Returns:
+            bool: Always True
+        """
+        return True
+
+    def _path(self, path):
+        return os.path.join(self.directory, *[_quote(name) for name in path])
+
+
+class SqliteStore(object):
+    """
+    Base class for storing the items of a :class:`ShardDict` in a SQLite database.
+    """
+
+    def __init__(self, connection):
+        """
+        Inits a new SqliteStore instance.
+
+        Args:
+            connection (object): A sqlite3 connection
+        """
+        self.connection = connection
+        self._seen = None
+
+    def modified(self):
+        """
+        Checks whether the database was changed by another connection since 
+        the last check.
+
+        Returns:
+            bool: True if the database may have been changed
+        """
+        version = self._version()
+        if version is not None and version == self._seen:
+            return False
+        self._seen = version
+        return True
+
+    def changed(self, path, token):
+        """
+        Checks whether the database was changed by another connection since
+        an item was loaded or saved.
+
+        Args:
+            path (tuple): The item path
+            token (tuple): The token returned by the last ``load`` or ``save``
+
+        Returns:
+            bool: True if the item may have been changed
+        """
+        version = self._version()
+        return version is None or version != token[0]
+
+    def version(self, path):
+        """
+        Returns a token that changes whenever another connection changed the database.
+
+        Args:
+            path (tuple): The path of the parent item
+
+        Returns:
+            int: The token or None in case changes can't be detected
+        """
+        return self._version()
+
+    def _version(self):
+        try:
+            return self.connection.execute('PRAGMA data_version').fetchone()[0]
+        except Exception:
+            # Older SQLite versions can't tell, items are always reloaded.
+            return None
+
+
+class SqliteJsonStore(SqliteStore):
+    """
+    Stores JSON encoded items in a SQLite table with a ``name`` and a ``data`` column.
+    """
+
+    def __init__(self, connection, table):
+        """
+        Inits a new SqliteJsonStore instance.
+
+        Args:
+            connection (object): A sqlite3 connection
+            table (string): The table name
+        """
+        super(SqliteJsonStore, self).__init__(connection)
+        self.table = table
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS {} (name TEXT PRIMARY KEY, data TEXT)'.format(table))
+
+    def names(self, path, leaf):
+        rows = self.connection.execute('SELECT name FROM {}'.format(self.table))
+        return [row[0] for row in rows]
+
+    def load(self, path):
+        row = self.connection.execute(
+            'SELECT data FROM {} WHERE name = ?'.format(self.table), (path[-1],)).fetchone()
+        return json.loads(row[0]), (self._version(), _digest(row[0]))
+
+    def save(self, path, value, token):
+        raw = _dumps(value)
+        digest = _digest(raw)
+        if token and token[1] == digest:
+            return token
+        self.connection.execute(
+            'INSERT OR REPLACE INTO {} (name, data) VALUES (?, ?)'.format(self.table),
+            (path[-1], raw))
+        return (self._version(), digest)
+
+    def delete(self, path):
+        self.connection.execute(
+            'DELETE FROM {} WHERE name = ?'.format(self.table), (path[-1],))
+
+
+class SqliteElementStore(SqliteStore):
+    """
+    Stores the ids of overridden elements per color scheme and view as
+    indexed rows of a SQLite table, together with the applied color. Saving a 
+    list only inserts, updates and deletes the rows that actually changed, 
+    unchanged lists are skipped.
+    """
+
+    def __init__(self, connection):
+        """
+        Inits a new SqliteElementStore instance.
+
+        Args:
+            connection (object): A sqlite3 connection
+        """
+        super(SqliteElementStore, self).__init__(connection)
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS elements ('
+            'scheme TEXT NOT NULL, view_id TEXT NOT NULL, element_id INTEGER NOT NULL, '
+            'PRIMARY KEY (scheme, view_id, element_id))')
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS elements_element_id ON elements (element_id)')
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(elements)')]
+        if 'color' not in columns:
+            connection.execute('ALTER TABLE elements ADD COLUMN color TEXT')
+
+    def names(self, path, leaf):
+        if not path:
+            rows = self.connection.execute('SELECT DISTINCT scheme FROM elements')
+        else:
+            rows = self.connection.execute(
+                'SELECT DISTINCT view_id FROM elements WHERE scheme = ?', path)
+        return [row[0] for row in rows]
+
+    def load(self, path):
+        colors = self._getColors(path)
+        value = dict((str(elementId), color) for elementId, color in colors.items())
+        if not any(colors.values()):
+            value = list(value.keys())
+            return value, (self._version(), colors, _snapshot(value))
+        groups = {}
+        for elementId, color in value.items():
+            groups.setdefault(color or '', []).append(elementId)
+        return groups, (self._version(), colors, _snapshot(groups))
+
+    def save(self, path, value, token):
+        # Values that were not changed since they were loaded or saved are
+        # skipped without decoding their ids again.
+        if token and token[2] == value:
+            return token
+        colors = dict((int(elementId), color) 
+            for elementId, color in DecodeIdColors(value).items())
+        if token:
+            existing = token[1]
+        else:
+            existing = self._getColors(path)
+        scheme, viewId = path
+        self.connection.executemany(
+            'DELETE FROM elements WHERE scheme = ? AND view_id = ? AND element_id = ?',
+            [(scheme, viewId, elementId) for elementId in existing if elementId not in colors])
+        self.connection.executemany(
+            'INSERT INTO elements (scheme, view_id, element_id, color) VALUES (?, ?, ?, ?)',
+            [(scheme, viewId, elementId, color) 
+                for elementId, color in colors.items() if elementId not in existing])
+        self.connection.executemany(
+            'UPDATE elements SET color = ? WHERE scheme = ? AND view_id = ? AND element_id = ?',
+            [(color, scheme, viewId, elementId) for elementId, color in colors.items() 
+                if elementId in existing and existing[elementId] != color])
+        return (self._version(), colors, _snapshot(value))
+
+    def delete(self, path):
+        if len(path) == 1:
+            self.connection.execute('DELETE FROM elements WHERE scheme = ?', path)
+        else:
+            self.connection.execute(
+                'DELETE FROM elements WHERE scheme = ? AND view_id = ?', path)
+
+    def find(self, elementId):
+        """
+        Finds all color schemes and views that override a given element.
+
+        Args:
+            elementId (object or string): A Revit element id
+
+        Returns:
+            tuple: A list of (scheme name, view id) tuples
+        """
+        rows = self.connection.execute(
+            'SELECT scheme, view_id FROM elements WHERE element_id = ?',
+            (int(str(elementId)),))
+        return [(row[0], row[1]) for row in rows]
+
+    def _getColors(self, path):
+        rows = self.connection.execute(
+            'SELECT element_id, color FROM elements WHERE scheme = ? AND view_id = ?', path)
+        return dict((row[0], row[1]) for row in rows)
+
+
+class ShardDict(MutableMapping):
+    """
+    A mapping whose items are kept in a store, like one file per item.
+    Items are loaded lazily on first access and only changed items are
+    written back to the store.
+    """
+
+    def __init__(self, store, path=(), depth=1):
+        """
+        Inits a new ShardDict instance.
+
+        Args:
+            store (object): A :class:`FileStore`, :class:`SqliteJsonStore` or :class:`SqliteElementStore`
+            path (tuple, optional): The path of this mapping inside the store. Defaults to ().
+            depth (int, optional): The number of nested mapping levels. Defaults to 1.
+        """
+        self.store = store
+        self.path = path
+        self.depth = depth
+        self._names = None
+        self._version = None
+        self._loaded = {}
+        self._tokens = {}
+        self._deleted = set()
+        # Incremented whenever refresh() finds changes made by others.
+        self.generation = 0
+        # Changes whenever items may have been changed, replaced or reloaded.
+        self.revision = 0
+
+    def __getitem__(self, key):
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self._getNames():
+            raise KeyError(key)
+        if self.depth > 1:
+            value = ShardDict(self.store, self.path + (key,), self.depth - 1)
+        else:
+            value, self._tokens[key] = self.store.load(self.path + (key,))
+        self._loaded[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if self.depth > 1 and value is not self._loaded.get(key):
+            shards = self._loaded.get(key)
+            if shards is None:
+                shards = ShardDict(self.store, self.path + (key,), self.depth - 1)
+            for name in list(shards.keys()):
+                if name not in value:
+                    del shards[name]
+            for name in value.keys():
+                shards[name] = value[name]
+            value = shards
+        self._getNames().add(key)
+        self._deleted.discard(key)
+        self._loaded[key] = value
+        self.revision += 1
+
+    def __delitem__(self, key):
+        if key not in self._getNames():
+            raise KeyError(key)
+        self._names.discard(key)
+        self._loaded.pop(key, None)
+        self._tokens.pop(key, None)
+        self._deleted.add(key)
+        self.revision += 1
+
+    def __contains__(self, key):
+        return key in self._getNames()
+
+    def __iter__(self):
+        return iter(sorted(self._getNames()))
+
+    def __len__(self):
+        return len(self._getNames())
+
+    def write(self):
+        """
+        Writes all changed items to the store and removes deleted or empty items.
+        """
+        for key, value in list(self._loaded.items()):
+            if self.depth > 1:
+                value.write()
+            if not value:
+                del self[key]
+        for key in self._deleted:
+            self.store.delete(self.path + (key,))
+        self._deleted = set()
+        if self.depth == 1:
+            for key, value in self._loaded.items():
+                self._tokens[key] = self.store.save(
+                    self.path + (key,), value, self._tokens.get(key))
+        # The own changes are already part of the names.
+        if self._names is not None:
+            self._version = self.store.version(self.path)
+
+    def refresh(self):
+        """
+        Drops all loaded items that were changed in the store since they were loaded.
+
+        Returns:
+            bool: True in case any item was changed, added or removed by others
+        """
+        # Nested mappings share the store, only the top level can ask for changes.
+        if not self.path and not self.store.modified():
+            return False
+        changed = False
+        if self._names is not None:
+            version = self.store.version(self.path)
+            if version is None or version != self._version:
+                self._names = None
+                changed = True
+        for key in list(self._loaded.keys()):
+            if self.depth > 1:
+                changed = self._loaded[key].refresh() or changed
+            elif key in self._tokens and \
+                    self.store.changed(self.path + (key,), self._tokens[key]):
+                del self._loaded[key]
+                del self._tokens[key]
+                changed = True
+        if changed:
+            self.generation += 1
+            self.revision += 1
+        return changed
+
+    def _getNames(self):
+        if self._names is None:
+            self._version = self.store.version(self.path)
+            self._names = set(self._loaded.keys())
+            self._names.update(self.store.names(self.path, self.depth == 1))
+            self._names -= self._deleted
+        return self._names
+
+
+class JsonFile(MutableMapping):
+    """
+    A mapping that is stored as a single JSON file.
+    The file is only written in case its content was changed.
+
+    Writing is protected by a :class:`FileLock` and done atomically. Every write
+    increments the ``mastoron.version`` stamp of the file. In case the file was 
+    updated by another session since it was read, the changes of this session are 
+    merged into the updated file instead of overwriting it.
+
+    Changes of other sessions are merged into the loaded data by :meth:`refresh`.
+    Nested dicts are updated in place, dicts that were returned before stay
+    up to date.
+    """
+
+    def __init__(self, path):
+        """
+        Inits a new JsonFile instance.
+
+        Args:
+            path (string): The file path
+        """
+        self.path = path
+        self._data = None
+        self._token = None
+        self._base = None
+        # Incremented whenever refresh() merges changes of other sessions.
+        self.generation = 0
+
+    def __getitem__(self, key):
+        return self._getData()[key]
+
+    def __setitem__(self, key, value):
+        self._getData()[key] = value
+
+    def __delitem__(self, key):
+        del self._getData()[key]
+
+    def __iter__(self):
+        return iter(self._getData())
+
+    def __len__(self):
+        return len(self._getData())
+
+    def write(self):
+        """
+        Writes the file in case it was changed.
+        """
+        data = self._getData()
+        if self._token and self._token[1] == _digest(_dumps(data)):
+            return
+        with FileLock(self.path):
+            if self._token and os.path.exists(self.path) \
+                    and _stamp(self.path) != self._token[0]:
+                if self._merge():
+                    self.generation += 1
+            data[MASTORON_VERSION] = data.get(MASTORON_VERSION, 0) + 1
+            raw = _dumps(data)
+            WriteFile(self.path, raw)
+            self._token = (_stamp(self.path), _digest(raw))
+            self._base = raw
+
+    def refresh(self):
+        """
+        Merges the changes that were written to the file by others since it was read.
+        """
+        if self._data is None:
+            return
+        if not self._token or not os.path.exists(self.path):
+            self._data = None
+            self._token = None
+            self._base = None
+        elif _stamp(self.path) != self._token[0]:
+            if self._merge():
+                self.generation += 1
+
+    @classmethod
+    def migrate(cls, data, target):
+        """
+        Copies all items of an existing config into a new JSON file.
+
+        Args:
+            data (dict): The existing config
+            target (string): The path of the new file
+
+        Returns:
+            object: The new config
+        """
+        config = cls(target)
+        for key, value in data.items():
+            if value:
+                config[key] = _plain(value)
+        config.write()
+        return config
+
+    def _merge(self):
+        """
+        Merges the file on disk with the loaded data. Both are compared with the
+        version that was loaded before, the changes of this session win over 
+        changes of the same items on disk.
+
+        Returns:
+            bool: True in case the file contained changes of others
+        """
+        stamp = _stamp(self.path)
+        raw = ReadFile(self.path)
+        digest = _digest(raw)
+        if digest == self._token[1]:
+            self._token = (stamp, digest)
+            return False
+        base = json.loads(self._base)
+        ours = DiffConfig(base, self._data)
+        theirs = DiffConfig(base, json.loads(raw))
+        # The dicts are patched in place, they are shared with all users of this config.
+        if theirs:
+            PatchConfig(self._data, theirs)
+        if ours:
+            ours.get('set', {}).pop(MASTORON_VERSION, None)
+            PatchConfig(self._data, ours)
+        self._token = (stamp, digest)
+        self._base = raw
+        return True
+
+    def _getData(self):
+        if self._data is None:
+            self._data = {}
+            if os.path.exists(self.path):
+                raw = ReadFile(self.path)
+                self._data = json.loads(raw)
+                self._token = (_stamp(self.path), _digest(raw))
+                self._base = raw
+        return self._data
+
+
+class JournalFile(JsonFile):
+    """
+    A mapping that is stored as a JSON snapshot file and an append-only journal 
+    next to it. Writing only appends a single line with the changes to the journal::
+
+        config.json
+        config.json.journal
+
+    The config is read by replaying all journal records on top of the snapshot.
+    Once the journal exceeds ``JOURNAL_COMPACT_THRESHOLD`` bytes, it is compacted
+    into a new snapshot. Records are patches created by :func:`DiffConfig` and can be
+    replayed more than once, an interrupted compaction doesn't corrupt the config.
+
+    Only top-level items that were set or deleted are compared when writing.
+    """
+
+    EXTENSION = '.journal'
+
+    def __init__(self, path):
+        """
+        Inits a new JournalFile instance.
+
+        Args:
+            path (string): The snapshot file path
+        """
+        super(JournalFile, self).__init__(path)
+        self.journal = path + self.EXTENSION
+        self._offset = 0
+        self._dirty = set()
+
+    def __setitem__(self, key, value):
+        self._getData()[key] = value
+        self._dirty.add(key)
+
+    def __delitem__(self, key):
+        del self._getData()[key]
+        self._dirty.add(key)
+
+    def write(self):
+        """
+        Appends the changes to the journal and compacts it if required.
+        """
+        data = self._getData()
+        if not self._dirty:
+            return
+        with FileLock(self.path):
+            self._replay()
+            # Items that were set to their current value don't need a record.
+            if not self._diff():
+                self._dirty = set()
+                return
+            # A migrated config keeps counting from the version of its source.
+            data[MASTORON_VERSION] = max(
+                self._base.get(MASTORON_VERSION, 0), data.get(MASTORON_VERSION, 0)) + 1
+            self._dirty.add(MASTORON_VERSION)
+            patch = self._diff()
+            self._dirty = set()
+            line = _dumps(patch)
+            with open(self.journal, 'ab') as f:
+                f.write((line + '\n').encode('utf-8'))
+                f.flush()
+                try:
+                    os.fsync(f.fileno())
+                except (AttributeError, OSError):
+                    pass
+            PatchConfig(self._base, json.loads(line))
+            self._offset = os.path.getsize(self.journal)
+            if self._offset > JOURNAL_COMPACT_THRESHOLD or not os.path.exists(self.path):
+                self.compact()
+
+    def compact(self):
+        """
+        Writes the current config as new snapshot and empties the journal.
+        Must be called while holding the lock.
+        """
+        WriteFile(self.path, _dumps(self._base))
+        open(self.journal, 'w').close()
+        self._token = (_stamp(self.path), None)
+        self._offset = 0
+
+    def refresh(self):
+        """
+        Replays new journal records or drops the loaded data in case a new 
+        snapshot was written.
+        """
+        if self._data is not None and not self._dirty:
+            self._replay()
+
+    @classmethod
+    def migrate(cls, data, target):
+        """
+        Copies all items of an existing config into a new journaled JSON file.
+
+        Args:
+            data (dict): The existing config
+            target (string): The path of the new snapshot file
+
+        Returns:
+            object: The new config
+        """
+        open(target + cls.EXTENSION, 'a').close()
+        return super(JournalFile, cls).migrate(data, target)
+
+    def _diff(self):
+        base = dict((k, self._base[k]) for k in self._dirty if k in self._base)
+        data = dict((k, self._data[k]) for k in self._dirty if k in self._data)
+        return DiffConfig(base, data)
+
+    def _replay(self):
+        """
+        Applies the records that were appended by other sessions since the journal
+        was read. Pending changes of this session are applied again on top.
+        """
+        if self._data is None:
+            return
+        stamp = _stamp(self.path) if os.path.exists(self.path) else None
+        size = os.path.getsize(self.journal) if os.path.exists(self.journal) else 0
+        if stamp != self._token[0] or size < self._offset:
+            pending = self._diff()
+            data = self._data
+            self._data = None
+            self._getData()
+            if pending:
+                PatchConfig(self._data, pending)
+            # Keep the dicts themselves, they are shared with all users of this config.
+            patch = DiffConfig(data, self._data)
+            self._data = data
+            if not patch:
+                return
+            PatchConfig(self._data, patch)
+            self.generation += 1
+            return
+        if size == self._offset:
+            return
+        pending = self._diff()
+        lines = self._readJournal()
+        for line in lines:
+            PatchConfig(self._base, json.loads(line))
+            PatchConfig(self._data, json.loads(line))
+        if pending:
+            PatchConfig(self._data, pending)
+        if lines:
+            self.generation += 1
+
+    def _readJournal(self):
+        with open(self.journal, 'rb') as f:
+            f.seek(self._offset)
+            raw = f.read()
+        # Ignore a last line that is still being written.
+        end = raw.rfind(b'\n') + 1
+        self._offset += end
+        lines = raw[:end].decode('utf-8').split('\n')
+        return [line for line in lines if line.strip()]
+
+    def _getData(self):
+        while self._data is None:
+            stamp = None
+            raw = '{}'
+            if os.path.exists(self.path):
+                stamp = _stamp(self.path)
+                raw = ReadFile(self.path)
+            self._base = json.loads(raw)
+            self._data = json.loads(raw)
+            self._offset = 0
+            if os.path.exists(self.journal):
+                for line in self._readJournal():
+                    PatchConfig(self._base, json.loads(line))
+                    PatchConfig(self._data, json.loads(line))
+            self._token = (stamp, None)
+            # Read again in case the journal was compacted in the meantime.
+            if os.path.exists(self.path) and _stamp(self.path) != stamp:
+                self._data = None
+        return self._data
+
+
+class StoreConfig(MutableMapping):
+    """
+    Base class for Mastoron configs that store color schemes and the lists of
+    overridden elements separately from all other config items.
+    The ``mastoron.colorschemes`` item is a list of schemes, the ``mastoron.views``
+    item is a lazily loaded mapping of scheme names, view ids and element id lists.
+    """
+
+    def __init__(self, settings, schemes, views):
+        """
+        Inits a new StoreConfig instance.
+
+        Args:
+            settings (object): A mapping for all other items
+            schemes (object): A :class:`ShardDict` for the color schemes
+            views (object): A :class:`ShardDict` with two levels for the overridden elements
+        """
+        self.settings = settings
+        self.schemes = schemes
+        self.views = views
+        self._schemeList = (None, None)
+
+    def __getitem__(self, key):
+        if key == MASTORON_COLORSCHEMES:
+            if not self.schemes:
+                raise KeyError(key)
+            # The same list is returned as long as the schemes are unchanged.
+            revision, schemeList = self._schemeList
+            if revision != self.schemes.revision:
+                schemeList = [self.schemes[name] for name in self.schemes]
+                self._schemeList = (self.schemes.revision, schemeList)
+            return schemeList
+        if key == MASTORON_VIEWS:
+            if not self.views:
+                raise KeyError(key)
+            return self.views
+        return self.settings[key]
+
+    def __setitem__(self, key, value):
+        if key == MASTORON_COLORSCHEMES:
+            names = set()
+            for scheme in value:
+                names.add(scheme[NAME])
+                self.schemes[scheme[NAME]] = scheme
+            for name in list(self.schemes.keys()):
+                if name not in names:
+                    del self.schemes[name]
+        elif key == MASTORON_VIEWS:
+            if value is not self.views:
+                for name in list(self.views.keys()):
+                    if name not in value:
+                        del self.views[name]
+                for name in value.keys():
+                    self.views[name] = value[name]
+        else:
+            self.settings[key] = value
+
+    def __delitem__(self, key):
+        if key == MASTORON_COLORSCHEMES:
+            self.schemes.clear()
+        elif key == MASTORON_VIEWS:
+            self.views.clear()
+        else:
+            del self.settings[key]
+
+    def __iter__(self):
+        keys = list(self.settings.keys())
+        if self.schemes:
+            keys.append(MASTORON_COLORSCHEMES)
+        if self.views:
+            keys.append(MASTORON_VIEWS)
+        return iter(keys)
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def write(self):
+        """
+        Writes all changed items.
+        """
+        self.settings.write()
+        self.schemes.write()
+        self.views.write()
+
+    def refresh(self):
+        """
+        Drops all loaded items that were changed by others since they were loaded.
+        """
+        self.settings.refresh()
+        self.schemes.refresh()
+        self.views.refresh()
+
+    @classmethod
+    def migrate(cls, data, target):
+        """
+        Copies all items of an existing config into a new config.
+
+        Args:
+            data (dict): The existing config
+            target (string): The path of the new config
+
+        Returns:
+            object: The new config
+        """
+        config = cls(target)
+        for key, value in data.items():
+            if value:
+                config[key] = value
+        config.write()
+        return config
+
+
+class ShardedConfig(StoreConfig):
+    """
+    A Mastoron config that is split into multiple files inside a directory.
+    Every color scheme and the list of overridden elements of every scheme and
+    view are stored in separate files::
+
+        config.json
+        colorschemes/<scheme>.json
+        views/<scheme>/<view id>.json
+
+    Files are loaded lazily on first access and only changed files are written.
+    """
+
+    CONFIG = 'config.json'
+    SCHEMES = 'colorschemes'
+    VIEWS = 'views'
+
+    def __init__(self, directory):
+        """
+        Inits a new ShardedConfig instance.
+
+        Args:
+            directory (string): The config directory
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        super(ShardedConfig, self).__init__(
+            JsonFile(os.path.join(directory, self.CONFIG)),
+            ShardDict(FileStore(os.path.join(directory, self.SCHEMES))),
+            ShardDict(FileStore(os.path.join(directory, self.VIEWS)), depth=2))
+
+    def write(self):
+        """
+        Writes all changed files while holding the lock of the config directory.
+        """
+        with FileLock(os.path.join(self.directory, 'shards')):
+            super(ShardedConfig, self).write()
+
+
+class SqliteConfig(StoreConfig):
+    """
+    A Mastoron config that is stored in a SQLite database.
+    Overridden elements are stored as indexed rows of scheme name, view id
+    and element id. Changing the list of overridden elements of a view only
+    inserts or deletes the affected rows.
+    """
+
+    def __init__(self, path):
+        """
+        Inits a new SqliteConfig instance.
+
+        Args:
+            path (string): The database file
+        """
+        import sqlite3
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.elements = SqliteElementStore(self.connection)
+        super(SqliteConfig, self).__init__(
+            ShardDict(SqliteJsonStore(self.connection, 'config')),
+            ShardDict(SqliteJsonStore(self.connection, 'schemes')),
+            ShardDict(self.elements, depth=2))
+        self.connection.commit()
+
+    def write(self):
+        """
+        Writes all changed items in a single database transaction.
+        """
+        try:
+            super(SqliteConfig, self).write()
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def close(self):
+        """
+        Closes the database connection. The config can't be used anymore afterwards.
+        """
+        self.connection.close()
+
+    def find(self, elementId):
+        """
+        Finds all color schemes and views that override a given element.
+
+        Args:
+            elementId (object or string): A Revit element id
+
+        Returns:
+            tuple: A list of (scheme name, view id) tuples
+        """
+        return self.elements.find(elementId)
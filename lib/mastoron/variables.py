@@ -1,15 +1,21 @@
 FLOOR_OFFSET = 'Height Offset From Level'
 ROOF_OFFSET = 'Base Offset From Level'
+CEILING_OFFSET = 'Height Offset From Level'
 WALL_OFFSET = 'Base Offset'
 WALL_HEIGHT = 'Unconnected Height'
 ROUNDING_DECIMALS = 2
 MASTORON_COLORSCHEME = 'mastoron.colorscheme'
 MASTORON_VIEWS = 'mastoron.views'
+MASTORON_COLORSCHEMES = 'mastoron.colorschemes'
+MASTORON_VERSION = 'mastoron.version'
+MASTORON_FILTERS = 'mastoron.filters'
+MASTORON_STABLE_COLORS = 'mastoron.stablecolors'
 SAVE = 'Save'
 GRADIENTS = 'Gradients'
 NAME = 'name'
 SCHEME_NAME = 'schemeName'
 DATA = 'data'
+BINS = 'bins'
 IS_INSTANCE = 'isInstance'
 PARAM_TYPE = 'paramType'
 VIEWS = 'views'
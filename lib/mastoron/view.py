@@ -2,12 +2,26 @@ import revitron
 import mastoron
 from revitron import _
 from collections import defaultdict
-from mastoron.variables import NAME, SCHEME_NAME, VIEWS, MASTORON_VIEWS, MASTORON_COLORSCHEME
+from mastoron.variables import NAME, DATA, SCHEME_NAME, VIEWS, MASTORON_VIEWS, MASTORON_COLORSCHEME
+from mastoron.variables import MASTORON_FILTERS
+from mastoron.storage import DecodeIds, EncodeIdColors, DecodeIdColors, SqliteConfig
+
+# Process-wide reverse index of overridden elements, see ElementIndex.
+_elementIndex = {'sources': {}, 'ids': {}, 'elements': {}, 'views': None, 'generation': None}
+
+# Shared override settings by color and pattern, see ElementOverrides.getSettings().
+_overrideSettings = {}
+
+# Parsed colors by hex string or rgb tuple, see ElementOverrides.getColors().
+_overrideColors = {}
 
 
 class ElementOverrides:
     """
     Class for handling graphical element overrides.
+
+    The ``OverrideGraphicSettings`` are shared between all elements with the same 
+    color, fill pattern and cut pattern option, see :meth:`getSettings`.
     """
     def __init__(self, view, element):
         """
@@ -16,29 +30,84 @@ class ElementOverrides:
         Args:
             element (object): A Revit element
         """
-        self.overrides = revitron.DB.OverrideGraphicSettings()
+        self.overrides = ElementOverrides.getSettings()
         self.element = element
         self.id = element.Id
         self.view = view
 
+    @staticmethod
+    def getColors(color):
+        """
+        Returns the pattern color and the darker line color for a color. 
+        The Revit colors are only created once per color and must not be modified.
+
+        Args:
+            color (mixed): A hex color string or a list or tuple (r, g, b)
+
+        Returns:
+            tuple: The pattern color and the line color as Revit Color objects
+        """
+        return ElementOverrides._getColors(color)[1:]
+
+    @staticmethod
+    def getSettings(color=None, patternId=None, overrideCutPattern=True):
+        """
+        Returns the shared override settings for a color and fill pattern. 
+        The settings are only created once and must not be modified.
+        Calling without a color returns empty settings that clear all overrides.
+
+        Args:
+            color (mixed, optional): A hex color string or a list or tuple (r, g, b). Defaults to None.
+            patternId (object, optional): An element id of a Revit fill pattern. Defaults to None.
+            overrideCutPattern (bool, optional): Override cut pattern. Defaults to True.
+
+        Returns:
+            object: A Revit OverrideGraphicSettings object
+        """
+        key = None
+        if color is not None:
+            rgb, patternColor, lineColor = ElementOverrides._getColors(color)
+            key = (rgb, patternId.IntegerValue, bool(overrideCutPattern))
+        settings = _overrideSettings.get(key)
+        if settings is None:
+            settings = revitron.DB.OverrideGraphicSettings()
+            if key:
+                settings.SetSurfaceForegroundPatternColor(patternColor)
+                settings.SetSurfaceForegroundPatternId(patternId)
+                settings.SetProjectionLineColor(lineColor)
+                if overrideCutPattern:
+                    settings.SetCutForegroundPatternColor(patternColor)
+                    settings.SetCutForegroundPatternId(patternId)
+            _overrideSettings[key] = settings
+        return settings
+
+    @staticmethod
+    def _getColors(color):
+        if isinstance(color, list):
+            color = tuple(color)
+        colors = _overrideColors.get(color)
+        if colors is None:
+            rgb = color
+            if hasattr(color, 'lstrip'):
+                rgb = mastoron.Color.HEXtoRGB(color)
+            rgb = tuple(int(x) for x in rgb)
+            x = 0.7
+            colors = _overrideColors[color] = (
+                rgb,
+                revitron.DB.Color(rgb[0], rgb[1], rgb[2]),
+                revitron.DB.Color(rgb[0] * x, rgb[1] * x, rgb[2] * x))
+        return colors
+
     def set(self, color, patternId, overrideCutPattern=True):
         """
         Sets graphical element overrides in the active view.
 
         Args:
-            color (int): A list or tuple (r, g, b)
+            color (mixed): A hex color string or a list or tuple (r, g, b)
             pattern (object): An element id of a Revit fill pattern
             overrideCutPattern (bool, optional): Override cut pattern. Defaults to True.
         """
-        patternColor = revitron.DB.Color(color[0], color[1], color[2])
-        x = 0.7
-        lineColor =  revitron.DB.Color(color[0] * x, color[1] * x, color[2] * x)
-        self.overrides.SetSurfaceForegroundPatternColor(patternColor)
-        self.overrides.SetSurfaceForegroundPatternId(patternId)
-        self.overrides.SetProjectionLineColor(lineColor)
-        if overrideCutPattern:
-            self.overrides.SetCutForegroundPatternColor(patternColor)
-            self.overrides.SetCutForegroundPatternId(patternId)
+        self.overrides = ElementOverrides.getSettings(color, patternId, overrideCutPattern)
         self.view.SetElementOverrides(self.id, self.overrides)
         return self.element
 
@@ -46,10 +115,202 @@ class ElementOverrides:
         """
         Clears a graphical element overrides in view.
         """
-        self.view.SetElementOverrides((self.id), self.overrides)
+        self.view.SetElementOverrides((self.id), ElementOverrides.getSettings())
         return self.element
 
 
+class FilterOverrides:
+    """
+    Class for coloring elements by view filters instead of element overrides.
+    Every key of a color scheme gets a parameter filter that matches all elements
+    whose parameter equals the key. The color is applied as filter override of a view,
+    elements that are added or changed later get the right color automatically.
+
+    Filters are named ``Mastoron - <scheme> - <key>`` and shared by all views.
+    The ids of the filters that were applied to a view are stored in the 
+    ``mastoron.filters`` config item.
+    """
+
+    PREFIX = 'Mastoron'
+
+    def __init__(self, view):
+        """
+        Inits a new FilterOverrides instance.
+
+        Args:
+            view (object): A Revit view
+        """
+        self.view = view
+
+    def set(self, colorScheme, parameterId, categoryIds, patternId):
+        """
+        Applies all keys of a color scheme as view filters. Existing filters are 
+        updated and filters of keys that were removed from the scheme are removed 
+        from the view.
+
+        Categories that can't be used in view filters are ignored. Keys whose filter 
+        can't be created for the remaining categories are skipped with a warning.
+
+        Args:
+            colorScheme (dict): A mastoron color scheme
+            parameterId (object): The Revit element id of the parameter
+            categoryIds (list): The Revit element ids of the categories to filter
+            patternId (object): The Revit element id of the fillpattern to use
+
+        Returns:
+            bool: False in case the view or none of the categories support filters
+        """
+        from System.Collections.Generic import List
+        if not self._allowed():
+            return False
+        filterable = set(str(x) for x in 
+            revitron.DB.ParameterFilterUtilities.GetAllFilterableCategories())
+        categoryIds = [x for x in categoryIds if str(x) in filterable]
+        if not categoryIds:
+            revitron.Log().warning('None of the categories can be used in view filters.')
+            return False
+        filters = FilterOverrides.getFilterElements()
+        applied = set()
+        for key, color in colorScheme[DATA].items():
+            name = FilterOverrides.getName(colorScheme, key)
+            elementFilter = FilterOverrides._createFilter(parameterId, key)
+            filterElement = filters.get(name)
+            categories = set(str(x) for x in categoryIds)
+            if filterElement:
+                categories.update(str(x) for x in filterElement.GetCategories())
+            categoryList = List[revitron.DB.ElementId](
+                [revitron.DB.ElementId(int(x)) for x in categories if x in filterable])
+            if not revitron.DB.ParameterFilterElement.AllRuleParametersApplicable(
+                    revitron.DOC, categoryList, elementFilter):
+                revitron.Log().warning(
+                    u'Skipped view filter "{}", the parameter is not available '
+                    u'for all of its categories.'.format(name))
+                continue
+            try:
+                if filterElement:
+                    filterElement.SetCategories(categoryList)
+                    filterElement.SetElementFilter(elementFilter)
+                else:
+                    filterElement = revitron.DB.ParameterFilterElement.Create(
+                        revitron.DOC, name, categoryList, elementFilter)
+            except Exception as error:
+                revitron.Log().warning(u'Skipped view filter "{}": {}'.format(name, error))
+                continue
+            if not self.view.IsFilterApplied(filterElement.Id):
+                self.view.AddFilter(filterElement.Id)
+            self.view.SetFilterOverrides(filterElement.Id, ElementOverrides.getSettings(
+                color, patternId))
+            applied.add(str(filterElement.Id))
+        self._save(colorScheme, applied)
+        return True
+
+    def update(self, colorScheme, patternId):
+        """
+        Updates the colors of all filters of a color scheme that are applied to the view.
+
+        Args:
+            colorScheme (dict): A mastoron color scheme
+            patternId (object): The Revit element id of the fillpattern to use
+        """
+        if not self._allowed():
+            return
+        filters = FilterOverrides.getFilterElements()
+        for key, color in colorScheme[DATA].items():
+            filterElement = filters.get(FilterOverrides.getName(colorScheme, key))
+            if filterElement and self.view.IsFilterApplied(filterElement.Id):
+                self.view.SetFilterOverrides(filterElement.Id, ElementOverrides.getSettings(
+                    color, patternId))
+
+    def clear(self, colorScheme):
+        """
+        Removes all filters of a color scheme from the view.
+
+        Args:
+            colorScheme (dict): A mastoron color scheme
+        """
+        self._save(colorScheme, set())
+
+    @staticmethod
+    def getViews(colorScheme):
+        """
+        Gets the ids of all views that have the filters of a color scheme applied.
+
+        Args:
+            colorScheme (dict): A mastoron color scheme
+
+        Returns:
+            list: A list of view id strings
+        """
+        filters = mastoron.ConfigStorage().get(MASTORON_FILTERS, {})
+        return list(filters.get(colorScheme[NAME], {}).keys())
+
+    @staticmethod
+    def getName(colorScheme, key):
+        """
+        Gets the name of the filter of a color scheme key. Characters that are not 
+        allowed in Revit names are replaced.
+
+        Args:
+            colorScheme (dict): A mastoron color scheme
+            key (string): The key
+
+        Returns:
+            string: The filter name
+        """
+        import hashlib
+        name = u'{} - {} - {}'.format(FilterOverrides.PREFIX, colorScheme[NAME], key)
+        cleanName = name
+        for char in '\\:{}[]|;<>?`~':
+            cleanName = cleanName.replace(char, '_')
+        if cleanName != name:
+            cleanName += ' ' + hashlib.md5(name.encode('utf-8')).hexdigest()[:6]
+        return cleanName
+
+    @staticmethod
+    def getFilterElements():
+        """
+        Gets all parameter filters of the document by name.
+
+        Returns:
+            dict: The filter names with a Revit ParameterFilterElement each
+        """
+        elements = revitron.Filter().byClass('ParameterFilterElement').getElements()
+        return dict((element.Name, element) for element in elements)
+
+    def _save(self, colorScheme, applied):
+        filters = mastoron.ConfigStorage().get(MASTORON_FILTERS, {})
+        schemeViews = filters.setdefault(colorScheme[NAME], {})
+        for filterId in schemeViews.get(str(self.view.Id), []):
+            if filterId in applied:
+                continue
+            elementId = revitron.DB.ElementId(int(filterId))
+            if self.view.IsFilterApplied(elementId):
+                self.view.RemoveFilter(elementId)
+        if applied:
+            schemeViews[str(self.view.Id)] = sorted(applied)
+        else:
+            schemeViews.pop(str(self.view.Id), None)
+        if not schemeViews:
+            del filters[colorScheme[NAME]]
+        mastoron.ConfigStorage().set(MASTORON_FILTERS, filters)
+
+    def _allowed(self):
+        if self.view.AreGraphicsOverridesAllowed():
+            return True
+        revitron.Log().warning(u'View "{}" doesn\'t support view filters.'.format(self.view.Name))
+        return False
+
+    @staticmethod
+    def _createFilter(parameterId, key):
+        factory = revitron.DB.ParameterFilterRuleFactory
+        try:
+            rule = factory.CreateEqualsRule(parameterId, key, True)
+        except TypeError:
+            # Revit 2023 and newer dropped the case sensitivity argument.
+            rule = factory.CreateEqualsRule(parameterId, key)
+        return revitron.DB.ElementParameterFilter(rule)
+
+
 class AffectedViews:
     """
     Class for handling views affected by mastoron.
@@ -68,6 +329,7 @@ class AffectedViews:
             viewId (object or str): A Revit element id
         """
         del self.affectedViews[colorScheme[NAME]][str(viewId)]
+        ElementIndex.update(colorScheme[NAME], viewId, None, set())
         if len(self.affectedViews[colorScheme[NAME]]) == 0:
             del self.affectedViews[colorScheme[NAME]]
             
@@ -80,11 +342,19 @@ class AffectedViews:
 class AffectedElements:
     """
     Class for handling elements affected by mastoron.
+    The ids of the overridden elements of every scheme and view are held in 
+    a set of id strings, that is only serialized to the compact format 
+    of :func:`mastoron.storage.EncodeIds` when it is dumped.
+
+    The color every element was overridden with is stored as well, see 
+    :meth:`getColors`. 
     """
 
     def __init__(self):
         self.affectedViews = mastoron.ConfigStorage().get(
             MASTORON_VIEWS, defaultdict())
+        self.index = {}
+        self.colors = {}
 
     def get(self, colorScheme, viewId=None):
         """
@@ -92,30 +362,94 @@ class AffectedElements:
 
         Returns::
 
-            If a viewId was provided a list of element ids.
+            If a viewId was provided a set of element id strings.
             if no viewId was provided a dict of view ids with the ids of 
             overridden elements.
 
+        The returned set is the index of the given scheme and view, 
+        changes to the set are saved when calling :meth:`dump`.
+
+        Example::
+
+            affectedElements = mastoron.AffectedElements()
+            overriddenElements = affectedElements.get(scheme, viewId=view.Id)
+            overriddenElements.add(str(element.Id))
+            overriddenElements.discard(str(otherElement.Id))
+            affectedElements.dump(scheme, view.Id)
+
         Args:
             colorScheme (dict): A mastoron colorScheme
             viewId (Id or string, optional): A Revit element Id. Defaults to None.
 
         Returns:
-            mixed: dict or list
+            mixed: dict or set
         """
         if not colorScheme[NAME] in self.affectedViews:
             self.affectedViews[colorScheme[NAME]] = {}
 
         schemeViews = self.affectedViews[colorScheme[NAME]]
         if viewId:
-            if not str(viewId) in schemeViews:
-                schemeViews[str(viewId)] = []
+            key = (colorScheme[NAME], str(viewId))
+            if not key in self.index:
+                if str(viewId) in schemeViews:
+                    self.index[key] = set(DecodeIds(schemeViews[str(viewId)]))
+                else:
+                    self.index[key] = set()
 
-            return schemeViews[str(viewId)]
+            return self.index[key]
         else:
             return schemeViews
 
-    def dump(self, colorScheme, viewId, overriddenElements):
+    def getColors(self, colorScheme, viewId):
+        """
+        Gets the colors that were last applied to the overridden elements of a view.
+        Elements that were overridden without storing their color are missing.
+
+        The returned dict is saved together with the overridden elements when 
+        calling :meth:`dump`, colors of elements that are not overridden anymore 
+        are dropped.
+
+        Args:
+            colorScheme (dict): A mastoron colorScheme
+            viewId (Id or string): A Revit element Id
+
+        Returns:
+            dict: Element id strings with a hex color each
+        """
+        key = (colorScheme[NAME], str(viewId))
+        if not key in self.colors:
+            schemeViews = self.affectedViews.get(colorScheme[NAME], {})
+            colors = {}
+            if str(viewId) in schemeViews:
+                for elementId, color in DecodeIdColors(schemeViews[str(viewId)]).items():
+                    if color:
+                        colors[elementId] = color
+            self.colors[key] = colors
+        return self.colors[key]
+
+    def forgetColors(self, colorScheme, viewId, elementIds):
+        """
+        Drops the stored colors of elements in all other color schemes of a view.
+        Call this after overriding elements that may be overridden by other schemes
+        as well, in order to not skip these elements when updating the other schemes.
+
+        Args:
+            colorScheme (dict): The mastoron color scheme that overrides the elements
+            viewId (Id or string): A Revit element Id
+            elementIds (mixed): A list of Revit element ids
+        """
+        for schemeName in list(self.affectedViews.keys()):
+            if schemeName == colorScheme[NAME] \
+                    or not str(viewId) in self.affectedViews[schemeName]:
+                continue
+            colors = self.getColors({NAME: schemeName}, viewId)
+            forget = [str(x) for x in elementIds if str(x) in colors]
+            if forget:
+                for elementId in forget:
+                    del colors[elementId]
+                self.dump({NAME: schemeName}, viewId)
+
+    def dump(self, colorScheme, viewId, overriddenElements=None):
         """
         Saves the colorscheme override information for affected elements to 
         the Revitron document config.
@@ -123,13 +457,32 @@ class AffectedElements:
         Args:
             colorScheme (dict): A mastoron color scheme
             viewId (element id or string): A Revit element id
-            overriddenElements (string): A list of Revit element ids
+            overriddenElements (string, optional): A list of Revit element ids, defaults to the index returned by :meth:`get`
         """
+        if overriddenElements is None:
+            overriddenElements = self.get(colorScheme, viewId=viewId)
+        else:
+            self.index[(colorScheme[NAME], str(viewId))] = set(
+                str(x) for x in overriddenElements)
+            overriddenElements = self.index[(colorScheme[NAME], str(viewId))]
+
         if not colorScheme[NAME] in self.affectedViews:
             self.affectedViews[colorScheme[NAME]] = {}
         
-        overriddenElements = [str(x) for x in set(overriddenElements)]
-        self.affectedViews[colorScheme[NAME]][str(viewId)] = overriddenElements
+        schemeViews = self.affectedViews[colorScheme[NAME]]
+        colors = self.getColors(colorScheme, viewId)
+        for elementId in list(colors.keys()):
+            if not elementId in overriddenElements:
+                del colors[elementId]
+        encoded = None
+        if overriddenElements:
+            encoded = EncodeIdColors(dict(
+                (elementId, colors.get(elementId)) for elementId in overriddenElements))
+            schemeViews[str(viewId)] = encoded
+        elif str(viewId) in schemeViews:
+            del schemeViews[str(viewId)]
+        ElementIndex.update(colorScheme[NAME], viewId, encoded,
+            self.index[(colorScheme[NAME], str(viewId))])
         mastoron.ConfigStorage().set(MASTORON_VIEWS, self.affectedViews)
 
     @staticmethod
@@ -149,10 +502,120 @@ class AffectedElements:
         
         AffectedElements.set(view, overriddenElements)
         
-    def delete(self, colorScheme, viewId, elementId):
-        self.affectedViews[colorScheme[NAME]][str(viewId)].remove(str(elementId))
-        if len(self.affectedViews[colorScheme[NAME]][str(viewId)]) == 0:
-            del self.affectedViews[colorScheme[NAME]][str(viewId)]
+    def delete(self, colorScheme, viewId, elementIds):
+        """
+        Removes one or more elements from the overridden elements of a view
+        and saves the result.
 
-        mastoron.ConfigStorage().set(MASTORON_VIEWS, self.affectedViews)
-        
+        Args:
+            colorScheme (dict): A mastoron color scheme
+            viewId (element id or string): A Revit element id
+            elementIds (mixed): One or a list of Revit element ids
+        """
+        if not type(elementIds) in [list, set, tuple]:
+            elementIds = [elementIds]
+        overriddenElements = self.get(colorScheme, viewId=viewId)
+        for elementId in elementIds:
+            overriddenElements.discard(str(elementId))
+        self.dump(colorScheme, viewId)
+
+
+class ElementIndex:
+    """
+    Reverse index from element ids to the color schemes and views that
+    override them. The index is shared by the whole process and kept up to 
+    date by :meth:`AffectedElements.dump` and :meth:`AffectedViews.delete`. 
+    Changes that were made to the config by others are picked up on the next query.
+
+    Example::
+
+        overrides = mastoron.ElementIndex.find([element.Id for element in selection])
+        for elementId, entries in overrides.items():
+            for schemeName, viewId in entries:
+                ...
+    """
+
+    @staticmethod
+    def find(elementIds):
+        """
+        Finds all color schemes and views that override the given elements.
+
+        Args:
+            elementIds (mixed): One or a list of Revit element ids
+
+        Returns:
+            dict: The element id strings with a set of (scheme name, view id) tuples each
+        """
+        if not type(elementIds) in [list, set, tuple]:
+            elementIds = [elementIds]
+        config = mastoron.ConfigStorage().config
+        result = {}
+        if isinstance(config, SqliteConfig):
+            for elementId in elementIds:
+                result[str(elementId)] = set(config.find(elementId))
+            return result
+        views = config.get(MASTORON_VIEWS, {})
+        # Only a config that was reloaded or changed by others is compared with the index again.
+        generation = (getattr(config, 'generation', None), getattr(views, 'generation', None))
+        if views is not _elementIndex['views'] or generation != _elementIndex['generation']:
+            ElementIndex._sync(views)
+            _elementIndex['views'] = views
+            _elementIndex['generation'] = generation
+        elements = _elementIndex['elements']
+        for elementId in elementIds:
+            result[str(elementId)] = set(elements.get(str(elementId), []))
+        return result
+
+    @staticmethod
+    def update(schemeName, viewId, encoded, ids):
+        """
+        Updates the index entries of a single scheme and view.
+
+        Args:
+            schemeName (string): The name of the color scheme
+            viewId (element id or string): A Revit element id
+            encoded (mixed): The stored value as returned by :func:`mastoron.storage.EncodeIdColors` or None
+            ids (set): The element id strings
+        """
+        key = (schemeName, str(viewId))
+        elements = _elementIndex['elements']
+        previous = _elementIndex['ids'].get(key, set())
+        if not encoded:
+            ids = set()
+        for elementId in previous - ids:
+            entries = elements[elementId]
+            entries.discard(key)
+            if not entries:
+                del elements[elementId]
+        for elementId in ids - previous:
+            elements.setdefault(elementId, set()).add(key)
+        if encoded:
+            _elementIndex['sources'][key] = encoded
+            _elementIndex['ids'][key] = set(ids)
+        else:
+            _elementIndex['sources'].pop(key, None)
+            _elementIndex['ids'].pop(key, None)
+
+    @staticmethod
+    def _sync(affectedViews):
+        """
+        Updates all index entries whose stored value differs from the value
+        the index was built from.
+
+        Args:
+            affectedViews (dict): The ``mastoron.views`` config item
+        """
+        sources = _elementIndex['sources']
+        current = set()
+        for schemeName in affectedViews.keys():
+            schemeViews = affectedViews[schemeName]
+            for viewId in schemeViews.keys():
+                key = (schemeName, viewId)
+                current.add(key)
+                value = schemeViews[viewId]
+                source = sources.get(key)
+                if source is value or source == value:
+                    continue
+                ElementIndex.update(schemeName, viewId, value, set(DecodeIds(value)))
+        for key in set(sources.keys()) - current:
+            ElementIndex.update(key[0], key[1], None, set())
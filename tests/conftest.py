@@ -0,0 +1,63 @@
+import os
+import sys
+import types
+
+LIB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+
+# Modules that only exist inside Revit and pyRevit.
+STUBBED = [
+    'clr',
+    'revitron',
+    'pyrevit',
+    'pyrevit.forms',
+    'pyrevit.framework',
+    'System',
+    'System.Collections',
+    'System.Collections.Generic',
+    'System.Windows',
+    'System.Windows.Media',
+    'Autodesk',
+    'Autodesk.Revit',
+    'Autodesk.Revit.Creation'
+]
+
+
+class StubType(type):
+    """
+    The type of stand-in classes for the Revit API. Every unknown attribute is
+    another stand-in class that can be called, subclassed and replaced by tests.
+    """
+
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        stub = StubType(name, (Stub,), {})
+        setattr(cls, name, stub)
+        return stub
+
+
+Stub = StubType('Stub', (object,), {
+    '__init__': lambda self, *args, **kwargs: None,
+    '__getattr__': lambda self, name: getattr(type(self), name)
+})
+
+
+class StubModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        stub = StubType(name, (Stub,), {})
+        setattr(self, name, stub)
+        return stub
+
+
+for name in STUBBED:
+    if name not in sys.modules:
+        sys.modules[name] = StubModule(name)
+        if '.' in name:
+            parent, child = name.rsplit('.', 1)
+            setattr(sys.modules[parent], child, sys.modules[name])
+
+sys.path.insert(0, LIB)
+import mastoron
@@ -0,0 +1,201 @@
+import unittest
+import revitron
+from mastoron import boolean
+from mastoron.boolean import BooleanSketchBased, UNION, DIFFERENCE, INTERSECT
+
+
+class Solid(object):
+
+    def __init__(self, cells, poisoned=False):
+        self.cells = frozenset(cells)
+        self.poisoned = poisoned
+        self.Volume = len(self.cells)
+
+
+class BooleanOperationsUtils(object):
+
+    @staticmethod
+    def ExecuteBooleanOperation(a, b, boolType):
+        if a.poisoned or b.poisoned:
+            raise Exception('Failed to perform the Boolean operation.')
+        if boolType == 'Union':
+            return Solid(a.cells | b.cells)
+        if boolType == 'Difference':
+            return Solid(a.cells - b.cells)
+        return Solid(a.cells & b.cells)
+
+
+class BooleanOperationsType(object):
+
+    Union = 'Union'
+    Difference = 'Difference'
+    Intersect = 'Intersect'
+
+
+class Element(object):
+
+    def __init__(self, elementId, *solids):
+        self.Id = elementId
+        self.solids = list(solids)
+        cells = set()
+        for solid in solids:
+            cells.update(solid.cells)
+        self.box = ((min(cells), 0, 0), (max(cells) + 1, 1, 1))
+
+
+class Box(object):
+
+    def __init__(self, box):
+        self.Min, self.Max = box
+
+
+class Geometry(object):
+
+    def __init__(self, element):
+        self.element = element
+
+    def getSolids(self):
+        return self.element.solids
+
+
+class ElementWrapper(object):
+
+    def __init__(self, element):
+        self.element = element
+
+    def getBbox(self):
+        return Box(self.element.box)
+
+    def getGeometry(self):
+        return Geometry(self.element)
+
+
+class Boolean(BooleanSketchBased):
+
+    def getIntersects(self, elements):
+        return [list(elements)]
+
+    def makePlanarUnion(self, elements, levels):
+        return None
+
+    def splitSolid(self, solid, source, elements, levels):
+        return [{'solid': solid, 'source': source, 'elements': elements}]
+
+    def recreate(self):
+        return []
+
+
+class Document(object):
+
+    def __init__(self):
+        self.deleted = []
+
+    def Delete(self, ids):
+        self.deleted.append(sorted(ids))
+
+
+class ListType(object):
+
+    def __getitem__(self, itemType):
+        return list
+
+
+class Pieces(Boolean):
+
+    def splitSolid(self, solid, source, elements, levels):
+        return [{'solid': Solid([cell]), 'source': source, 'elements': elements}
+            for cell in sorted(solid.cells)]
+
+    def createElement(self, newElement):
+        cell = min(newElement['solid'].cells)
+        if cell > 4:
+            return None
+        return Element(100 + cell, newElement['solid'])
+
+    def recreate(self):
+        return BooleanSketchBased.recreate(self)
+
+
+class BooleanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.patched = [
+            (revitron.DB, 'BooleanOperationsUtils', BooleanOperationsUtils),
+            (revitron.DB, 'BooleanOperationsType', BooleanOperationsType),
+            (revitron, '_', ElementWrapper),
+            (boolean, '_', ElementWrapper),
+            (boolean, 'List', ListType()),
+            (revitron, 'DOC', Document())
+        ]
+        self.originals = [(owner, name, getattr(owner, name)) for owner, name, value in self.patched]
+        for owner, name, value in self.patched:
+            setattr(owner, name, value)
+
+    def tearDown(self):
+        for owner, name, value in self.originals:
+            setattr(owner, name, value)
+
+    def ids(self, elements):
+        return sorted(element.Id for element in elements)
+
+    def testUnion(self):
+        elements = [Element(1, Solid([0, 1])), Element(2, Solid([1, 2]), Solid([5]))]
+        result = Boolean(elements)
+        self.assertEqual(result.newElements[0][0]['solid'].cells, frozenset([0, 1, 2, 5]))
+        self.assertEqual(self.ids(result.newElements[0][0]['elements']), [1, 2])
+        self.assertEqual(result.failed, [])
+
+    def testKeepPartlyMergedElements(self):
+        elements = [Element(1, Solid([0, 1])), Element(2, Solid([2]), Solid([3], poisoned=True))]
+        result = Boolean(elements)
+        # No solid of the kept element is part of the new element.
+        self.assertEqual(result.newElements[0][0]['solid'].cells, frozenset([0, 1]))
+        self.assertEqual(self.ids(result.newElements[0][0]['elements']), [1])
+        self.assertEqual(self.ids(result.failed), [2])
+
+    def testFailedCutters(self):
+        elements = [Element(1, Solid([0, 1, 2, 3]))]
+        cutters = [Element(10, Solid([1])), Element(11, Solid([2], poisoned=True))]
+        result = Boolean(elements, operation=DIFFERENCE, cutters=cutters)
+        self.assertEqual(result.newElements[0][0]['solid'].cells, frozenset([0, 2, 3]))
+        self.assertEqual(result.failed, [])
+        self.assertEqual(self.ids(result.failedCutters), [11])
+
+    def testFailedCut(self):
+        elements = [Element(1, Solid([0, 1], poisoned=True))]
+        result = Boolean(elements, operation=DIFFERENCE, cutters=[Element(10, Solid([1]))])
+        self.assertEqual(result.newElements, [])
+        self.assertEqual(self.ids(result.failed), [1])
+        self.assertEqual(result.failedCutters, [])
+
+    def testEmptyIntersection(self):
+        elements = [Element(1, Solid([0])), Element(2, Solid([1]))]
+        cutters = [Element(10, Solid([0]), Solid([2]))]
+        for operation in (INTERSECT, DIFFERENCE):
+            result = Boolean(elements[:1] if operation == DIFFERENCE else elements[1:],
+                operation=operation, cutters=cutters)
+            self.assertEqual(result.newElements, [])
+            self.assertEqual(len(result.failed), 1)
+
+    def testUntouchedWithoutCutters(self):
+        elements = [Element(1, Solid([0]))]
+        result = Boolean(elements, operation=INTERSECT, cutters=[Element(10, Solid([50]))])
+        self.assertEqual(result.newElements, [])
+        self.assertEqual(result.failed, [])
+
+    def testCreatePiecesAsUnit(self):
+        result = Pieces([Element(1, Solid([0, 1])), Element(2, Solid([1, 2]))])
+        self.assertEqual(self.ids(result.created), [100, 101, 102])
+        self.assertEqual(revitron.DOC.deleted, [[1, 2]])
+        self.assertEqual(result.failed, [])
+
+    def testKeepElementsIfPieceFails(self):
+        result = Pieces([Element(1, Solid([0, 1])), Element(2, Solid([1, 5]))])
+        # The piece that was created before the failing one is removed again.
+        self.assertEqual(result.created, [])
+        self.assertEqual(revitron.DOC.deleted, [[100, 101]])
+        self.assertEqual(self.ids(result.failed), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import time
+import hashlib
+import unittest
+from mastoron import colors
+from mastoron.colors import Color, Palette
+
+
+def LabDistance(first, second):
+    return sum((x - y) ** 2 for x, y in zip(first, second)) ** 0.5
+
+
+def Distance(first, second):
+    return LabDistance(
+        Color.RGBtoLAB(Color.HEXtoRGB(first)), Color.RGBtoLAB(Color.HEXtoRGB(second)))
+
+
+class PaletteTest(unittest.TestCase):
+
+    def setUp(self):
+        colors._palettes['palettes'] = {}
+
+    def testFarthestPoint(self):
+        palette = Palette.get(15)
+        self.assertEqual(len(set(palette)), 15)
+        rgbs, labs = Palette._getCandidates()
+        picked = [Color.RGBtoLAB(Color.HEXtoRGB(color)) for color in ['#000000', '#FFFFFF']]
+        for color in palette:
+            lab = Color.RGBtoLAB(Color.HEXtoRGB(color))
+            distance = min(LabDistance(lab, other) for other in picked)
+            # No other candidate is farther away from all colors picked before.
+            for candidate in labs:
+                self.assertLessEqual(
+                    min(LabDistance(candidate, other) for other in picked), distance + 1e-6)
+            picked.append(lab)
+
+    def testSkipDarkAndLightColors(self):
+        for color in Palette.get(100):
+            lightness = Color.RGBtoLAB(Color.HEXtoRGB(color))[0]
+            self.assertTrue(Palette.MIN_LIGHTNESS <= lightness <= Palette.MAX_LIGHTNESS)
+
+    def testExcludeColors(self):
+        exclude = ['#0000FF', '#00FF00', 'ff0000']
+        palette = Palette.get(20, exclude)
+        for color in exclude:
+            self.assertNotIn('#' + color.lstrip('#').upper(), palette)
+        self.assertNotEqual(palette, Palette.get(20))
+
+    def testExtendCachedPalette(self):
+        first = Palette.get(10)
+        self.assertEqual(Palette.get(30)[:10], first)
+        self.assertEqual(Palette.get(5), first[:5])
+        self.assertEqual(len(colors._palettes['palettes']), 1)
+
+    def testNotEnoughColors(self):
+        rgbs, labs = Palette._getCandidates()
+        self.assertIsNone(Palette.get(len(rgbs) + 1))
+
+    def testManyColorsQuickly(self):
+        start = time.time()
+        palette = Palette.get(500)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(len(set(palette)), 500)
+        self.assertGreater(min(Distance(palette[-1], color) for color in palette[:-1]), 5)
+
+
+class StablePaletteTest(unittest.TestCase):
+
+    def setUp(self):
+        colors._palettes['palettes'] = {}
+        self.table = Palette.get(Palette.TABLE_SIZE)
+
+    def slot(self, key):
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+        return int(digest[:8], 16) % Palette.TABLE_SIZE
+
+    def testHashTable(self):
+        keys = ['Office', 'Kitchen', 'Storage']
+        self.assertEqual(Palette.getStable(keys), [self.table[self.slot(key)] for key in keys])
+        self.assertEqual(Palette.getStable(['Storage']), Palette.getStable(keys)[2:])
+
+    def testCollision(self):
+        slots = {}
+        for index in range(1000):
+            key = 'Room {}'.format(index)
+            if self.slot(key) in slots:
+                break
+            slots[self.slot(key)] = key
+        first = slots[self.slot(key)]
+        slot = self.slot(key)
+        self.assertEqual(Palette.getStable([first, key]), 
+            [self.table[slot], self.table[(slot + 1) % Palette.TABLE_SIZE]])
+        self.assertEqual(Palette.getStable([key, first]), 
+            [self.table[slot], self.table[(slot + 1) % Palette.TABLE_SIZE]])
+
+    def testUsedColors(self):
+        color = self.table[self.slot('Office')]
+        self.assertEqual(Palette.getStable(['Office'], [color.lower()]), 
+            [self.table[(self.slot('Office') + 1) % Palette.TABLE_SIZE]])
+
+    def testFullTable(self):
+        keys = ['Room {}'.format(index) for index in range(Palette.TABLE_SIZE + 20)]
+        stable = Palette.getStable(keys)
+        self.assertEqual(len(set(stable)), len(keys))
+        self.assertEqual(set(stable[:Palette.TABLE_SIZE]), set(self.table))
+        self.assertEqual(stable[Palette.TABLE_SIZE:], 
+            Palette.get(len(keys))[Palette.TABLE_SIZE:])
+
+    def testManyKeysQuickly(self):
+        colors._palettes['palettes'] = {}
+        start = time.time()
+        stable = Palette.getStable(['Room {}'.format(index) for index in range(500)])
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(len(set(stable)), 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
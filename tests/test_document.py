@@ -0,0 +1,137 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import revitron
+from mastoron.document import ConfigStorage
+from mastoron.storage import JsonFile, SqliteConfig
+from mastoron.variables import MASTORON_VERSION, MASTORON_VIEWS
+
+
+class DocumentConfigStorage(object):
+
+    path = None
+
+    def get(self, key, default=None):
+        return DocumentConfigStorage.path
+
+
+class ConfigStorageTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'config.json')
+        self.save({'a': 1})
+        self.documentConfigStorage = revitron.DocumentConfigStorage
+        revitron.DocumentConfigStorage = DocumentConfigStorage
+        DocumentConfigStorage.path = self.path
+        ConfigStorage.clearCache()
+
+    def tearDown(self):
+        revitron.DocumentConfigStorage = self.documentConfigStorage
+        ConfigStorage.clearCache()
+        shutil.rmtree(self.directory)
+
+    def save(self, data):
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+
+    def read(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        data.pop(MASTORON_VERSION, None)
+        return data
+
+
+class CacheTest(ConfigStorageTestCase):
+
+    def testSharedBetweenInstances(self):
+        ConfigStorage().set('b', 2)
+        self.assertEqual(ConfigStorage().get('b'), 2)
+        self.assertEqual(self.read(), {'a': 1, 'b': 2})
+
+    def testReloadAfterChangeOnDisk(self):
+        self.assertEqual(ConfigStorage().get('a'), 1)
+        self.save({'a': 1000})
+        self.assertEqual(ConfigStorage().get('a'), 1000)
+
+    def testKeepChangesOfOthers(self):
+        self.save({'a': 1, MASTORON_VIEWS: {'Area': {'100': 'A'}}})
+        views = ConfigStorage().get(MASTORON_VIEWS)
+        other = JsonFile(self.path)
+        other[MASTORON_VIEWS]['Area']['200'] = 'T'
+        other.write()
+        views['Level'] = {'100': 'X'}
+        ConfigStorage().set(MASTORON_VIEWS, views)
+        self.assertEqual(self.read()[MASTORON_VIEWS], {'Area': {'100': 'A', '200': 'T'}, 'Level': {'100': 'X'}})
+
+    def testRemoveEmptyItems(self):
+        ConfigStorage().set('a', {})
+        self.assertEqual(self.read(), {})
+
+
+class SessionTest(ConfigStorageTestCase):
+
+    def testWriteOnceAtTheEnd(self):
+        with ConfigStorage().session():
+            ConfigStorage().set('b', 2)
+            with ConfigStorage().session():
+                ConfigStorage().set('c', 3)
+            self.assertEqual(self.read(), {'a': 1})
+            self.assertEqual(ConfigStorage().get('c'), 3)
+        self.assertEqual(self.read(), {'a': 1, 'b': 2, 'c': 3})
+
+    def testRollbackOnError(self):
+        with self.assertRaises(ValueError):
+            with ConfigStorage().session():
+                ConfigStorage().set('b', 2)
+                raise ValueError()
+        self.assertEqual(self.read(), {'a': 1})
+        self.assertEqual(ConfigStorage().get('b'), None)
+
+    def testRollbackOnErrorInNestedSession(self):
+        with self.assertRaises(ValueError):
+            with ConfigStorage().session():
+                ConfigStorage().set('b', 2)
+                with ConfigStorage().session():
+                    raise ValueError()
+        self.assertEqual(self.read(), {'a': 1})
+
+    def testKeepChangesOnHandledError(self):
+        with ConfigStorage().session():
+            ConfigStorage().set('b', 2)
+            try:
+                with ConfigStorage().session():
+                    ConfigStorage().set('c', 3)
+                    raise ValueError()
+            except ValueError:
+                pass
+        self.assertEqual(self.read(), {'a': 1, 'b': 2, 'c': 3})
+
+    def testWriteOnSystemExit(self):
+        with self.assertRaises(SystemExit):
+            with ConfigStorage().session():
+                ConfigStorage().set('b', 2)
+                raise SystemExit(0)
+        self.assertEqual(self.read(), {'a': 1, 'b': 2})
+
+    def testCloseDatabaseOnRollback(self):
+        DocumentConfigStorage.path = os.path.join(self.directory, 'config.sqlite')
+        SqliteConfig(DocumentConfigStorage.path).close()
+        config = ConfigStorage().config
+        with self.assertRaises(ValueError):
+            with ConfigStorage().session():
+                ConfigStorage().set('b', 2)
+                raise ValueError()
+        self.assertRaises(Exception, config.connection.execute, 'SELECT 1')
+        self.assertEqual(ConfigStorage().get('b'), None)
+
+    def testNoWriteWithoutChanges(self):
+        with ConfigStorage().session():
+            self.save({'a': 5})
+        self.assertEqual(self.read(), {'a': 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from mastoron.gradient import Gradient, ColorGradient, GetBreaks
+from mastoron.gradient import EQUAL_INTERVAL, QUANTILE, JENKS, LAB, LINEAR_RGB
+
+
+class BreaksTest(unittest.TestCase):
+
+    def testEqualInterval(self):
+        self.assertEqual(GetBreaks([0, 10, 2, 4], 5, EQUAL_INTERVAL), [0, 2, 4, 6, 8, 10])
+
+    def testQuantile(self):
+        self.assertEqual(GetBreaks(list(range(101)), 4, QUANTILE), [0, 25, 50, 75, 100])
+
+    def testJenks(self):
+        values = [1, 2, 3, 50, 51, 52, 100, 101, 102]
+        self.assertEqual(GetBreaks(values, 3, JENKS), [1, 50, 100, 102])
+
+    def testJenksSampled(self):
+        values = [i % 1000 for i in range(20000)]
+        edges = GetBreaks(values, 5, JENKS)
+        self.assertEqual(len(edges), 6)
+        self.assertEqual((edges[0], edges[-1]), (0, 999))
+        self.assertEqual(edges, sorted(edges))
+
+    def testSingleValue(self):
+        for method in (EQUAL_INTERVAL, QUANTILE, JENKS):
+            self.assertEqual(GetBreaks([3, 3, 3], 4, method), [3, 3])
+
+
+class LabelsTest(unittest.TestCase):
+
+    def testDefaultDecimals(self):
+        self.assertEqual(Gradient.getLabels([0, 12.5, 50]), ['0.00 - 12.50', '12.50 - 50.00'])
+
+    def testNarrowBins(self):
+        edges = GetBreaks([0.001, 0.002, 0.003, 0.004], 4)
+        labels = Gradient.getLabels(edges)
+        self.assertEqual(len(labels), 4)
+        self.assertEqual(len(set(labels)), 4)
+
+    def testUniqueLabels(self):
+        for edges in ([1, 1.0001, 1.0002, 5], [1e-9, 2e-9, 3e-9], [1000000, 1000000.5, 1000001]):
+            labels = Gradient.getLabels(edges)
+            self.assertEqual(len(set(labels)), len(edges) - 1, labels)
+
+    def testBins(self):
+        gradient = Gradient.__new__(Gradient)
+        gradient.edges = [0, 10, 20, 30]
+        gradient.colors = ['a', 'b', 'c']
+        self.assertEqual([gradient.getBin(x) for x in (-5, 0, 9.9, 10, 25, 30, 40)],
+            [0, 0, 0, 1, 2, 2, 2])
+        self.assertEqual(gradient.map([5, 30]), ['a', 'c'])
+
+
+class ColorGradientTest(unittest.TestCase):
+
+    def testEndpoints(self):
+        for space in (LAB, LINEAR_RGB):
+            gradient = ColorGradient(['0000ff', '#ffffff', 'ff0000'], space)
+            self.assertEqual(gradient.getColor(0), '0000ff')
+            self.assertEqual(gradient.getColor(0.5), 'ffffff')
+            self.assertEqual(gradient.getColor(1), 'ff0000')
+            colors = gradient.getColors(5)
+            self.assertEqual((colors[0], colors[2], colors[-1]), ('0000ff', 'ffffff', 'ff0000'))
+
+    def testOutOfRange(self):
+        gradient = ColorGradient([(0.2, '#000000'), (0.8, '#ffffff')], LINEAR_RGB)
+        self.assertEqual(gradient.map([-1, 0, 0.2, 0.8, 1, 2]), 
+            ['000000', '000000', '000000', 'ffffff', 'ffffff', 'ffffff'])
+
+    def testInterpolate(self):
+        gradient = ColorGradient([(1, '#ffffff'), (0, '#000000')], LINEAR_RGB)
+        # Half of the linear light is 188 in sRGB, not 128.
+        self.assertEqual(gradient.getColor(0.5), 'bcbcbc')
+        lab = ColorGradient(['#000000', '#ffffff']).getColor(0.5)
+        self.assertEqual(len(set([lab[0:2], lab[2:4], lab[4:6]])), 1)
+
+    def testSingleStop(self):
+        self.assertEqual(ColorGradient(['#123456']).getColors(3), ['123456'] * 3)
+
+    def testInvalid(self):
+        self.assertRaises(ValueError, ColorGradient, [])
+        self.assertRaises(ValueError, ColorGradient, ['#000000'], 'HSV')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import random
+import unittest
+from mastoron.polygon import SignedArea, PointInPolygon, PolygonUnion, PolygonDifference, PolygonIntersection
+
+
+def Square(x, y, size):
+    return [[(x, y), (x + size, y), (x + size, y + size), (x, y + size)]]
+
+
+def Area(polygons):
+    return sum(SignedArea(ring) for polygon in polygons for ring in polygon)
+
+
+def CellArea(rectangles):
+    cells = set()
+    for x, y, w, d in rectangles:
+        for i in range(x, x + w):
+            for j in range(y, y + d):
+                cells.add((i, j))
+    return len(cells)
+
+
+class PolygonTest(unittest.TestCase):
+
+    def testSignedArea(self):
+        ring = Square(0, 0, 2)[0]
+        self.assertEqual(SignedArea(ring), 4)
+        self.assertEqual(SignedArea(list(reversed(ring))), -4)
+
+    def testPointInPolygon(self):
+        polygon = Square(0, 0, 4) + [list(reversed(Square(1, 1, 2)[0]))]
+        self.assertTrue(PointInPolygon((0.5, 0.5), polygon))
+        self.assertFalse(PointInPolygon((2, 2), polygon))
+        self.assertFalse(PointInPolygon((5, 2), polygon))
+
+    def testUnion(self):
+        result = PolygonUnion([Square(0, 0, 2), Square(1, 1, 2)])
+        self.assertEqual(len(result), 1)
+        self.assertAlmostEqual(Area(result), 7)
+
+    def testUnionWithHole(self):
+        frame = [Square(0, 0, 1), Square(1, 0, 1), Square(2, 0, 1), Square(0, 1, 1),
+            Square(2, 1, 1), Square(0, 2, 1), Square(1, 2, 1), Square(2, 2, 1)]
+        result = PolygonUnion(frame)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(result[0]), 2)
+        self.assertTrue(SignedArea(result[0][0]) > 0)
+        self.assertTrue(SignedArea(result[0][1]) < 0)
+        self.assertAlmostEqual(Area(result), 8)
+
+    def testTouchingCorners(self):
+        result = PolygonUnion([Square(0, 0, 1), Square(1, 1, 1)])
+        self.assertEqual(len(result), 2)
+        self.assertAlmostEqual(Area(result), 2)
+
+    def testDisjoint(self):
+        result = PolygonUnion([Square(0, 0, 1), Square(5, 5, 1)])
+        self.assertEqual(len(result), 2)
+
+    def testDifference(self):
+        result = PolygonDifference([Square(0, 0, 4)], [Square(1, 1, 2)])
+        self.assertEqual(len(result), 1)
+        self.assertAlmostEqual(Area(result), 12)
+        result = PolygonDifference([Square(0, 0, 4)], [Square(1, -1, 2)])
+        self.assertAlmostEqual(Area(result), 14)
+
+    def testDifferenceSplits(self):
+        bar = [[(0, 0), (6, 0), (6, 1), (0, 1)]]
+        result = PolygonDifference([bar], [[[(2, -1), (4, -1), (4, 2), (2, 2)]]])
+        self.assertEqual(len(result), 2)
+        self.assertAlmostEqual(Area(result), 4)
+
+    def testIntersection(self):
+        result = PolygonIntersection([Square(0, 0, 2)], [Square(1, 1, 2)])
+        self.assertEqual(len(result), 1)
+        self.assertAlmostEqual(Area(result), 1)
+        self.assertEqual(PolygonIntersection([Square(0, 0, 1)], [Square(5, 5, 1)]), [])
+
+    def testSlantedEdges(self):
+        triangle = [[(0, 0), (4, 0), (0, 4)]]
+        result = PolygonUnion([triangle, Square(0, 0, 2)])
+        self.assertAlmostEqual(Area(result), 8)
+        result = PolygonIntersection([triangle], [Square(1, 1, 4)])
+        self.assertAlmostEqual(Area(result), 2)
+
+    def testRandomRectangles(self):
+        random.seed(7)
+        for run in range(5):
+            rectangles = [(random.randint(0, 30), random.randint(0, 30),
+                random.randint(1, 8), random.randint(1, 8)) for i in range(40)]
+            polygons = [[[(x, y), (x + w, y), (x + w, y + d), (x, y + d)]]
+                for x, y, w, d in rectangles]
+            self.assertAlmostEqual(Area(PolygonUnion(polygons)), CellArea(rectangles), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
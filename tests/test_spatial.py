@@ -0,0 +1,82 @@
+import random
+import unittest
+from mastoron.spatial import BoxesOverlap, BoxIndex, DisjointSet
+
+
+def RandomBoxes(count, seed=3):
+    random.seed(seed)
+    boxes = {}
+    for i in range(count):
+        x, y, z = random.uniform(0, 100), random.uniform(0, 100), random.choice([0, 10])
+        boxes[i] = ((x, y, z), (x + random.uniform(1, 8), y + random.uniform(1, 8), z + 0.5))
+    # A box that covers too many cells is compared with all other boxes.
+    boxes['large'] = ((0, 0, 0), (100, 100, 0.5))
+    return boxes
+
+
+def AllPairs(boxes, tolerance=0):
+    keys = list(boxes.keys())
+    pairs = set()
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            if BoxesOverlap(boxes[keys[i]], boxes[keys[j]], tolerance):
+                pairs.add(frozenset((keys[i], keys[j])))
+    return pairs
+
+
+class BoxesOverlapTest(unittest.TestCase):
+
+    def testOverlap(self):
+        a = ((0, 0, 0), (1, 1, 1))
+        self.assertTrue(BoxesOverlap(a, ((0.5, 0.5, 0.5), (2, 2, 2))))
+        self.assertTrue(BoxesOverlap(a, ((1, 0, 0), (2, 1, 1))))
+        self.assertFalse(BoxesOverlap(a, ((1.01, 0, 0), (2, 1, 1))))
+        self.assertTrue(BoxesOverlap(a, ((1.01, 0, 0), (2, 1, 1)), 0.1))
+
+
+class BoxIndexTest(unittest.TestCase):
+
+    def testPairs(self):
+        boxes = RandomBoxes(400)
+        for tolerance in (0, 0.5):
+            pairs = BoxIndex.fromBoxes(boxes).getPairs(tolerance)
+            self.assertEqual(len(pairs), len(set(frozenset(pair) for pair in pairs)))
+            self.assertEqual(set(frozenset(pair) for pair in pairs), AllPairs(boxes, tolerance))
+
+    def testQuery(self):
+        boxes = RandomBoxes(400)
+        index = BoxIndex.fromBoxes(boxes)
+        box = ((20, 20, 0), (30, 30, 1))
+        expected = set(key for key in boxes if BoxesOverlap(box, boxes[key]))
+        self.assertEqual(index.query(box[0], box[1]), expected)
+
+    def testQueryPoint(self):
+        boxes = RandomBoxes(400)
+        index = BoxIndex.fromBoxes(boxes)
+        point = (42, 17, 0.2)
+        expected = set(key for key in boxes if BoxesOverlap((point, point), boxes[key]))
+        self.assertEqual(set(index.queryPoint(point)), expected)
+
+
+class DisjointSetTest(unittest.TestCase):
+
+    def testGroups(self):
+        groups = DisjointSet('abcde', [('a', 'c'), ('d', 'e')]).getGroups()
+        self.assertEqual(groups, [['a', 'c'], ['b'], ['d', 'e']])
+
+    def testChain(self):
+        pairs = [(i, i + 1) for i in range(999)]
+        random.seed(1)
+        random.shuffle(pairs)
+        groups = DisjointSet(range(1000), pairs).getGroups()
+        self.assertEqual(groups, [list(range(1000))])
+
+    def testUnknownItems(self):
+        items = DisjointSet()
+        items.union('x', 'y')
+        self.assertEqual(items.find('x'), items.find('y'))
+        self.assertEqual(items.getGroups(), [['x', 'y']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,573 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from mastoron import storage
+from mastoron.storage import EncodeIds, DecodeIds, EncodeIdColors, DecodeIdColors
+from mastoron.storage import DiffConfig, PatchConfig, FileLock
+from mastoron.storage import JsonFile, JournalFile, ShardedConfig, SqliteConfig
+from mastoron.variables import MASTORON_COLORSCHEMES, MASTORON_VIEWS, MASTORON_VERSION
+
+
+class EncodeIdsTest(unittest.TestCase):
+
+    def testRoundTrip(self):
+        ids = [5, 300000, 300001, 300500, 2000000, 123456789]
+        for compress in (False, True):
+            encoded = EncodeIds(ids, compress)
+            self.assertEqual(DecodeIds(encoded), [str(x) for x in ids])
+
+    def testUnsortedDuplicatesAndStrings(self):
+        self.assertEqual(DecodeIds(EncodeIds(['7', 3, '3', 12])), ['3', '7', '12'])
+
+    def testNegativeIds(self):
+        self.assertEqual(DecodeIds(EncodeIds([-5, 3, -1])), ['-5', '-1', '3'])
+
+    def testEmpty(self):
+        self.assertEqual(DecodeIds(EncodeIds([])), [])
+
+    def testCompressThreshold(self):
+        self.assertTrue(EncodeIds(range(10)).startswith('d:'))
+        self.assertTrue(EncodeIds(range(1000)).startswith('z:'))
+
+    def testPlainLists(self):
+        self.assertEqual(DecodeIds([1, '2']), ['1', '2'])
+
+
+class EncodeIdColorsTest(unittest.TestCase):
+
+    def testRoundTrip(self):
+        colors = {'1': '#F44336', '2': '#F44336', '30': '#2196F3', '400': None}
+        self.assertEqual(DecodeIdColors(EncodeIdColors(colors)), colors)
+
+    def testWithoutColors(self):
+        encoded = EncodeIdColors({'1': None, '2': None})
+        self.assertTrue(encoded.startswith('d:'))
+        self.assertEqual(DecodeIdColors(encoded), {'1': None, '2': None})
+
+    def testDecodeIdsOfGroups(self):
+        encoded = EncodeIdColors({'10': '#000000', '2': '#FFFFFF'})
+        self.assertEqual(DecodeIds(encoded), ['2', '10'])
+
+
+class DiffConfigTest(unittest.TestCase):
+
+    BASE = {'a': 1, 'b': [1, 2], 'c': {'x': 1, 'y': {'z': 1}}, 'd': 'delete'}
+
+    def copy(self, data):
+        return json.loads(json.dumps(data))
+
+    def testRoundTrip(self):
+        data = {'a': 2, 'b': [1, 2, 3], 'c': {'x': 1, 'y': {'z': 2, 'w': 3}}, 'e': None}
+        patch = DiffConfig(self.BASE, data)
+        self.assertEqual(PatchConfig(self.copy(self.BASE), patch), data)
+        self.assertEqual(patch['delete'], ['d'])
+        self.assertEqual(patch['patch']['c'], {'patch': {'y': {'set': {'z': 2, 'w': 3}}}})
+
+    def testUnchanged(self):
+        self.assertEqual(DiffConfig(self.BASE, self.copy(self.BASE)), None)
+
+    def testMergeDifferentItems(self):
+        ours = self.copy(self.BASE)
+        ours['c']['x'] = 2
+        theirs = self.copy(self.BASE)
+        theirs['c']['y']['w'] = 1
+        del theirs['d']
+        data = PatchConfig(theirs, DiffConfig(self.BASE, ours))
+        self.assertEqual(data, {'a': 1, 'b': [1, 2], 'c': {'x': 2, 'y': {'z': 1, 'w': 1}}})
+
+    def testConflictLastPatchWins(self):
+        ours = self.copy(self.BASE)
+        ours['b'].append(3)
+        ours['c']['x'] = 2
+        theirs = self.copy(self.BASE)
+        theirs['b'] = []
+        theirs['c'] = 'replaced'
+        data = PatchConfig(theirs, DiffConfig(self.BASE, ours))
+        self.assertEqual(data['b'], [1, 2, 3])
+        self.assertEqual(data['c'], {'x': 2})
+
+
+class FileLockTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'config.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testExclusive(self):
+        with FileLock(self.path):
+            self.assertTrue(os.path.exists(self.path + '.lock'))
+            self.assertRaises(IOError, FileLock(self.path, timeout=0.2).__enter__)
+        self.assertFalse(os.path.exists(self.path + '.lock'))
+        with FileLock(self.path, timeout=0.2):
+            pass
+
+    def testReleaseOnError(self):
+        with self.assertRaises(ValueError):
+            with FileLock(self.path):
+                raise ValueError()
+        self.assertFalse(os.path.exists(self.path + '.lock'))
+
+    def testRemoveStaleLock(self):
+        open(self.path + '.lock', 'w').close()
+        past = time.time() - FileLock.STALE - 10
+        os.utime(self.path + '.lock', (past, past))
+        with FileLock(self.path, timeout=0.2):
+            pass
+
+
+class JsonFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'config.json')
+        config = JsonFile(self.path)
+        config['a'] = 1
+        config[MASTORON_VIEWS] = {'Area': {'100': 'A'}}
+        config.write()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def testSkipUnchanged(self):
+        config = JsonFile(self.path)
+        config['a'] = 1
+        config.write()
+        self.assertEqual(self.read()[MASTORON_VERSION], 1)
+        config['a'] = 2
+        config.write()
+        self.assertEqual(self.read()[MASTORON_VERSION], 2)
+
+    def testMergeTwoWriters(self):
+        first = JsonFile(self.path)
+        second = JsonFile(self.path)
+        first['a']
+        second['a']
+        first['b'] = 2
+        first[MASTORON_VIEWS]['Area']['200'] = 'B'
+        first.write()
+        second['c'] = 3
+        second[MASTORON_VIEWS]['Level'] = {'100': 'C'}
+        second.write()
+        self.assertEqual(self.read(), {
+            'a': 1, 'b': 2, 'c': 3,
+            MASTORON_VIEWS: {'Area': {'100': 'A', '200': 'B'}, 'Level': {'100': 'C'}},
+            MASTORON_VERSION: 3
+        })
+
+    def testSameItemLastWriterWins(self):
+        first = JsonFile(self.path)
+        second = JsonFile(self.path)
+        first['a']
+        second['a']
+        first['a'] = 2
+        first.write()
+        second['a'] = 3
+        second.write()
+        self.assertEqual(self.read()['a'], 3)
+        first.refresh()
+        self.assertEqual(first['a'], 3)
+
+    def testRefreshKeepsReturnedDicts(self):
+        first = JsonFile(self.path)
+        views = first[MASTORON_VIEWS]
+        second = JsonFile(self.path)
+        second[MASTORON_VIEWS]['Area']['200'] = 'T'
+        second.write()
+        first.refresh()
+        self.assertEqual(first.generation, 1)
+        self.assertEqual(views['Area'], {'100': 'A', '200': 'T'})
+        views['Level'] = {'100': 'X'}
+        first[MASTORON_VIEWS] = views
+        first.write()
+        self.assertEqual(self.read()[MASTORON_VIEWS], {'Area': {'100': 'A', '200': 'T'}, 'Level': {'100': 'X'}})
+
+    def testMergeReturnedDictsOnWrite(self):
+        first = JsonFile(self.path)
+        views = first[MASTORON_VIEWS]
+        second = JsonFile(self.path)
+        second[MASTORON_VIEWS]['Area']['200'] = 'T'
+        second.write()
+        views['Level'] = {'100': 'X'}
+        first[MASTORON_VIEWS] = views
+        first.write()
+        self.assertEqual(self.read()[MASTORON_VIEWS], {'Area': {'100': 'A', '200': 'T'}, 'Level': {'100': 'X'}})
+
+    def testRefreshWithoutChanges(self):
+        config = JsonFile(self.path)
+        config['a']
+        config.refresh()
+        self.assertEqual(config.generation, 0)
+
+
+class JournalFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'config.json')
+        self.journal = self.path + JournalFile.EXTENSION
+        self.threshold = storage.JOURNAL_COMPACT_THRESHOLD
+        open(self.journal, 'a').close()
+        config = JournalFile(self.path)
+        config['a'] = 1
+        config[MASTORON_VIEWS] = {'Area': {'100': 'A'}}
+        config.write()
+
+    def tearDown(self):
+        storage.JOURNAL_COMPACT_THRESHOLD = self.threshold
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def records(self):
+        with open(self.journal) as f:
+            return [json.loads(line) for line in f.read().splitlines()]
+
+    def testAppendChangedItems(self):
+        snapshot = self.read()
+        config = JournalFile(self.path)
+        config['b'] = 2
+        config.write()
+        config[MASTORON_VIEWS] = {'Area': {'100': 'A', '200': 'B'}}
+        config.write()
+        self.assertEqual(self.read(), snapshot)
+        self.assertEqual(self.records(), [
+            DiffConfig({MASTORON_VERSION: 1}, {'b': 2, MASTORON_VERSION: 2}),
+            DiffConfig(
+                {MASTORON_VIEWS: {'Area': {'100': 'A'}}, MASTORON_VERSION: 2},
+                {MASTORON_VIEWS: {'Area': {'100': 'A', '200': 'B'}}, MASTORON_VERSION: 3}
+            )
+        ])
+
+    def testSkipUnchanged(self):
+        config = JournalFile(self.path)
+        config['a'] = 1
+        config.write()
+        self.assertEqual(self.records(), [])
+
+    def testReplayAfterRestart(self):
+        config = JournalFile(self.path)
+        config['b'] = 2
+        config.write()
+        del config['a']
+        config.write()
+        config = JournalFile(self.path)
+        self.assertEqual(dict(config.items()), {
+            'b': 2,
+            MASTORON_VIEWS: {'Area': {'100': 'A'}},
+            MASTORON_VERSION: 3
+        })
+
+    def testReplayRecordsOfOthers(self):
+        first = JournalFile(self.path)
+        views = first[MASTORON_VIEWS]
+        second = JournalFile(self.path)
+        second[MASTORON_VIEWS] = {'Area': {'100': 'A', '200': 'T'}}
+        second.write()
+        first.refresh()
+        self.assertEqual(first.generation, 1)
+        self.assertEqual(views, {'Area': {'100': 'A', '200': 'T'}})
+        first['b'] = 2
+        first.write()
+        self.assertEqual(dict(JournalFile(self.path).items()), {
+            'a': 1, 'b': 2,
+            MASTORON_VIEWS: {'Area': {'100': 'A', '200': 'T'}},
+            MASTORON_VERSION: 3
+        })
+
+    def testRefreshWithoutChanges(self):
+        config = JournalFile(self.path)
+        config['a']
+        config.refresh()
+        self.assertEqual(config.generation, 0)
+
+    def testCompact(self):
+        config = JournalFile(self.path)
+        config['b'] = 2
+        config.write()
+        with FileLock(self.path):
+            config.compact()
+        self.assertEqual(self.records(), [])
+        self.assertEqual(self.read(), {
+            'a': 1, 'b': 2,
+            MASTORON_VIEWS: {'Area': {'100': 'A'}},
+            MASTORON_VERSION: 2
+        })
+        self.assertEqual(JournalFile(self.path)['b'], 2)
+
+    def testCompactAfterThreshold(self):
+        storage.JOURNAL_COMPACT_THRESHOLD = 100
+        config = JournalFile(self.path)
+        config['b'] = 2
+        config.write()
+        self.assertEqual(len(self.records()), 1)
+        config['c'] = 'x' * 100
+        config.write()
+        self.assertEqual(self.records(), [])
+        self.assertEqual(self.read()['c'], 'x' * 100)
+
+    def testReloadAfterTruncatedJournal(self):
+        first = JournalFile(self.path)
+        views = first[MASTORON_VIEWS]
+        second = JournalFile(self.path)
+        second['b'] = 2
+        second.write()
+        first.refresh()
+        second[MASTORON_VIEWS] = {'Area': {'100': 'A', '200': 'T'}}
+        second.write()
+        with FileLock(self.path):
+            second.compact()
+        self.assertEqual(os.path.getsize(self.journal), 0)
+        first.refresh()
+        self.assertEqual(first.generation, 2)
+        self.assertEqual(first['b'], 2)
+        self.assertEqual(views, {'Area': {'100': 'A', '200': 'T'}})
+        first['c'] = 3
+        first.write()
+        self.assertEqual(dict(JournalFile(self.path).items()), {
+            'a': 1, 'b': 2, 'c': 3,
+            MASTORON_VIEWS: {'Area': {'100': 'A', '200': 'T'}},
+            MASTORON_VERSION: 4
+        })
+
+
+class ShardedConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        config = ShardedConfig(self.directory)
+        config['mastoron.colorscheme'] = {'Function': 'Area'}
+        config[MASTORON_COLORSCHEMES] = [
+            {'name': 'Area', 'data': {'Office': '#F44336'}},
+            {'name': 'Level', 'data': {'L1': '#2196F3'}}
+        ]
+        config[MASTORON_VIEWS] = {
+            'Area': {'100': ['1', '2'], '200': ['3']},
+            'Level': {'100': ['4']}
+        }
+        config.write()
+        self.reads = []
+        self.writes = []
+        storage.open = self.open
+
+    def tearDown(self):
+        del storage.open
+        shutil.rmtree(self.directory)
+
+    def open(self, path, mode='r'):
+        name = os.path.relpath(path, self.directory).replace(os.sep, '/')
+        # Files are written to a temporary file first.
+        if name.endswith('.tmp'):
+            name = name[:name.rindex('.json') + 5]
+        if 'w' in mode:
+            self.writes.append(name)
+        else:
+            self.reads.append(name)
+        return open(path, mode)
+
+    def testLoadLazily(self):
+        config = ShardedConfig(self.directory)
+        self.assertEqual(config[MASTORON_VIEWS]['Area']['200'], ['3'])
+        self.assertEqual(self.reads, ['views/Area/200.json'])
+        self.assertEqual(sorted(config[MASTORON_VIEWS]['Area']), ['100', '200'])
+        self.assertEqual(self.reads, ['views/Area/200.json'])
+        config[MASTORON_COLORSCHEMES]
+        self.assertEqual(sorted(self.reads[1:]), ['colorschemes/Area.json', 'colorschemes/Level.json'])
+
+    def testWriteChangedShardsOnly(self):
+        config = ShardedConfig(self.directory)
+        config[MASTORON_VIEWS]['Area']['200'] = ['3', '5']
+        config[MASTORON_VIEWS]['Level']['100']
+        config.write()
+        self.assertEqual(self.writes, ['views/Area/200.json'])
+        self.assertEqual(self.reads, ['views/Level/100.json', 'config.json'])
+
+    def testWriteUnchangedShards(self):
+        config = ShardedConfig(self.directory)
+        config[MASTORON_VIEWS]['Area']['100']
+        config[MASTORON_VIEWS]['Area']['100'] = ['1', '2']
+        config[MASTORON_COLORSCHEMES] = config[MASTORON_COLORSCHEMES]
+        config.write()
+        self.assertEqual(self.writes, [])
+
+    def testDeleteShards(self):
+        config = ShardedConfig(self.directory)
+        del config[MASTORON_VIEWS]['Area']['200']
+        config[MASTORON_VIEWS]['Level']['100'] = []
+        config.write()
+        self.assertEqual(self.writes, [])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directory, 'views'))), ['Area'])
+        self.assertEqual(os.listdir(os.path.join(self.directory, 'views', 'Area')), ['100.json'])
+
+    def testRefreshChangedShardsOnly(self):
+        config = ShardedConfig(self.directory)
+        config[MASTORON_VIEWS]['Area']['100']
+        config[MASTORON_VIEWS]['Area']['200']
+        other = ShardedConfig(self.directory)
+        other[MASTORON_VIEWS]['Area']['200'] = ['3', '4', '5']
+        other.write()
+        del self.reads[:]
+        config.refresh()
+        self.assertEqual(config[MASTORON_VIEWS]['Area']['100'], ['1', '2'])
+        self.assertEqual(config[MASTORON_VIEWS]['Area']['200'], ['3', '4', '5'])
+        self.assertEqual(self.reads, ['views/Area/200.json'])
+
+
+class SqliteConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'config.sqlite')
+        self.configs = []
+        self.config = self.open()
+        self.config[MASTORON_VIEWS] = {
+            'Area': {'100': ['1', '2', '3'], '200': ['3']},
+            'Level': {'100': ['3', '4']}
+        }
+        self.config.write()
+
+    def tearDown(self):
+        for config in self.configs:
+            config.close()
+        shutil.rmtree(self.directory)
+
+    def open(self):
+        config = SqliteConfig(self.path)
+        self.configs.append(config)
+        return config
+
+    def rows(self):
+        return sorted(self.config.connection.execute(
+            'SELECT scheme, view_id, element_id FROM elements').fetchall())
+
+    def testRows(self):
+        self.assertEqual(self.rows(), [
+            ('Area', '100', 1), ('Area', '100', 2), ('Area', '100', 3),
+            ('Area', '200', 3), ('Level', '100', 3), ('Level', '100', 4)
+        ])
+
+    def testUpdateChangedRowsOnly(self):
+        changes = self.config.connection.total_changes
+        self.config[MASTORON_VIEWS]['Area']['100'] = ['2', '3', '5', '6']
+        self.config.write()
+        self.assertEqual(self.config.connection.total_changes - changes, 3)
+        self.assertEqual(sorted(self.open()[MASTORON_VIEWS]['Area']['100']), ['2', '3', '5', '6'])
+
+    def testSkipUnchangedLists(self):
+        store = self.config.elements
+        value, token = store.load(('Area', '100'))
+        self.assertIs(store.save(('Area', '100'), list(value), token), token)
+        value.remove('1')
+        self.assertIsNot(store.save(('Area', '100'), value, token), token)
+
+    def testDeleteRows(self):
+        del self.config[MASTORON_VIEWS]['Area']['100']
+        self.config[MASTORON_VIEWS]['Level']['100'] = []
+        self.config.write()
+        self.assertEqual(self.rows(), [('Area', '200', 3)])
+        del self.config[MASTORON_VIEWS]['Area']
+        self.config.write()
+        self.assertEqual(self.rows(), [])
+        self.assertNotIn(MASTORON_VIEWS, self.open())
+
+    def testFind(self):
+        self.assertEqual(sorted(self.config.find(3)), [('Area', '100'), ('Area', '200'), ('Level', '100')])
+        self.assertEqual(self.config.find('4'), [('Level', '100')])
+        self.assertEqual(self.config.find(99), [])
+
+    def testRefresh(self):
+        self.assertEqual(sorted(self.config[MASTORON_VIEWS]['Area']['200']), ['3'])
+        self.assertEqual(sorted(self.config[MASTORON_VIEWS]['Level']['100']), ['3', '4'])
+        other = self.open()
+        other[MASTORON_VIEWS]['Area']['200'] = ['3', '7']
+        other[MASTORON_VIEWS]['Area']['300'] = ['8']
+        other.write()
+        self.config.refresh()
+        self.assertEqual(sorted(self.config[MASTORON_VIEWS]['Area']['200']), ['3', '7'])
+        self.assertEqual(sorted(self.config[MASTORON_VIEWS]['Area']), ['100', '200', '300'])
+        self.assertEqual(self.config.find(8), [('Area', '300')])
+
+
+class MigrateTest(unittest.TestCase):
+
+    BACKENDS = {
+        'json': (JsonFile, 'config.json'),
+        'journal': (JournalFile, 'journal.json'),
+        'sharded': (ShardedConfig, 'sharded'),
+        'sqlite': (SqliteConfig, 'config.sqlite')
+    }
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.configs = []
+
+    def tearDown(self):
+        for config in self.configs:
+            if hasattr(config, 'close'):
+                config.close()
+        shutil.rmtree(self.directory)
+
+    def open(self, backend, prefix):
+        cls, name = self.BACKENDS[backend]
+        path = os.path.join(self.directory, prefix + name)
+        if cls is JournalFile:
+            open(path + JournalFile.EXTENSION, 'a').close()
+        config = cls(path)
+        self.configs.append(config)
+        return config
+
+    def fill(self, config):
+        config['mastoron.colorscheme'] = {'Function': 'Area'}
+        config[MASTORON_COLORSCHEMES] = [
+            {'name': 'Area', 'data': {'Office': '#F44336'}},
+            {'name': 'Level', 'data': {'L1': '#2196F3'}}
+        ]
+        config[MASTORON_VIEWS] = {
+            'Area': {
+                '100': EncodeIdColors({'1': '#F44336', '2': '#F44336', '3': None}),
+                '200': EncodeIds([5, 6])
+            },
+            'Level': {'100': EncodeIds([7])}
+        }
+        config.write()
+
+    def normalize(self, config):
+        out = {}
+        for key, value in config.items():
+            if key == MASTORON_VERSION:
+                continue
+            if key == MASTORON_VIEWS:
+                value = dict((scheme, dict((viewId, DecodeIdColors(ids)) for viewId, ids in views.items()))
+                    for scheme, views in value.items())
+            elif key == MASTORON_COLORSCHEMES:
+                value = sorted(value, key=lambda scheme: scheme['name'])
+            out[key] = value
+        return out
+
+    def testAllPairs(self):
+        for source in self.BACKENDS:
+            for target in self.BACKENDS:
+                prefix = '{}-{}-'.format(source, target)
+                config = self.open(source, prefix + 'source-')
+                self.fill(config)
+                expected = self.normalize(self.open(source, prefix + 'source-'))
+                cls, name = self.BACKENDS[target]
+                path = os.path.join(self.directory, prefix + name)
+                self.configs.append(cls.migrate(config, path))
+                migrated = self.open(target, prefix)
+                self.assertEqual(self.normalize(migrated), expected, (source, target))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import revitron
+from mastoron.document import ConfigStorage
+from mastoron.storage import JsonFile, ShardedConfig, EncodeIds
+from mastoron.variables import MASTORON_VIEWS
+from mastoron.view import AffectedElements, AffectedViews, ElementIndex
+
+AREA = {'name': 'Area'}
+LEVEL = {'name': 'Level'}
+
+
+class DocumentConfigStorage(object):
+
+    path = None
+
+    def get(self, key, default=None):
+        return DocumentConfigStorage.path
+
+
+class ElementIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.documentConfigStorage = revitron.DocumentConfigStorage
+        revitron.DocumentConfigStorage = DocumentConfigStorage
+        self.sync = ElementIndex._sync
+        self.syncs = 0
+        ElementIndex._sync = staticmethod(self.countSync)
+        ConfigStorage.clearCache()
+
+    def tearDown(self):
+        ElementIndex._sync = staticmethod(self.sync)
+        revitron.DocumentConfigStorage = self.documentConfigStorage
+        ConfigStorage.clearCache()
+        shutil.rmtree(self.directory)
+
+    def countSync(self, affectedViews):
+        self.syncs += 1
+        self.sync(affectedViews)
+
+    def useFile(self):
+        DocumentConfigStorage.path = os.path.join(self.directory, 'config.json')
+        with open(DocumentConfigStorage.path, 'w') as f:
+            json.dump({MASTORON_VIEWS: {'Area': {'100': EncodeIds([1, 2])}}}, f)
+
+    def useDirectory(self):
+        DocumentConfigStorage.path = os.path.join(self.directory, 'config')
+        config = ShardedConfig(DocumentConfigStorage.path)
+        config[MASTORON_VIEWS] = {'Area': {'100': EncodeIds([1, 2])}}
+        config.write()
+
+    def testFindAfterDump(self):
+        for use in (self.useFile, self.useDirectory):
+            use()
+            self.assertEqual(ElementIndex.find([1, 3]), {'1': set([('Area', '100')]), '3': set()})
+            syncs = self.syncs
+            AffectedElements().dump(LEVEL, 200, [3])
+            elements = AffectedElements()
+            elements.get(AREA, 100).discard('1')
+            elements.dump(AREA, 100)
+            self.assertEqual(ElementIndex.find([1, 2, 3]), {
+                '1': set(),
+                '2': set([('Area', '100')]),
+                '3': set([('Level', '200')])
+            })
+            self.assertEqual(self.syncs, syncs)
+
+    def testFindAfterDelete(self):
+        for use in (self.useFile, self.useDirectory):
+            use()
+            AffectedElements().dump(LEVEL, 200, [2, 4])
+            self.assertEqual(ElementIndex.find(2), {'2': set([('Area', '100'), ('Level', '200')])})
+            syncs = self.syncs
+            AffectedViews().delete(AREA, 100)
+            self.assertEqual(ElementIndex.find(2), {'2': set([('Level', '200')])})
+            AffectedElements().delete(LEVEL, 200, 2)
+            self.assertEqual(ElementIndex.find([1, 2, 4]), {
+                '1': set(),
+                '2': set(),
+                '4': set([('Level', '200')])
+            })
+            self.assertEqual(self.syncs, syncs)
+
+    def testFindChangesOfOthers(self):
+        for use, config in ((self.useFile, JsonFile), (self.useDirectory, ShardedConfig)):
+            use()
+            self.assertEqual(ElementIndex.find(5), {'5': set()})
+            syncs = self.syncs
+            self.assertEqual(ElementIndex.find(5), {'5': set()})
+            self.assertEqual(self.syncs, syncs)
+            other = config(DocumentConfigStorage.path)
+            other[MASTORON_VIEWS]['Area']['300'] = EncodeIds([5])
+            other.write()
+            self.assertEqual(ElementIndex.find(5), {'5': set([('Area', '300')])})
+            self.assertEqual(self.syncs, syncs + 1)
+
+if __name__ == '__main__':
+    unittest.main()